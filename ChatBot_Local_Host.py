@@ -1,8 +1,19 @@
 import streamlit as st
-import requests
+import json
+import time
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+from chat_history import ChatHistory, format_transcript
+from llm_cache import get_llm_cache, make_key
+from llm_scheduler import SchedulerBusy, get_llm_scheduler
+from llm_backends import get_backend
+from ollama_client import chat_messages
+from tracing import span
+
+LLM_BACKEND = "ollama"  # "ollama", "gemini" or "fake" (see llm_backends.py)
 MODEL_NAME = "qwen2.5:7b-instruct"  # Updated to match your installed model
+BACKEND_SETTINGS = {"base_url": "http://localhost:11434"}  # Other backend settings, e.g. {"api_key": ...} for gemini
+USE_CHAT_API = True  # Structured chat messages with a stable prefix (False: one prompt string)
+USE_LLM_CACHE = True  # Reuse responses for identical prompts
 
 SYSTEM_PROMPT = (
     "You are a knowledgeable and respectful chatbot .")
@@ -14,28 +25,79 @@ st.markdown(
 )
 
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ChatHistory()
 if "user_input" not in st.session_state:
     st.session_state.user_input = ""
 if "clear_input" not in st.session_state:
     st.session_state.clear_input = False
+if "pending_input" not in st.session_state:
+    st.session_state.pending_input = None
+if "last_metrics" not in st.session_state:
+    st.session_state.last_metrics = None
+if "failed_exchange" not in st.session_state:
+    st.session_state.failed_exchange = None  # (message, error bubble) of a reply that failed
+
+def get_model_response(prompt, placeholder=None, context=()):
+    # Built once per process and shared by every session
+    llm = get_backend(LLM_BACKEND, model=MODEL_NAME, **BACKEND_SETTINGS)
+    if USE_CHAT_API:
+        # System prompt and earlier turns stay a byte-identical prefix, so
+        # Ollama only evaluates the new message
+        messages = chat_messages(SYSTEM_PROMPT, context, prompt)
+        cache_key = make_key(MODEL_NAME, SYSTEM_PROMPT, json.dumps(messages))
+    else:
+        full_prompt = f"{SYSTEM_PROMPT}\nUser: {prompt}\nBot:"
+        if context:
+            # Recent turns, within a token budget, so follow-ups make sense
+            transcript = format_transcript(context, {'You': 'User', 'Bot': 'Bot'})
+            full_prompt = f"{SYSTEM_PROMPT}\n{transcript}\nUser: {prompt}\nBot:"
+        cache_key = make_key(MODEL_NAME, SYSTEM_PROMPT, full_prompt)
+
+    if USE_LLM_CACHE:
+        cached = get_llm_cache().get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Shares the model host fairly with other sessions
+    with get_llm_scheduler().slot():
+        start = time.perf_counter()
+        if placeholder is None:
+            if USE_CHAT_API:
+                response = llm.complete(messages)
+            else:
+                response = llm.generate(full_prompt)
+        else:
+            # Stream tokens into the bubble as they arrive
+            metrics = {}
+            if USE_CHAT_API:
+                tokens = llm.stream(messages, metrics=metrics)
+            else:
+                tokens = llm.stream_generate(full_prompt, metrics=metrics)
+            text = ""
+            last_render = 0.0
+            for token in tokens:
+                text += token
+                now = time.monotonic()
+                if now - last_render >= 0.05:
+                    placeholder.markdown(render_bubble("Bot", f"{text}▌"), unsafe_allow_html=True)
+                    last_render = now
+            st.session_state.last_metrics = metrics
+            response = text.strip()
 
-def get_ollama_response(prompt):
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": f"{SYSTEM_PROMPT}\nUser: {prompt}\nBot:",
-        "stream": False
-    }
-    response = requests.post(OLLAMA_URL, json=payload)
-    response.raise_for_status()
-    return response.json()["response"].strip()
+    if USE_LLM_CACHE:
+        get_llm_cache().put(cache_key, response, time.perf_counter() - start)
+    return response
+
+def render_bubble(sender, message):
+    if sender == "You":
+        return f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>"
+    return f"<div class='bot-bubble'><b>🕉️ Bot:</b> {message}</div>"
 
 def send_message():
     user_input = st.session_state.user_input
     if user_input.strip():
-        bot_response = get_ollama_response(user_input)
-        st.session_state.chat_history.append(("You", user_input))
-        st.session_state.chat_history.append(("Bot", bot_response))
+        # The reply is streamed in the chat area on the next render
+        st.session_state.pending_input = user_input
         # Set flag to clear input on next render
         st.session_state.clear_input = True
 
@@ -73,11 +135,58 @@ with chat_placeholder:
         """,
         unsafe_allow_html=True,
     )
-    for sender, message in st.session_state.chat_history:
-        if sender == "You":
-            st.markdown(f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>", unsafe_allow_html=True)
+    # One element for the whole history, re-rendered only when messages are added
+    if st.session_state.chat_history:
+        st.markdown(st.session_state.chat_history.render(render_bubble), unsafe_allow_html=True)
+
+    if st.session_state.pending_input:
+        user_input = st.session_state.pending_input
+        st.session_state.pending_input = None
+        st.session_state.failed_exchange = None
+        st.markdown(render_bubble("You", user_input), unsafe_allow_html=True)
+        st.session_state.last_metrics = None
+        bot_placeholder = st.empty()
+        try:
+            # Traced like the scraper bot's replies (logs and metrics in .cache/)
+            with span('request', mode='chat'):
+                bot_response = get_model_response(
+                    user_input, placeholder=bot_placeholder, context=st.session_state.chat_history.build_context()
+                )
+        except SchedulerBusy:
+            # Too many sessions are waiting for the model host
+            error = "⏳ The model is busy right now; please try again in a moment."
+        except Exception as e:
+            error = f"❌ Error: {e}"
+        else:
+            error = None
+        if error:
+            # Shown until the next message, but kept out of the model's context
+            bot_placeholder.markdown(render_bubble("Bot", error), unsafe_allow_html=True)
+            st.session_state.failed_exchange = (user_input, error)
         else:
-            st.markdown(f"<div class='bot-bubble'><b>🕉️ Bot:</b> {message}</div>", unsafe_allow_html=True)
+            bot_placeholder.markdown(render_bubble("Bot", bot_response), unsafe_allow_html=True)
+            st.session_state.chat_history.append("You", user_input)
+            st.session_state.chat_history.append("Bot", bot_response)
+    elif st.session_state.failed_exchange:
+        failed_input, error = st.session_state.failed_exchange
+        st.markdown(render_bubble("You", failed_input) + render_bubble("Bot", error), unsafe_allow_html=True)
+
+    metrics = st.session_state.last_metrics
+    if metrics and 'time_to_first_token' in metrics:
+        caption = f"⚡ First token in {metrics['time_to_first_token']:.2f}s"
+        if 'prompt_eval_duration' in metrics:
+            caption += (
+                f" · prompt eval {metrics['prompt_eval_duration'] / 1e9:.2f}s "
+                f"for {metrics.get('prompt_eval_count', 0)} tokens"
+            )
+        st.caption(caption)
+
+    llm_stats = get_llm_cache().stats()
+    if llm_stats['hits']:
+        st.caption(
+            f"♻️ Response cache: {llm_stats['hit_ratio']:.0%} hit ratio, "
+            f"{llm_stats['saved_seconds']:.1f}s of model time saved"
+        )
 
 st.markdown("---")
 col1, col2 = st.columns([5, 1])
@@ -1,12 +1,37 @@
-import google.generativeai as genai
+import os
+import threading
+
+from llm_backends import get_backend
+from llm_cache import get_llm_cache
+
+LLM_BACKEND = "gemini"  # "gemini", "ollama" or "fake" (see llm_backends.py)
+MODEL_NAME = "gemini-2.5-flash"
+BACKEND_SETTINGS = {"api_key": os.environ.get("GOOGLE_API_KEY", "Your_API_KEY")}
+USE_LLM_CACHE = True  # Reuse responses for identical questions
+
+def get_llm():
+    # The backend (and its configured client) is built once and reused
+    return get_backend(LLM_BACKEND, model=MODEL_NAME, **BACKEND_SETTINGS)
+
+def warm_up():
+    # Import and configure the SDK while the user types; the first message waits for it if needed
+    def build():
+        try:
+            get_llm()
+        except Exception:
+            pass  # Reported by the first message instead
+    threading.Thread(target=build, daemon=True).start()
+
+def generate_response(user_input):
+    return get_llm().generate(user_input).strip()
 
 def get_response(user_input):
-    genai.configure(api_key="Your_API_KEY")
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    response = model.generate_content(user_input)
-    return response.text.strip()
+    if USE_LLM_CACHE:
+        return get_llm_cache().cached_call(MODEL_NAME, "", user_input, lambda: generate_response(user_input))
+    return generate_response(user_input)
 
 def main():
+    warm_up()
     print("Welcome to the Gemini Terminal Chatbot! (type 'bye' to exit)")
     while True:
         user_input = input("You: ")
@@ -1,28 +1,42 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urljoin, urlparse
+import os
 import time
-from collections import deque
-
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL_NAME = "qwen2.5:7b-instruct"
-
-SCRAPER_SYSTEM_PROMPT = (
-    "You are an intelligent web content analyzer and summarizer. "
-    "Your task is to analyze web content (single page or multiple pages) and create comprehensive, well-structured summaries. "
-    "When given website content, you should:\n\n"
-    "1. Identify the main topic and key themes across all pages\n"
-    "2. Extract important information, statistics, and facts\n"
-    "3. Organize the summary in a clear, hierarchical format\n"
-    "4. Highlight any significant insights or conclusions\n"
-    "5. If multiple pages were crawled, mention the breadth of content covered\n"
-    "6. Mention the source website(s) for reference\n\n"
-    "For crawled content, provide an overview of the site structure and main sections. "
-    "Provide summaries that are informative, accurate, and easy to understand. "
-    "If the content is technical, explain complex concepts in simpler terms."
+import uuid
+
+from chat_history import ChatHistory
+from doc_store import DocumentStore
+from jobs import CANCELLED, FAILED, get_job_manager
+from llm_cache import get_llm_cache
+from llm_scheduler import get_llm_scheduler
+from page_cache import get_page_cache
+from pipeline import (
+    CRAWL_KEYWORDS,
+    CRAWL_MAX_PAGES,
+    CRAWL_SUMMARY_QUERY,
+    RECRAWL_KEYWORDS,
+    analyze_changes,
+    analyze_crawl,
+    compare_pages,
+    crawl_query,
+    crawl_website,
+    find_urls,
+    follow_up_prompt,
+    get_model_response,
+    recrawl_website,
+    scrape_website,
+    scrape_websites,
+    summarize_page,
 )
+from single_flight import get_single_flight
+from tracing import breakdown, current_span
+
+PERSIST_DOCUMENTS = False  # Keep each browser's scraped pages across restarts (SQLite in .cache/, keyed by ?sid= in the URL)
+DOC_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'documents.sqlite3')
+FOLLOW_UP_MIN_SCORE = 0.5  # BM25 score needed to answer from stored pages
+FOLLOW_UP_MIN_MATCH = 0.5  # Share of the question's terms a stored passage must contain
+JOB_POLL_INTERVAL = 0.25  # Seconds between reruns while a reply is in progress
+USE_FRAGMENTS = hasattr(st, "fragment")  # Streamlit 1.37+: poll replies without rerunning the whole page
+DEBUG_PANEL = False  # Show a per-stage latency breakdown of the last reply
 
 st.set_page_config(page_title="Web Scraper Chatbot", page_icon="🕷️")
 st.markdown(
@@ -35,276 +49,131 @@ st.markdown(
 )
 
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ChatHistory()
 if "user_input" not in st.session_state:
     st.session_state.user_input = ""
 if "clear_input" not in st.session_state:
     st.session_state.clear_input = False
+if "active_jobs" not in st.session_state:
+    # Background jobs answering this session's messages, oldest first
+    st.session_state.active_jobs = []
+if "last_notices" not in st.session_state:
+    st.session_state.last_notices = []
+if "last_metrics" not in st.session_state:
+    st.session_state.last_metrics = None
+if "last_trace" not in st.session_state:
+    st.session_state.last_trace = None
+if "doc_store" not in st.session_state:
+    # Pages read in this session, searchable for follow-up questions
+    if PERSIST_DOCUMENTS:
+        # Stored pages belong to one browser: its key lives in the page URL, so a
+        # reload or restart finds them and other users never see them
+        if not st.query_params.get("sid"):
+            st.query_params["sid"] = uuid.uuid4().hex
+        st.session_state.doc_store = DocumentStore(DOC_STORE_PATH, owner=st.query_params["sid"])
+    else:
+        st.session_state.doc_store = DocumentStore()
 
-def is_valid_url(url):
-    """Check if the provided string is a valid URL"""
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except:
-        return False
-
-def scrape_website(url):
-    """Scrape content from the given URL"""
-    try:
-        # Add headers to mimic a real browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Make request with timeout
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Get title
-        title = soup.title.string if soup.title else "No title found"
-        
-        # Extract main content (prioritize article, main, or div with content)
-        content_tags = soup.find_all(['article', 'main', 'div', 'section', 'p', 'h1', 'h2', 'h3'])
-        
-        # Extract text from relevant tags
-        text_content = []
-        for tag in content_tags:
-            text = tag.get_text(strip=True)
-            if len(text) > 50:  # Only include substantial text blocks
-                text_content.append(text)
-        
-        # Join and clean the content
-        full_content = ' '.join(text_content)
-        # Remove extra whitespaces and newlines
-        full_content = re.sub(r'\s+', ' ', full_content).strip()
-        
-        return {
-            'title': title.strip(),
-            'content': full_content[:8000],  # Limit content to prevent token overflow
-            'url': url,
-            'success': True
-        }
-        
-    except requests.exceptions.RequestException as e:
-        return {
-            'error': f"Failed to fetch the website: {str(e)}",
-            'success': False
-        }
-    except Exception as e:
-        return {
-            'error': f"Error processing the website: {str(e)}",
-            'success': False
-        }
-
-def get_internal_links(url, soup, max_links=10):
-    """Extract internal links from the current page"""
-    base_domain = urlparse(url).netloc
-    internal_links = set()
-    
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        
-        # Convert relative URLs to absolute
-        absolute_url = urljoin(url, href)
-        parsed_url = urlparse(absolute_url)
-        
-        # Check if it's an internal link (same domain)
-        if parsed_url.netloc == base_domain and parsed_url.scheme in ['http', 'https']:
-            # Avoid fragments and query parameters for cleaner crawling
-            clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-            internal_links.add(clean_url)
-            
-            if len(internal_links) >= max_links:
-                break
-    
-    return list(internal_links)
-
-def crawl_website(start_url, max_pages=5, delay=1):
-    """Crawl multiple pages from a website"""
-    try:
-        visited = set()
-        to_visit = deque([start_url])
-        crawled_data = []
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        progress_placeholder = st.empty()
-        
-        while to_visit and len(crawled_data) < max_pages:
-            current_url = to_visit.popleft()
-            
-            if current_url in visited:
-                continue
-                
-            visited.add(current_url)
-            progress_placeholder.text(f"🕷️ Crawling page {len(crawled_data) + 1}/{max_pages}: {current_url}")
-            
-            try:
-                response = requests.get(current_url, headers=headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Remove unwanted elements
-                for script in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                    script.decompose()
-                
-                # Get title
-                title = soup.title.string if soup.title else "No title found"
-                
-                # Extract content
-                content_tags = soup.find_all(['article', 'main', 'div', 'section', 'p', 'h1', 'h2', 'h3'])
-                text_content = []
-                
-                for tag in content_tags:
-                    text = tag.get_text(strip=True)
-                    if len(text) > 30:
-                        text_content.append(text)
-                
-                full_content = ' '.join(text_content)
-                full_content = re.sub(r'\s+', ' ', full_content).strip()
-                
-                if full_content:  # Only add pages with content
-                    crawled_data.append({
-                        'url': current_url,
-                        'title': title.strip(),
-                        'content': full_content[:3000],  # Limit per page to manage total size
-                    })
-                
-                # Get internal links for further crawling
-                if len(crawled_data) < max_pages:
-                    internal_links = get_internal_links(current_url, soup, max_links=5)
-                    for link in internal_links:
-                        if link not in visited:
-                            to_visit.append(link)
-                
-                # Respectful delay between requests
-                time.sleep(delay)
-                
-            except Exception as e:
-                st.warning(f"Failed to crawl {current_url}: {str(e)}")
-                continue
-        
-        progress_placeholder.empty()
-        
-        if crawled_data:
-            return {
-                'success': True,
-                'pages_crawled': len(crawled_data),
-                'data': crawled_data,
-                'start_url': start_url
-            }
-        else:
-            return {
-                'success': False,
-                'error': "No content could be extracted from the website"
-            }
-            
-    except Exception as e:
-        return {
-            'success': False,
-            'error': f"Crawling failed: {str(e)}"
-        }
-
-def get_ollama_response(prompt):
-    """Get response from Ollama model"""
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": f"{SCRAPER_SYSTEM_PROMPT}\n\nUser Query: {prompt}\n\nAI Response:",
-        "stream": False
-    }
-    response = requests.post(OLLAMA_URL, json=payload)
-    response.raise_for_status()
-    return response.json()["response"].strip()
+def process_user_input(job, user_input, doc_store, context=()):
+    """Process user input - URL with crawl options or regular question
 
-def process_user_input(user_input):
-    """Process user input - URL with crawl options or regular question"""
+    Runs as a background job: status goes to `job` instead of the page,
+    and `doc_store` and the conversation `context` are passed in because
+    session state belongs to the script thread.
+    """
     # Check if input contains a URL
-    urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', user_input)
+    urls = find_urls(user_input)
     
     if urls:
-        url = urls[0]  # Take the first URL found
+        url = urls[0]  # Crawls start from the first URL found
         
         # Check if user wants to crawl (keywords: crawl, multiple pages, site map, etc.)
-        crawl_keywords = ['crawl', 'multiple pages', 'entire site', 'all pages', 'site map', 'deep dive', 'full site']
-        should_crawl = any(keyword in user_input.lower() for keyword in crawl_keywords)
+        should_crawl = any(keyword in user_input.lower() for keyword in CRAWL_KEYWORDS)
+        should_recrawl = any(keyword in user_input.lower() for keyword in RECRAWL_KEYWORDS)
+        
+        current_span().attrs['mode'] = 'crawl' if should_crawl else 'page'
+        if should_recrawl:
+            # Crawl again, fetching and summarizing only what changed since the last re-crawl
+            current_span().attrs['mode'] = 'recrawl'
+            job.notify('info', "♻️ **Re-crawl Mode** - Checking which pages changed since the last crawl...")
+            crawled_data = recrawl_website(job, url, max_pages=CRAWL_MAX_PAGES)
+            
+            if crawled_data['success']:
+                doc_store.add_pages(crawled_data['data'])
+                return analyze_changes(job, crawled_data)
+            else:
+                return f"❌ Error during crawling: {crawled_data['error']}"
         
-        if should_crawl:
+        elif should_crawl:
             # Crawl multiple pages
-            st.info("🕷️ **Crawl Mode Activated** - Extracting content from multiple pages...")
-            crawled_data = crawl_website(url, max_pages=5, delay=1)
+            job.notify('info', "🕷️ **Crawl Mode Activated** - Extracting content from multiple pages...")
+            query = crawl_query(user_input, urls, CRAWL_KEYWORDS)
+            crawled_data = crawl_website(
+                job, url, max_pages=CRAWL_MAX_PAGES, query=None if query == CRAWL_SUMMARY_QUERY else query
+            )
             
             if crawled_data['success']:
-                # Combine all page content
-                all_content = []
-                page_titles = []
-                
-                for page in crawled_data['data']:
-                    page_titles.append(f"• {page['title']} ({page['url']})")
-                    all_content.append(f"Page: {page['title']}\nURL: {page['url']}\nContent: {page['content']}\n---")
-                
-                combined_content = '\n\n'.join(all_content)
-                pages_info = '\n'.join(page_titles)
-                
-                prompt = f"""I crawled {crawled_data['pages_crawled']} pages from the website. Please analyze and provide a comprehensive summary:
-
-Starting URL: {crawled_data['start_url']}
-
-Pages Crawled:
-{pages_info}
-
-Combined Content:
-{combined_content[:12000]}  # Limit total content
-
-Please provide a comprehensive analysis covering:
-1. Overall website theme and purpose
-2. Main sections and topics covered
-3. Key insights and information
-4. Site structure and organization"""
-                
-                return get_ollama_response(prompt)
+                doc_store.add_pages(crawled_data['data'])
+                return analyze_crawl(job, crawled_data, query)
             else:
                 return f"❌ Error during crawling: {crawled_data['error']}"
         
+        elif len(urls) > 1:
+            # Several pages - fetch them in parallel and compare them in one reply
+            current_span().attrs['mode'] = 'compare'
+            job.set_progress(f"🕷️ Scraping {len(urls)} pages...")
+            scraped = scrape_websites(job, urls)
+            pages = [page for page in scraped if page['success']]
+            for page in pages:
+                doc_store.add(page['url'], page['title'], page['content'])
+            if not pages:
+                return "❌ Error scraping websites:\n" + '\n'.join(f"• {page['url']}: {page['error']}" for page in scraped)
+            query = crawl_query(user_input, urls, [])
+            return compare_pages(job, scraped, question=None if query == CRAWL_SUMMARY_QUERY else query)
+        
         else:
             # Single page scraping
-            with st.spinner(f"🕷️ Scraping content from {url}..."):
-                scraped_data = scrape_website(url)
+            job.set_progress(f"🕷️ Scraping content from {url}...")
+            scraped_data = scrape_website(url)
+            job.check_cancelled()
+            job.set_progress(None)
             
             if scraped_data['success']:
-                prompt = f"""Please analyze and summarize the following website content:
-
-URL: {scraped_data['url']}
-Title: {scraped_data['title']}
-
-Content:
-{scraped_data['content']}
-
-Please provide a comprehensive summary of this website's content."""
-                
-                return get_ollama_response(prompt)
+                doc_store.add(scraped_data['url'], scraped_data['title'], scraped_data['content'])
+                return summarize_page(job, scraped_data)
             else:
                 return f"❌ Error scraping website: {scraped_data['error']}"
     else:
-        # Regular question - no URL detected
-        return get_ollama_response(user_input)
+        current_span().attrs['mode'] = 'question'
+        # Regular question - answer from pages read earlier if any are relevant
+        results = [
+            (score, passage) for score, passage in doc_store.search(user_input, k=5, min_match=FOLLOW_UP_MIN_MATCH)
+            if score >= FOLLOW_UP_MIN_SCORE
+        ]
+        if results:
+            job.notify('caption', f"📚 Answering from {len(results)} passages of pages read earlier")
+            passages = [passage for _, passage in results]
+            # The pages go in a fixed message before the conversation, so
+            # follow-ups about them share one cached prompt prefix
+            reference, prompt = follow_up_prompt(
+                user_input, passages, doc_store.pages({passage['url'] for passage in passages})
+            )
+            return get_model_response(prompt, job, context=context, reference=reference)
+        
+        return get_model_response(user_input, job, context=context)
 
 def send_message():
     user_input = st.session_state.user_input
     if user_input.strip():
-        bot_response = process_user_input(user_input)
-        st.session_state.chat_history.append(("You", user_input))
-        st.session_state.chat_history.append(("Bot", bot_response))
+        # Answered in the background; the chat area polls the job until it finishes
+        job = get_job_manager().submit(
+            process_user_input,
+            user_input,
+            st.session_state.doc_store,
+            st.session_state.chat_history.build_context(),
+            description=user_input,
+        )
+        st.session_state.active_jobs.append(job.id)
         st.session_state.clear_input = True
 
 def on_input_change():
@@ -312,42 +181,137 @@ def on_input_change():
     if user_input.strip():
         send_message()
 
+def collect_finished_jobs():
+    """Move replies of finished jobs into the chat history, oldest first"""
+    manager = get_job_manager()
+    while st.session_state.active_jobs:
+        job = manager.get(st.session_state.active_jobs[0])
+        if job is not None and not job.done:
+            break
+        st.session_state.active_jobs.pop(0)
+        if job is None:
+            continue  # Expired before this session came back for it
+        manager.collect(job.id)
+
+        if job.status == FAILED:
+            bot_response = f"❌ Error: {job.error}"
+        elif job.status == CANCELLED:
+            bot_response = f"{job.partial.strip()} ⏹️ *Stopped*" if job.partial.strip() else "⏹️ Stopped"
+        else:
+            bot_response = job.result
+        st.session_state.chat_history.append("You", job.description)
+        st.session_state.chat_history.append("Bot", bot_response)
+        st.session_state.last_notices = job.notices
+        st.session_state.last_metrics = job.metrics
+        st.session_state.last_trace = job.trace
+
+def render_model_metrics(metrics):
+    """Caption with time to first token and Ollama's prompt eval time"""
+    if not metrics or 'time_to_first_token' not in metrics:
+        return
+    caption = f"⚡ First token in {metrics['time_to_first_token']:.2f}s"
+    if 'prompt_eval_duration' in metrics:
+        caption += (
+            f" · prompt eval {metrics['prompt_eval_duration'] / 1e9:.2f}s "
+            f"for {metrics.get('prompt_eval_count', 0)} tokens"
+        )
+    st.caption(caption)
+
+def render_trace(trace):
+    """Debug panel: time per stage of the last reply and the span tree behind it"""
+    if not trace:
+        return
+    with st.expander(f"🔬 Latency breakdown ({trace['duration']:.2f}s)"):
+        stages = sorted(breakdown(trace).items(), key=lambda item: -item[1][2])
+        st.table([
+            {'stage': name, 'calls': count, 'total s': round(total, 3), 'self s': round(own, 3),
+             'share': f"{own / trace['duration']:.0%}" if trace['duration'] else '-'}
+            for name, (count, total, own) in stages
+        ])
+        lines = []
+
+        def walk(span, depth):
+            attrs = ', '.join(
+                f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in span['attrs'].items()
+            )
+            lines.append(f"{'  ' * depth}{span['name']:<10} +{span['offset']:.3f}s {span['duration']:.3f}s  {attrs}")
+            for child in span['children']:
+                walk(child, depth + 1)
+
+        walk(trace, 0)
+        st.code('\n'.join(lines), language=None)
+
+def render_notices(notices):
+    for kind, text in notices:
+        getattr(st, kind)(text)
+
+def render_bubble(sender, message):
+    if sender == "You":
+        return f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>"
+    return f"<div class='bot-bubble'><b>🤖 AI:</b> {message}</div>"
+
+def render_active_jobs():
+    """Replies still in progress: status so far, partial text and a cancel button"""
+    manager = get_job_manager()
+    if any(job is None or job.done for job in map(manager.get, st.session_state.active_jobs)):
+        st.rerun()  # A full rerun moves finished replies into the history
+    for job_id in st.session_state.active_jobs:
+        job = manager.get(job_id)
+        st.markdown(render_bubble("You", job.description), unsafe_allow_html=True)
+        render_notices(job.notices)
+        if job.progress:
+            st.text(job.progress)
+        reply = job.partial or "<i>Working on it...</i>"
+        st.markdown(render_bubble("Bot", f"{reply}▌"), unsafe_allow_html=True)
+        if st.button("⏹️ Cancel", key=f"cancel_{job_id}", disabled=job.cancelled):
+            job.cancel()
+
+if USE_FRAGMENTS:
+    # Polls only this part of the page; the header, history and input aren't redrawn
+    render_active_jobs = st.fragment(run_every=JOB_POLL_INTERVAL)(render_active_jobs)
+
+BUBBLE_CSS = """
+<style>
+    .user-bubble {
+        background-color: #e3f2fd;
+        color: #0d47a1;
+        padding: 15px;
+        border-radius: 15px;
+        margin-bottom: 10px;
+        margin-left: 50px;
+        text-align: right;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    }
+    .bot-bubble {
+        background-color: #f3e5f5;
+        color: #4a148c;
+        padding: 15px;
+        border-radius: 15px;
+        margin-bottom: 10px;
+        margin-right: 50px;
+        text-align: left;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    }
+    .chat-container {
+        max-height: 600px;
+        overflow-y: auto;
+    }
+</style>
+"""
+
 # Chat display area
 chat_placeholder = st.container()
 with chat_placeholder:
-    st.markdown(
-        """
-        <style>
-        .user-bubble {
-            background-color: #e3f2fd;
-            color: #0d47a1;
-            padding: 15px;
-            border-radius: 15px;
-            margin-bottom: 10px;
-            margin-left: 50px;
-            text-align: right;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        .bot-bubble {
-            background-color: #f3e5f5;
-            color: #4a148c;
-            padding: 15px;
-            border-radius: 15px;
-            margin-bottom: 10px;
-            margin-right: 50px;
-            text-align: left;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        .chat-container {
-            max-height: 600px;
-            overflow-y: auto;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    if st.session_state.chat_history or st.session_state.active_jobs:
+        # Streamlit removes elements a full rerun doesn't emit again, so the
+        # styles are sent with every rerun that shows bubbles; fragment polls
+        # (USE_FRAGMENTS) leave them alone, and the empty chat skips them
+        st.markdown(BUBBLE_CSS, unsafe_allow_html=True)
+    
+    collect_finished_jobs()
     
-    if not st.session_state.chat_history:
+    if not st.session_state.chat_history and not st.session_state.active_jobs:
         st.markdown(
             "<div style='text-align: center; color: #666; padding: 20px;'>"
             "👋 Hi! I can scrape single pages or crawl entire websites!<br>"
@@ -357,11 +321,43 @@ with chat_placeholder:
             unsafe_allow_html=True
         )
     
-    for sender, message in st.session_state.chat_history:
-        if sender == "You":
-            st.markdown(f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='bot-bubble'><b>🤖 AI:</b> {message}</div>", unsafe_allow_html=True)
+    # One element for the whole history, re-rendered only when messages are added
+    if st.session_state.chat_history:
+        st.markdown(st.session_state.chat_history.render(render_bubble), unsafe_allow_html=True)
+
+    render_notices(st.session_state.last_notices)
+
+    if st.session_state.active_jobs:
+        render_active_jobs()
+
+    render_model_metrics(st.session_state.last_metrics)
+    if DEBUG_PANEL:
+        render_trace(st.session_state.last_trace)
+
+    llm_stats = get_llm_cache().stats()
+    if llm_stats['hits']:
+        st.caption(
+            f"♻️ Response cache: {llm_stats['hit_ratio']:.0%} hit ratio, "
+            f"{llm_stats['saved_seconds']:.1f}s of model time saved"
+        )
+
+    shared = get_single_flight('page').stats()['shared'] + get_single_flight('llm').stats()['shared']
+    if shared:
+        st.caption(f"🔗 {shared} requests shared a download or model call already in flight")
+
+    queue_stats = get_llm_scheduler().stats()
+    if queue_stats['waited'] or queue_stats['rejected']:
+        st.caption(
+            f"🚦 Model queue: {queue_stats['queued']} waiting, {queue_stats['running']} running, "
+            f"p95 wait {queue_stats['p95_wait']:.1f}s, {queue_stats['rejected']} turned away"
+        )
+
+    cache_stats = get_page_cache().stats(sizes=False)
+    if cache_stats['hits'] + cache_stats['misses'] + cache_stats['revalidated']:
+        st.caption(
+            f"📦 Page cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+            f"{cache_stats['misses']} misses"
+        )
 
 st.markdown("---")
 
@@ -382,6 +378,7 @@ with st.expander("📋 How to use"):
     **💬 For General Questions:**
     - Ask any question without a URL
     - Get AI-powered responses
+    - Follow-up questions about pages you already scraped or crawled are answered from those pages
     
     **📝 Examples:**
     - `https://news.ycombinator.com` (single page)
@@ -391,8 +388,8 @@ with st.expander("📋 How to use"):
     
     **⚙️ Crawling Features:**
     - Crawls up to 5 pages per request
-    - 1-second delay between requests (respectful crawling)
-    - Follows internal links only
+    - Fetches pages concurrently with per-site rate limits (respectful crawling)
+    - Follows internal links only, most relevant first, and honors robots.txt
     - Provides comprehensive site analysis
     """)
 
@@ -421,7 +418,12 @@ with col2:
 st.markdown("---")
 st.markdown(
     "<div style='text-align: center; color: #666; font-size: 12px;'>"
-    "🕷️ Web Crawler & Scraper Bot - Powered by Ollama, BeautifulSoup & Smart Crawling"
+    "🕷️ Web Crawler & Scraper Bot - Powered by Ollama, lxml & Smart Crawling"
     "</div>",
     unsafe_allow_html=True
 )
+
+# Without fragments, poll running jobs by rerunning the whole script
+if st.session_state.active_jobs and not USE_FRAGMENTS:
+    time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
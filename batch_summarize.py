@@ -0,0 +1,197 @@
+"""
+Batch URL summarization from the command line.
+
+Runs the scraper bot's pipeline (pipeline.summarize_url) over a file of
+URLs without the Streamlit UI, e.g. from cron:
+
+    python batch_summarize.py urls.txt -o summaries.jsonl --workers 8
+
+The input has one URL per line (blank lines and # comments are skipped),
+or one JSON object per line such as
+{"url": "https://example.com", "crawl": true, "question": "pricing?"}.
+With --incremental each site is crawled again with conditional requests
+and summarized as what changed since its previous incremental crawl.
+Use "-" to read from stdin. Each result is written as one JSON line as
+soon as it is ready, in completion order, with the input line number.
+
+A worker pool processes several URLs at once; model calls still go
+through the process-wide model queue (--model-concurrency), so workers
+mostly overlap downloads with model time. Results already in the output
+file are skipped, so an interrupted run picks up where it stopped;
+failed URLs are tried again.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import llm_scheduler
+import pipeline
+from jobs import Job, JobCancelled
+from llm_backends import BACKENDS
+from summarizer import MAP_CONCURRENCY
+
+
+def read_tasks(lines, crawl=False, max_pages=pipeline.CRAWL_MAX_PAGES, incremental=False):
+    """Yield (line number, task dict) for every URL in a text or JSONL input"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            try:
+                task = json.loads(line)
+            except ValueError:
+                task = {'url': line}
+        else:
+            task = {'url': line}
+        task.setdefault('crawl', crawl)
+        task.setdefault('question', None)
+        task.setdefault('max_pages', max_pages)
+        task.setdefault('incremental', incremental)
+        yield number, task
+
+
+def task_key(task):
+    return json.dumps([task.get('url'), bool(task.get('crawl')), task.get('question')])
+
+
+def load_finished(path):
+    """Return keys of tasks that succeeded in an earlier run, repairing a torn last line"""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            # The previous run was killed mid-write; drop the partial record
+            f.truncate(data.rfind(b'\n') + 1)
+            data = data[:data.rfind(b'\n') + 1]
+    for line in data.decode('utf-8', 'replace').splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('success'):
+            finished.add(task_key({**record, 'crawl': record.get('mode') == 'crawl'}))
+    return finished
+
+
+def run_task(job, number, task):
+    result = pipeline.summarize_url(
+        task['url'], crawl=task['crawl'], question=task['question'], max_pages=task['max_pages'], job=job,
+        incremental=task['incremental'],
+    )
+    result['line'] = number
+    if task['question']:
+        result['question'] = task['question']
+    return result
+
+
+def run_batch(tasks, out, workers=4, finished=(), log=sys.stderr):
+    """Summarize tasks with a worker pool, writing JSON lines to `out`; return counts"""
+    counts = {'succeeded': 0, 'failed': 0, 'skipped': 0}
+    pending = {}   # future -> job
+    start = time.perf_counter()
+
+    def write(future):
+        job = pending.pop(future)
+        try:
+            result = future.result()
+        except JobCancelled:
+            return
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        out.flush()
+        counts['succeeded' if result['success'] else 'failed'] += 1
+        done = counts['succeeded'] + counts['failed']
+        status = 'ok' if result['success'] else f"failed: {result.get('error')}"
+        print(f"[{done}] {job.description} {status} ({result['seconds']:.1f}s)", file=log)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for number, task in tasks:
+            if task_key(task) in finished:
+                counts['skipped'] += 1
+                continue
+            # Keep a bounded window in flight so huge inputs are streamed, not queued up front
+            while len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future)
+            job = Job(number, task['url'])
+            pending[executor.submit(run_task, job, number, task)] = job
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                write(future)
+    except KeyboardInterrupt:
+        # Unfinished URLs aren't written, so the next run retries them
+        for job in pending.values():
+            job.cancel()
+        print(f"Interrupted; {len(pending)} URLs in progress will be retried on resume", file=log)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        counts['seconds'] = time.perf_counter() - start
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('input', help='file with one URL or JSON object per line ("-" for stdin)')
+    parser.add_argument('-o', '--output', default='-', help='JSONL file to append results to (default: stdout)')
+    parser.add_argument('--workers', type=int, default=4, help='URLs processed at once')
+    parser.add_argument('--model-concurrency', type=int, default=llm_scheduler.DEFAULT_MAX_CONCURRENT,
+                        help="model calls at once (match the Ollama host's OLLAMA_NUM_PARALLEL)")
+    parser.add_argument('--crawl', action='store_true', help='crawl each site instead of summarizing one page')
+    parser.add_argument('--max-pages', type=int, default=pipeline.CRAWL_MAX_PAGES, help='pages per crawl')
+    parser.add_argument('--incremental', action='store_true',
+                        help='crawl each site and summarize what changed since its last incremental crawl '
+                             '(write each run to a new output file, or pass --no-resume)')
+    parser.add_argument('--backend', default=pipeline.LLM_BACKEND, choices=sorted(BACKENDS), help='model backend')
+    parser.add_argument('--model', help="model name (default: the pipeline's model, or the backend's own default "
+                                        "when --backend differs)")
+    parser.add_argument('--no-resume', action='store_true', help='redo URLs already in the output file')
+    args = parser.parse_args()
+
+    if args.backend != pipeline.LLM_BACKEND:
+        # BACKEND_SETTINGS and MODEL_NAME belong to the default backend
+        pipeline.LLM_BACKEND, pipeline.BACKEND_SETTINGS = args.backend, {}
+        pipeline.MODEL_NAME = BACKENDS[args.backend].default_model
+    if args.model:
+        pipeline.MODEL_NAME = args.model
+    # A batch waits for the model instead of being turned away
+    llm_scheduler.configure(max_concurrent=args.model_concurrency,
+                            max_queue=args.workers * (MAP_CONCURRENCY + 1))
+
+    finished = set()
+    if args.output != '-' and not args.no_resume:
+        finished = load_finished(args.output)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+    try:
+        counts = run_batch(read_tasks(source, args.crawl or args.incremental, args.max_pages, args.incremental), out, workers=args.workers,
+                           finished=finished)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    processed = counts['succeeded'] + counts['failed']
+    print(
+        f"{counts['succeeded']} succeeded, {counts['failed']} failed, {counts['skipped']} already done; "
+        f"{processed / counts['seconds'] * 60:.1f} URLs/min",
+        file=sys.stderr,
+    )
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
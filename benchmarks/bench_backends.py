@@ -0,0 +1,93 @@
+"""
+Model backend benchmark.
+
+For the in-process fake backend and the Ollama backend (against a fake
+Ollama server), reports the cost of one call to an instant model (the
+backend wrapper, plus the HTTP round trip for Ollama), sequential
+streaming latency and time to first token, and the wall time of N
+concurrent async calls against N sequential sync ones. Ollama's async
+calls run on the default thread pool, so their concurrency is capped by
+its size (min(32, CPUs + 4)). When
+google-generativeai is installed, also times what the terminal chatbot
+used to pay on every message (genai.configure plus a new
+GenerativeModel) against a backend built once; no request is sent.
+
+Usage: python benchmarks/bench_backends.py [--calls 20] [--model-delay 0.1]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fixtures import FakeOllamaServer
+
+from llm_backends import FakeBackend, OllamaBackend
+
+MESSAGES = [{"role": "system", "content": "You are terse."}, {"role": "user", "content": "Say hello"}]
+
+
+def overhead(backend, calls=2000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        backend.complete(MESSAGES)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def sequential(backend, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        list(backend.stream(MESSAGES))
+    return time.perf_counter() - start
+
+
+async def concurrent(backend, calls):
+    start = time.perf_counter()
+    await asyncio.gather(*(backend.acomplete(MESSAGES) for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+def gemini_construction(turns=20):
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        return None
+    start = time.perf_counter()
+    for _ in range(turns):
+        genai.configure(api_key="benchmark-key")
+        genai.GenerativeModel("gemini-2.5-flash")
+    return (time.perf_counter() - start) / turns * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20, help='calls per measurement')
+    parser.add_argument('--model-delay', type=float, default=0.1, help='time to first token of the fake models (s)')
+    args = parser.parse_args()
+
+    reply = ' '.join(f'word{i}' for i in range(20))
+    print(f"{'backend':<8} {'instant us':>12} {'p50 s':>6} {'p50 TTFT s':>11} "
+          f"{'sync x' + str(args.calls) + ' s':>11} {'async x' + str(args.calls) + ' s':>12}")
+    with FakeOllamaServer(reply=reply) as instant_server, \
+            FakeOllamaServer(reply=reply, first_token_delay=args.model_delay, parallel=args.calls) as server:
+        backends = (
+            (FakeBackend(reply=reply), FakeBackend(reply=reply, first_token_delay=args.model_delay)),
+            (OllamaBackend('fake', base_url=instant_server.base_url),
+             OllamaBackend('fake', base_url=server.base_url)),
+        )
+        for instant, timed in backends:
+            cost = overhead(instant, 2000 if instant.name == 'fake' else 50)
+            sync_s = sequential(timed, args.calls)
+            async_s = asyncio.run(concurrent(timed, args.calls))
+            stats = timed.stats()
+            print(f"{timed.name:<8} {cost:>12.0f} {stats['p50_latency']:>6.3f} {stats['p50_first_token']:>11.3f} "
+                  f"{sync_s:>11.2f} {async_s:>12.2f}")
+
+    per_turn = gemini_construction()
+    if per_turn is None:
+        print("\ngemini: google-generativeai not installed, client construction not measured")
+    else:
+        print(f"\ngemini: configure + GenerativeModel per message {per_turn:.2f} ms; reused backend 0 ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Batch summarization throughput benchmark.
+
+Runs batch_summarize.run_batch over a list of fixture-site URLs against a
+fake Ollama server that evaluates two requests at once (like
+OLLAMA_NUM_PARALLEL=2), at several worker counts, and reports URLs per
+minute. Downloads are slow enough that extra workers pay off by
+overlapping them with model time; beyond the model's parallelism they
+only queue. The page and response caches are disabled.
+
+Usage: python benchmarks/bench_batch.py [--urls 40] [--workers 1,2,4,8]
+"""
+
+import argparse
+import io
+
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+import llm_scheduler
+import page_cache
+import pipeline
+from batch_summarize import read_tasks, run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--urls', type=int, default=40, help='URLs per batch')
+    parser.add_argument('--workers', default='1,2,4,8', help='comma-separated worker counts')
+    parser.add_argument('--latency', type=float, default=0.3, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.2, help='fake model time per request (s)')
+    args = parser.parse_args()
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    pipeline.USE_LLM_CACHE = False
+
+    with FixtureServer(make_site(args.urls), latency=args.latency) as site, \
+            FakeOllamaServer(first_token_delay=args.model_delay, parallel=2) as model:
+        pipeline.BACKEND_SETTINGS = {'base_url': model.base_url}
+        urls = [f'{site.base_url}/page/{i}' for i in range(args.urls)]
+
+        print(f"{'workers':>8} {'succeeded':>10} {'seconds':>8} {'URLs/min':>9}")
+        for workers in [int(x) for x in args.workers.split(',')]:
+            llm_scheduler.configure(max_concurrent=2, max_queue=workers * 5)
+            counts = run_batch(read_tasks(urls), io.StringIO(), workers=workers, log=io.StringIO())
+            rate = (counts['succeeded'] + counts['failed']) / counts['seconds'] * 60
+            print(f"{workers:>8} {counts['succeeded']:>10} {counts['seconds']:>8.2f} {rate:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
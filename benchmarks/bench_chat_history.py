@@ -0,0 +1,90 @@
+"""
+Chat history memory and render-time benchmark.
+
+Fills the legacy list of (sender, message) tuples and a ChatHistory with
+the same session of short questions and summary-sized replies, then
+reports the memory each holds (tracemalloc), the time to build the chat
+bubble HTML a rerun renders, and the size of the conversation context
+sent with the next prompt.
+
+Usage: python benchmarks/bench_chat_history.py [--turns 10,100,1000] [--reply-chars 4000]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import fixtures  # noqa: F401  (puts the app modules on sys.path)
+
+from chat_history import ChatHistory, format_transcript
+
+WORDS = ('site', 'page', 'summary', 'pricing', 'docs', 'install', 'security', 'api', 'release',
+         'support', 'the', 'and', 'of', 'with', 'covers', 'section', 'overview', 'details')
+
+
+def make_session(turns, reply_chars, seed=0):
+    rng = random.Random(seed)
+    messages = []
+    for i in range(turns // 2):
+        messages.append(("You", f"Question {i}: what does https://example.test/{i} say about pricing?"))
+        reply = ' '.join(rng.choice(WORDS) for _ in range(reply_chars // 5))
+        messages.append(("Bot", reply[:reply_chars]))
+    return messages
+
+
+def render(history):
+    # The same f-strings the apps pass to st.markdown on every rerun
+    html = []
+    for sender, message in history:
+        if sender == "You":
+            html.append(f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>")
+        else:
+            html.append(f"<div class='bot-bubble'><b>🤖 AI:</b> {message}</div>")
+    return html
+
+
+def measure(factory, messages):
+    tracemalloc.start()
+    history = factory(messages)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(5):
+        render(history)
+    render_ms = (time.perf_counter() - start) / 5 * 1000
+    return history, memory, render_ms
+
+
+def legacy(messages):
+    # ''.join copies each message so every store owns its strings
+    return [(sender, ''.join(message)) for sender, message in messages]
+
+
+def compact(messages):
+    history = ChatHistory()
+    for sender, message in messages:
+        history.append(sender, ''.join(message))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--turns', default='10,100,1000', help='comma-separated message counts')
+    parser.add_argument('--reply-chars', type=int, default=4000, help='characters per bot reply')
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'list KB':>8} {'compact KB':>11} {'list render ms':>15} "
+          f"{'compact render ms':>18} {'context chars':>14}")
+    for count in [int(x) for x in args.turns.split(',')]:
+        messages = make_session(count, args.reply_chars)
+        _, list_memory, list_ms = measure(legacy, messages)
+        history, compact_memory, compact_ms = measure(compact, messages)
+        context = format_transcript(history.build_context(), {'You': 'User', 'Bot': 'AI'})
+        print(f"{count:>6} {list_memory / 1024:>8.0f} {compact_memory / 1024:>11.0f} {list_ms:>15.2f} "
+              f"{compact_ms:>18.2f} {len(context):>14}")
+
+
+if __name__ == '__main__':
+    main()
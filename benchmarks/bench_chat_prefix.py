@@ -0,0 +1,73 @@
+"""
+Prompt prefix reuse benchmark for multi-turn conversations.
+
+Plays a conversation of follow-up questions against a fake Ollama server
+that, like Ollama's KV cache, only evaluates the part of each prompt after
+the prefix it shares with the previous prompt. Compares /api/chat messages
+(system prompt, earlier turns, then the new question) with the
+/api/generate prompt string. It also runs a pass where nothing is reused,
+which is what happens once the model has been unloaded (see keep_alive).
+Reports the prompt_eval_duration Ollama would report, summed over the
+conversation.
+
+Usage: python benchmarks/bench_chat_prefix.py [--turns 8] [--eval-rate 4000]
+"""
+
+import argparse
+
+from fixtures import FakeOllamaServer
+
+from chat_history import ChatHistory, format_transcript
+from ollama_client import chat_messages, stream_chat, stream_generate
+
+SYSTEM_PROMPT = (
+    "You are an intelligent web content analyzer and summarizer. " * 12
+).strip()
+PAGE = ' '.join(f"Sentence {i} of the scraped page describes a product feature." for i in range(60))
+
+
+def question(turn):
+    if turn == 0:
+        return f"Please analyze and summarize the following website content:\n\n{PAGE}"
+    return f"Follow-up question {turn}: what does the page say about feature {turn * 7}?"
+
+
+def converse(server, api, turns):
+    history = ChatHistory()
+    total_eval = 0.0
+    ttfts = []
+    for turn in range(turns):
+        context = history.build_context(budget_tokens=4096, max_turn_tokens=1024)
+        metrics = {}
+        if api == 'chat':
+            messages = chat_messages(SYSTEM_PROMPT, context, question(turn))
+            reply = ''.join(stream_chat(f'{server.base_url}/api/chat', 'fake', messages, metrics=metrics))
+        else:
+            transcript = format_transcript(context, {'You': 'User', 'Bot': 'AI'})
+            prompt = f"{SYSTEM_PROMPT}\n\nConversation so far:\n{transcript}\n\nUser Query: {question(turn)}\n\nAI Response:"
+            reply = ''.join(stream_generate(f'{server.base_url}/api/generate', 'fake', prompt, metrics=metrics))
+        history.append("You", question(turn))
+        history.append("Bot", reply.strip())
+        total_eval += metrics['prompt_eval_duration'] / 1e9
+        ttfts.append(metrics['time_to_first_token'])
+    return total_eval, sum(ttfts) / len(ttfts), server.keep_alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--turns', type=int, default=8, help='questions in the conversation')
+    parser.add_argument('--eval-rate', type=float, default=4000, help='prompt characters evaluated per second')
+    args = parser.parse_args()
+
+    reply = ' '.join(f'answer{i}' for i in range(30))
+    print(f"{'mode':<20} {'prompt eval s':>14} {'mean TTFT s':>12} {'keep_alive':>11}")
+    for name, api, prefix_cache in (('chat, prefix reused', 'chat', True),
+                                    ('generate, reused', 'generate', True),
+                                    ('chat, model reloaded', 'chat', False)):
+        with FakeOllamaServer(reply=reply, prompt_eval_rate=args.eval_rate, prefix_cache=prefix_cache) as server:
+            total_eval, ttft, keep_alive = converse(server, api, args.turns)
+        print(f"{name:<20} {total_eval:>14.2f} {ttft:>12.3f} {str(keep_alive):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks for extraction.extract_page.
+
+Times extract_page per page for each rule preset on flat, nested and
+boilerplate-heavy fixture pages (best of several runs), so per-page
+extraction cost can be tracked from commit to commit. Use --json to append
+a timestamped result line to a history file.
+
+Usage: python benchmarks/bench_extract_page.py [--number 50] [--json history.jsonl]
+"""
+
+import argparse
+import json
+import subprocess
+import time
+import timeit
+
+from fixtures import ROOT, make_nested_page, make_site
+
+from extraction import CRAWL_RULES, EXTRACTOR_VERSION, SCRAPE_RULES, extract_page
+
+
+def boilerplate_page():
+    banner = '<div class="cookie-banner">We use cookies to improve your experience on this site.</div>'
+    share = '<div class="social-share">' + '<a href="/s">Share on a network</a>' * 20 + '</div>'
+    body = ''.join(
+        f'<p>Article paragraph {i} with enough body text to pass the minimum length filter.</p>'
+        for i in range(60)
+    )
+    return (
+        f'<html><head><title>Boilerplate</title></head><body>{banner}<header>Header</header>'
+        f'<nav>{"<a href=/x>Menu</a>" * 50}</nav><main><article>{body}</article>{share}</main>'
+        f'<aside class="sidebar">{"<p>Related link text that is fairly long too.</p>" * 30}</aside>'
+        f'<footer>All rights reserved.</footer></body></html>'
+    )
+
+
+CASES = {
+    'flat': make_site(num_pages=1, paragraphs=60)['/page/0'],
+    'nested': make_nested_page(depth=10),
+    'boilerplate': boilerplate_page(),
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=50, help='calls per timing run')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs (best is kept)')
+    parser.add_argument('--json', help='append results as one JSON line to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<12} {'rules':<8} {'us/page':>9} {'chars':>7}")
+    for case, html in CASES.items():
+        body = html.encode('utf-8')
+        for rules in (SCRAPE_RULES, CRAWL_RULES):
+            runs = timeit.repeat(lambda: extract_page(body, rules=rules), number=args.number, repeat=args.repeat)
+            us = min(runs) / args.number * 1e6
+            chars = len(extract_page(body, rules=rules)['content'])
+            results[f'{case}/{rules.name}'] = round(us, 1)
+            print(f"{case:<12} {rules.name:<8} {us:>9.1f} {chars:>7}")
+
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'revision': git_revision(),
+                'extractor': EXTRACTOR_VERSION,
+                'us_per_page': results,
+            }) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Extraction benchmark: legacy BeautifulSoup find_all/get_text vs. lxml single pass.
+
+Runs both extractors over a corpus of HTML pages and reports ms/page and
+total output characters. Uses generated flat and deeply nested pages by
+default; pass --corpus DIR to use saved .html files instead.
+
+Usage: python benchmarks/bench_extraction.py [--corpus DIR] [--repeat 5]
+"""
+
+import argparse
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+from fixtures import make_corpus
+
+from extraction import SCRAPE_RULES, extract_page
+
+
+def legacy_extract(body, min_length=50):
+    """The original scrape_website extraction, without the output cap"""
+    soup = BeautifulSoup(body, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+    title = soup.title.string if soup.title else "No title found"
+    text_content = []
+    for tag in soup.find_all(['article', 'main', 'div', 'section', 'p', 'h1', 'h2', 'h3']):
+        text = tag.get_text(strip=True)
+        if len(text) > min_length:
+            text_content.append(text)
+    return title, re.sub(r'\s+', ' ', ' '.join(text_content)).strip()
+
+
+def lxml_extract(body):
+    extracted = extract_page(body, budget=10 ** 9, rules=SCRAPE_RULES)
+    return extracted['title'], extracted['content']
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+
+def run(extract, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [extract(body) for _, body in corpus]
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * len(corpus)), sum(len(text) for _, text in outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corpus', help='directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the corpus')
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(name, page.encode('utf-8')) for name, page in make_corpus()]
+    size_kb = sum(len(body) for _, body in corpus) / 1024
+
+    print(f"corpus: {len(corpus)} pages, {size_kb:.0f} KB")
+    print(f"{'extractor':<10} {'ms/page':>8} {'output chars':>13}")
+    for label, extract in (('legacy', legacy_extract), ('lxml', lxml_extract)):
+        ms, chars = run(extract, corpus, args.repeat)
+        print(f"{label:<10} {ms:>8.2f} {chars:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Crawl frontier benchmark: useful pages per request.
+
+Serves a fixture site shaped like a real one: every article is linked in
+several forms (trailing slash, index.html, ?utm_ tracking queries), pages
+carry account bar links to login, legal and cart pages, some links point at
+PDFs and images, robots.txt disallows a private section, and sitemap.xml
+lists articles the start page doesn't link to. Crawls it with the old
+breadth-first loop (a deque of scheme://host/path URLs, the first five
+links of each page) and with the scored frontier, then reports the requests each sent
+and how many distinct articles those requests returned.
+
+Usage: python benchmarks/bench_frontier.py [--articles 40] [--pages 15]
+"""
+
+import argparse
+import time
+from collections import deque
+from urllib.parse import urljoin, urlparse
+
+from fixtures import FixtureServer
+
+import page_cache
+from crawler import run_crawl
+from extraction import CRAWL_RULES, extract_page
+from http_session import get_session
+
+# An account bar outside <nav>, so extraction keeps its links
+BAR = '<div class="account">' + ''.join(f'<a href="/{path}">{path.title()}</a>' for path in
+              ('login', 'signup', 'privacy', 'terms', 'cart', 'account', 'private/admin')) + '</div>'
+PARAGRAPH = 'Article {i} explains topic {topic} in enough words to pass the extraction filter of the crawler.'
+
+
+def article(i, linked):
+    # Articles only link into the first `linked` articles, so the rest are reachable only via the sitemap
+    targets = [(i * 3 + k) % linked for k in range(1, 4)]
+    links = ''.join(
+        f'<a href="/docs/article-{n}/">Article {n}</a>'
+        f'<a href="/docs/article-{n}/index.html">Read article {n}</a>'
+        f'<a href="/docs/article-{n}?utm_source=related">Related: article {n}</a>'
+        f'<a href="/files/article-{n}.pdf">PDF</a><a href="/images/article-{n}.png">Figure</a>'
+        for n in targets
+    )
+    body = ''.join(f'<p>{PARAGRAPH.format(i=i, topic=i % 5)} ({k})</p>' for k in range(6))
+    return (f'<html><head><title>Article {i}</title></head><body>'
+            f'<main><article><h1>Article {i}</h1>{body}</article><div>{links}</div></main>{BAR}</body></html>')
+
+
+def make_site(articles, sitemap_only):
+    pages = {}
+    linked = articles - sitemap_only
+    for i in range(articles):
+        html = article(i, linked)
+        for path in (f'/docs/article-{i}', f'/docs/article-{i}/', f'/docs/article-{i}/index.html'):
+            pages[path] = html
+        pages[f'/files/article-{i}.pdf'] = '%PDF-1.4 ' + 'x' * 2000
+        pages[f'/images/article-{i}.png'] = 'PNG' + 'x' * 2000
+    filler = '<p>Account, legal and checkout text that is long enough to be extracted as a page.</p>' * 4
+    for path in ('login', 'signup', 'privacy', 'terms', 'cart', 'account', 'private/admin'):
+        pages[f'/{path}'] = f'<html><body><main>{filler}</main>{BAR}</body></html>'
+    home_links = ''.join(f'<a href="/docs/article-{i}/">Article {i}</a>' for i in range(0, linked, 4))
+    pages['/'] = pages['/index.html'] = (
+        f'<html><body><main><h1>Docs</h1>'
+        f'<p>{PARAGRAPH.format(i="index", topic="all")}</p>{home_links}</main>{BAR}</body></html>'
+    )
+    pages['/robots.txt'] = 'User-agent: *\nDisallow: /private/\nSitemap: /sitemap.xml\n'
+    pages['/sitemap.xml'] = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<url><loc>{{base}}/docs/article-{i}</loc></url>' for i in range(linked, articles))
+        + '</urlset>'
+    )
+    return pages
+
+
+class LoggingServer(FixtureServer):
+    """FixtureServer that records the body returned for every GET"""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.served = []
+
+    def handle_get(self, handler):
+        with self._lock:
+            self.served.append(self.pages.get(handler.path.split('?')[0]))
+        super().handle_get(handler)
+
+
+def legacy_crawl(start_url, max_pages):
+    """The breadth-first loop crawl_website used before the frontier"""
+    session = get_session()
+    visited = set()
+    to_visit = deque([start_url])
+    pages = 0
+    while to_visit and pages < max_pages:
+        url = to_visit.popleft()
+        if url in visited:
+            continue
+        visited.add(url)
+        response = session.get(url, timeout=10)
+        if response.status_code != 200:
+            continue
+        pages += 1
+        links = {}
+        for href, _ in extract_page(response.content, rules=CRAWL_RULES)['links']:
+            parsed = urlparse(urljoin(url, href))
+            if parsed.netloc == urlparse(url).netloc:
+                links[f"{parsed.scheme}://{parsed.netloc}{parsed.path}"] = None
+                if len(links) >= 5:
+                    break
+        to_visit.extend(link for link in links if link not in visited)
+
+
+def report(name, server, elapsed):
+    articles = {body for body in server.served if body and '<h1>Article' in body}
+    useful = len(articles)
+    print(f"{name:<10} {server.requests_served:>9} {useful:>9} {useful / max(server.requests_served, 1):>13.2f} "
+          f"{elapsed:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--articles', type=int, default=40, help='articles on the fixture site')
+    parser.add_argument('--sitemap-only', type=int, default=5, help='articles only listed in sitemap.xml')
+    parser.add_argument('--pages', type=int, default=15, help='max_pages per crawl')
+    parser.add_argument('--query', default='article topic', help='question steering the frontier')
+    args = parser.parse_args()
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    pages = make_site(args.articles, args.sitemap_only)
+
+    print(f"{'crawler':<10} {'requests':>9} {'articles':>9} {'per request':>13} {'wall s':>7}")
+    with LoggingServer(pages) as server:
+        start = time.perf_counter()
+        legacy_crawl(f'{server.base_url}/', args.pages)
+        report('bfs', server, time.perf_counter() - start)
+
+    with LoggingServer(pages) as server:
+        pages['/sitemap.xml'] = pages['/sitemap.xml'].replace('{base}', server.base_url)
+        start = time.perf_counter()
+        run_crawl(f'{server.base_url}/', max_pages=args.pages, per_host_delay=0, query=args.query)
+        report('frontier', server, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Connection pooling benchmark.
+
+Compares one-off requests.get/requests.post calls with the shared pooled
+session from http_session, counting TCP connections opened on a local
+stub server and the per-request latency of page fetches and Ollama calls.
+
+Usage: python benchmarks/bench_http_session.py [--requests 200]
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+from http_session import build_session
+
+
+def run(server, call, count):
+    """Issue `count` calls and return (connections opened, latencies)"""
+    opened_before = server.connections_opened
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return server.connections_opened - opened_before, latencies
+
+
+def report(label, connections, latencies):
+    latencies_ms = sorted(x * 1000 for x in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(f"{label:<28} {connections:>6} {statistics.mean(latencies_ms):>9.2f} {p95:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    args = parser.parse_args()
+
+    session = build_session()
+    payload = {'model': 'fake', 'prompt': 'hello', 'stream': False}
+
+    print(f"{'scenario':<28} {'conns':>6} {'mean ms':>9} {'p95 ms':>9}")
+    with FixtureServer(make_site(num_pages=10)) as pages:
+        url = f'{pages.base_url}/page/1'
+        report('page fetch, one-off', *run(pages, lambda: requests.get(url, timeout=10), args.requests))
+        report('page fetch, pooled', *run(pages, lambda: session.get(url), args.requests))
+
+    with FakeOllamaServer() as ollama:
+        url = f'{ollama.base_url}/api/generate'
+        report('ollama call, one-off', *run(ollama, lambda: requests.post(url, json=payload), args.requests))
+        report('ollama call, pooled', *run(ollama, lambda: session.post(url, json=payload), args.requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Large page benchmark: full download + BeautifulSoup vs. streamed, budgeted extraction.
+
+Serves a multi-megabyte HTML page (and a PDF) from a local fixture server
+and fetches it in two modes, each in a fresh subprocess so peak RSS is
+measured independently:
+
+  legacy     requests.get -> response.content -> BeautifulSoup -> find_all
+  streaming  page cache stream=True -> extract_page, stops at 8000 chars
+
+Usage: python benchmarks/bench_large_pages.py [--mb 10]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from fixtures import FixtureServer, send_body
+
+BUDGET = 8000
+
+
+def make_large_page(mb):
+    paragraph = '<p>' + 'Large fixture page text that keeps going and going. ' * 10 + '</p>'
+    count = mb * 1024 * 1024 // len(paragraph)
+    return f'<html><head><title>Large page</title></head><body><main>{paragraph * count}</main></body></html>'
+
+
+def run_legacy(url):
+    import re
+
+    import requests
+    from bs4 import BeautifulSoup
+
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.content, 'html.parser')
+    text_content = []
+    for tag in soup.find_all(['article', 'main', 'div', 'section', 'p', 'h1', 'h2', 'h3']):
+        text = tag.get_text(strip=True)
+        if len(text) > 50:
+            text_content.append(text)
+    return re.sub(r'\s+', ' ', ' '.join(text_content)).strip()[:BUDGET]
+
+
+def run_streaming(url):
+    from extraction import SCRAPE_RULES, extract_page
+    from page_cache import PageCache
+
+    def extract(page_url, chunks, encoding=None):
+        return extract_page(chunks, budget=BUDGET, rules=SCRAPE_RULES, encoding=encoding)['content']
+
+    return PageCache(path=':memory:').fetch(url, extract, kind='bench', timeout=60)
+
+
+def child(mode, url):
+    start = time.perf_counter()
+    process_start = time.process_time()
+    try:
+        output = (run_legacy if mode == 'legacy' else run_streaming)(url)
+        status = f'{len(output)} chars'
+    except Exception as e:
+        status = f'error: {e}'
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'cpu': time.process_time() - process_start,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'status': status,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mb', type=int, default=10, help='size of the large page in MB')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'URL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    pages = {
+        '/large.html': make_large_page(args.mb),
+        '/report.pdf': '%PDF-1.4 ' + 'x' * (args.mb * 1024 * 1024),
+    }
+    with FixtureServer(pages) as server:
+        # Serve the PDF with its real content type
+        original = server.handle_get
+
+        def handle_get(handler):
+            if handler.path.endswith('.pdf'):
+                send_body(handler, 200, pages['/report.pdf'].encode('latin-1'), 'application/pdf')
+            else:
+                original(handler)
+
+        server.handle_get = handle_get
+
+        print(f"{'page':<12} {'mode':<10} {'seconds':>8} {'cpu s':>7} {'peak RSS MB':>12}  result")
+        for path in ('/large.html', '/report.pdf'):
+            for mode in ('legacy', 'streaming'):
+                out = subprocess.run(
+                    [sys.executable, __file__, '--child', mode, server.base_url + path],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{path[1:]:<12} {mode:<10} {r['seconds']:>8.2f} {r['cpu']:>7.2f} "
+                      f"{r['peak_rss_mb']:>12.1f}  {r['status'][:60]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Multi-URL message benchmark.
+
+Answers a message with N fixture-site URLs (one of them missing) two ways:
+one message per URL, each scraped and summarized in turn, as users had
+to before; and one message, with the pages scraped in parallel by
+pipeline.scrape_websites and compared in a single model call by
+pipeline.compare_pages. Reports seconds, model calls and the largest
+prompt sent. The page and response caches are disabled.
+
+Usage: python benchmarks/bench_multi_url.py [--urls 5] [--latency 0.3]
+"""
+
+import argparse
+import time
+
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+import page_cache
+import pipeline
+from jobs import Job
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--urls', type=int, default=5, help='URLs in the message')
+    parser.add_argument('--latency', type=float, default=0.3, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.2, help='fake model time per request (s)')
+    args = parser.parse_args()
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    pipeline.USE_LLM_CACHE = False
+    prompts = []
+    get_model_response = pipeline.get_model_response
+
+    def counting_response(prompt, *args, **kwargs):
+        prompts.append(len(prompt))
+        return get_model_response(prompt, *args, **kwargs)
+
+    pipeline.get_model_response = counting_response
+
+    with FixtureServer(make_site(args.urls), latency=args.latency) as site, \
+            FakeOllamaServer(first_token_delay=args.model_delay, parallel=2) as model:
+        pipeline.BACKEND_SETTINGS = {'base_url': model.base_url}
+        urls = [f'{site.base_url}/page/{i}' for i in range(args.urls - 1)] + [f'{site.base_url}/missing']
+
+        print(f"{'mode':<18} {'seconds':>8} {'model calls':>12} {'largest prompt':>15} {'failed':>7}")
+        for mode in ('one per message', 'parallel compare'):
+            prompts.clear()
+            job = Job(None, mode)
+            start = time.perf_counter()
+            if mode == 'one per message':
+                scraped = [pipeline.scrape_website(url) for url in urls]
+                for page in scraped:
+                    if page['success']:
+                        pipeline.summarize_page(job, page)
+            else:
+                scraped = pipeline.scrape_websites(job, urls)
+                pipeline.compare_pages(job, scraped)
+            seconds = time.perf_counter() - start
+            failed = sum(1 for page in scraped if not page['success'])
+            print(f"{mode:<18} {seconds:>8.2f} {len(prompts):>12} {max(prompts):>15} {failed:>7}")
+
+
+if __name__ == '__main__':
+    main()
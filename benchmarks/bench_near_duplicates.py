@@ -0,0 +1,158 @@
+"""
+Near-duplicate detection benchmark.
+
+Builds a corpus of distinct pages plus injected copies of some of them:
+exact copies, print views (extra header and footer lines), pagination and
+session variants (a changed date and counter) and pages whose "related
+posts" box differs. Reports fingerprinting throughput, how many copies an
+exact content hash and the MinHash index catch, false matches between
+distinct pages, and lookup time against comparing every pair of pages.
+Then crawls a fixture site whose articles link to print views and
+paginated copies, with and without near-duplicate filtering, and reports
+the distinct articles among the pages kept and the prompt characters
+spent on repeated copies.
+
+Usage: python benchmarks/bench_near_duplicates.py [--pages 500] [--copies 0.3]
+"""
+
+import argparse
+import hashlib
+import random
+import time
+
+from fixtures import FixtureServer
+
+import page_cache
+from crawler import run_crawl
+from near_duplicates import MinHashIndex, fingerprint, similarity
+
+VOCABULARY = [f'term{i}' for i in range(3000)]
+# Zipf word frequencies, so distinct pages still share their common words
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def make_text(rng, words=450):
+    return ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=words))
+
+
+def make_copy(rng, text, kind):
+    if kind == 'exact':
+        return text
+    if kind == 'print':
+        return f"Printer friendly version. {text} Printed on 2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}."
+    if kind == 'session':
+        return f"Updated {rng.randint(1, 28)} March, {rng.randint(100, 999)} views. {text}"
+    words = text.split()
+    # A different related-posts box: about 5% of the words replaced at the end
+    return ' '.join(words[:-len(words) // 20] + [rng.choice(VOCABULARY) for _ in range(len(words) // 20)])
+
+
+def make_corpus(pages, copies, seed=0):
+    rng = random.Random(seed)
+    corpus = [(f'page-{i}', make_text(rng), None) for i in range(pages)]
+    for i in range(int(pages * copies)):
+        key, text, _ = rng.choice(corpus[:pages])
+        kind = ('exact', 'print', 'session', 'related')[i % 4]
+        corpus.append((f'{key}-{kind}-{i}', make_copy(rng, text, kind), key))
+    # Originals first, as a crawl usually reaches the linked page before its variants
+    return corpus
+
+
+def detect(corpus):
+    start = time.perf_counter()
+    prints = [(key, fingerprint(text), original) for key, text, original in corpus]
+    fingerprint_s = time.perf_counter() - start
+
+    exact, index = set(), MinHashIndex()
+    hash_caught = caught = false = 0
+    start = time.perf_counter()
+    for key, signature, original in prints:
+        match = index.find(signature)
+        if match is None:
+            index.add(key, signature)
+        elif original is None:
+            false += 1
+        else:
+            caught += 1
+    lookup_s = time.perf_counter() - start
+    for key, text, original in corpus:
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        if digest in exact and original is not None:
+            hash_caught += 1
+        exact.add(digest)
+
+    # Every new page compared with every page kept before it
+    start = time.perf_counter()
+    kept = []
+    for _, signature, _ in prints:
+        if not any(similarity(signature, other) >= index.threshold for other in kept):
+            kept.append(signature)
+    pairwise_s = time.perf_counter() - start
+    return fingerprint_s, hash_caught, caught, false, lookup_s, pairwise_s
+
+
+def make_site(articles, seed=1):
+    rng = random.Random(seed)
+    pages = {}
+    for i in range(articles):
+        text = make_text(rng, 300)
+        body = ''.join(f'<p>{text[k:k + 400]}</p>' for k in range(0, len(text), 400))
+        links = (f'<a href="/print/article-{i}">Print</a><a href="/article-{i}/page/1">Page 1</a>'
+                 f'<a href="/article-{(i + 1) % articles}">Next article</a>')
+        pages[f'/article-{i}'] = pages[f'/article-{i}/page/1'] = (
+            f'<html><head><title>Article {i}</title></head><body><main><h1>Article {i}</h1>'
+            f'{body}<div>{links}</div></main></body></html>'
+        )
+        pages[f'/print/article-{i}'] = (
+            f'<html><head><title>Article {i} (print)</title></head><body><h1>Article {i}</h1>'
+            f'<p>Printer friendly version.</p>{body}</body></html>'
+        )
+    # Articles are reached one hop at a time, so their copies sit at the same depth as the next article
+    pages['/'] = f'<html><body><main><p>{make_text(rng, 40)}</p><a href="/article-0">Article 0</a></main></body></html>'
+    return pages
+
+
+def crawl(server, max_pages, threshold):
+    start = time.perf_counter()
+    result = run_crawl(f'{server.base_url}/', max_pages=max_pages, per_host_delay=0,
+                       respect_robots=False, use_sitemap=False, similarity_threshold=threshold)
+    elapsed = time.perf_counter() - start
+    articles, repeated = set(), 0
+    for page in result['data']:
+        if not page['title'].startswith('Article'):
+            continue
+        article = page['title'].replace(' (print)', '')
+        if article in articles:
+            repeated += len(page['content'])
+        articles.add(article)
+    return result['stats'], len(result['data']), len(articles), repeated, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=500, help='distinct pages in the corpus')
+    parser.add_argument('--copies', type=float, default=0.3, help='injected copies per distinct page')
+    parser.add_argument('--max-pages', type=int, default=15, help='max_pages for the fixture crawl')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.pages, args.copies)
+    copies = sum(1 for _, _, original in corpus if original is not None)
+    size_mb = sum(len(text) for _, text, _ in corpus) / 1e6
+    fingerprint_s, hash_caught, caught, false, lookup_s, pairwise_s = detect(corpus)
+    print(f"corpus: {len(corpus)} pages ({copies} injected copies, {size_mb:.1f} MB)")
+    print(f"fingerprinting: {len(corpus) / fingerprint_s:,.0f} pages/s ({size_mb / fingerprint_s:.1f} MB/s)")
+    print(f"copies caught: exact hash {hash_caught}/{copies}, MinHash {caught}/{copies}; "
+          f"false matches {false}")
+    print(f"lookups: LSH index {lookup_s * 1000:.0f} ms, all pairs {pairwise_s * 1000:.0f} ms")
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    print(f"\n{'crawl':<12} {'fetched':>8} {'kept':>5} {'articles':>9} {'skipped':>8} {'repeated chars':>15} {'wall s':>7}")
+    with FixtureServer(make_site(args.max_pages * 2)) as server:
+        for name, threshold in (('url only', None), ('near-dup', 0.8)):
+            stats, kept, articles, chars, elapsed = crawl(server, args.max_pages, threshold)
+            print(f"{name:<12} {stats['fetched']:>8} {kept:>5} {articles:>9} "
+                  f"{stats['skipped'].get('near_duplicate', 0):>8} {chars:>15} {elapsed:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
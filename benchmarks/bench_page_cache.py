@@ -0,0 +1,50 @@
+"""
+Page cache benchmark.
+
+Fetches fixture pages cold, then again from a fresh cache entry (no
+network, no parse), then after TTL expiry (conditional revalidation that
+the fixture server answers with 304), and reports ms/page and cache stats.
+
+Usage: python benchmarks/bench_page_cache.py [--pages 50]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from fixtures import FixtureServer, make_site
+
+from crawler import extract_crawl_page
+from page_cache import PageCache
+
+
+def timed_pass(cache, urls):
+    start = time.perf_counter()
+    for url in urls:
+        cache.fetch(url, extract_crawl_page, kind='crawl')
+    return (time.perf_counter() - start) * 1000 / len(urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=50, help='pages per pass')
+    parser.add_argument('--paragraphs', type=int, default=200, help='paragraphs per fixture page')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FixtureServer(make_site(num_pages=args.pages, paragraphs=args.paragraphs)) as server:
+        cache = PageCache(path=os.path.join(tmp, 'pages.sqlite3'), ttl=3600)
+        urls = [f'{server.base_url}/page/{i}' for i in range(args.pages)]
+
+        print(f"{'pass':<14} {'ms/page':>8} {'requests':>9}")
+        for label, ttl in (('cold', 3600), ('fresh hit', 3600), ('revalidated', 0)):
+            cache.ttl = ttl
+            served = server.requests_served
+            ms = timed_pass(cache, urls)
+            print(f"{label:<14} {ms:>8.2f} {server.requests_served - served:>9}")
+        print(cache.stats())
+
+
+if __name__ == '__main__':
+    main()
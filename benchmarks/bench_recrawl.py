@@ -0,0 +1,77 @@
+"""
+Incremental re-crawl benchmark.
+
+Crawls the fixture site once to record its state, changes a few pages,
+then crawls it again two ways: a full crawl and site summary
+(pipeline.summarize_url with crawl=True), and an incremental one
+(incremental=True) that sends conditional requests, skips unchanged
+pages and only summarizes what changed. Reports seconds, CPU seconds,
+full downloads (robots.txt and sitemap lookups included), 304 replies
+and model calls for each. The page, response and summary caches are
+disabled, so the full crawl really redoes its work.
+
+Usage: python benchmarks/bench_recrawl.py [--pages 20] [--changed 0,2,5]
+"""
+
+import argparse
+import time
+
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+import crawl_state
+import page_cache
+import pipeline
+import summarizer
+from jobs import Job
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=20, help='pages per crawl')
+    parser.add_argument('--changed', default='0,2,5', help='comma-separated counts of pages changed between crawls')
+    parser.add_argument('--latency', type=float, default=0.05, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.1, help='fake model time to first token (s)')
+    args = parser.parse_args()
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    summarizer.configure(path=None, ttl=0)
+    pipeline.USE_LLM_CACHE = False
+
+    print(f"{'changed':>7} {'mode':<12} {'seconds':>8} {'CPU s':>6} {'downloads':>10} {'304s':>5} {'model calls':>12}")
+    for changed in [int(x) for x in args.changed.split(',')]:
+        crawl_state.configure(path=':memory:')
+        pages = make_site(args.pages)
+        with FixtureServer(pages, latency=args.latency) as site, \
+                FakeOllamaServer(first_token_delay=args.model_delay, parallel=2) as model:
+            pipeline.BACKEND_SETTINGS = {'base_url': model.base_url}
+            url = f'{site.base_url}/'
+            pipeline.summarize_url(url, crawl=True, incremental=True, max_pages=args.pages)
+
+            for i in range(1, changed + 1):
+                pages[f'/page/{i}'] = pages[f'/page/{i}'].replace('paragraph 3:', 'paragraph 3 (updated today):')
+
+            for mode in ('full', 'incremental'):
+                job = Job(None, mode)
+                requests_before, calls_before = site.requests_served, model.requests_served
+                cpu_start, start = time.process_time(), time.perf_counter()
+                result = pipeline.summarize_url(url, crawl=True, incremental=mode == 'incremental',
+                                                max_pages=args.pages, job=job)
+                seconds, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+                statuses = [entry['attrs'].get('status') for entry in walk(job.trace) if entry['name'] == 'fetch']
+                not_modified = sum(1 for entry in walk(job.trace) if entry['name'] == 'http'
+                                   and entry['attrs'].get('status') == 304)
+                downloads = site.requests_served - requests_before - not_modified
+                print(f"{changed:>7} {mode:<12} {seconds:>8.2f} {cpu:>6.2f} {downloads:>10} {not_modified:>5} "
+                      f"{model.requests_served - calls_before:>12}"
+                      + ('' if result['success'] else f"  failed: {result['error']}")
+                      + (f"  ({statuses.count('changed')} changed)" if mode == 'incremental' else ''))
+
+
+def walk(trace):
+    yield trace
+    for child in trace.get('children', ()):
+        yield from walk(child)
+
+
+if __name__ == '__main__':
+    main()
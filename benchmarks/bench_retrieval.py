@@ -0,0 +1,66 @@
+"""
+Retrieval benchmark for crawl mode.
+
+Indexes synthetic crawled pages with the TF-IDF fallback embedder and
+compares the prompt size of top-k retrieval with the legacy "join every
+page and cut at 12,000 characters" prompt, along with index build time
+and query latency as the crawl grows.
+
+Usage: python benchmarks/bench_retrieval.py [--pages 10,100,500]
+"""
+
+import argparse
+import random
+import time
+
+import fixtures  # noqa: F401  (puts the app modules on sys.path)
+
+from retrieval import TOP_K, HashingTfidfEmbedder, VectorIndex
+
+TOPICS = ['pricing', 'installation', 'security', 'api reference', 'release notes',
+          'tutorial', 'billing', 'support', 'roadmap', 'integrations']
+
+
+def make_pages(count, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        sentences = [
+            f"This page covers {topic} in detail, section {j}, with notes on {rng.choice(TOPICS)}."
+            for j in range(30)
+        ]
+        pages.append({'url': f'https://example.test/{i}', 'title': f'{topic.title()} {i}',
+                      'content': ' '.join(sentences)[:3000]})
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', default='10,100,500', help='comma-separated crawl sizes')
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'chunks':>7} {'index s':>8} {'query ms':>9} "
+          f"{'legacy chars':>13} {'pages kept':>11} {'rag chars':>10}")
+    for count in [int(x) for x in args.pages.split(',')]:
+        pages = make_pages(count)
+        legacy = '\n\n'.join(
+            f"Page: {p['title']}\nURL: {p['url']}\nContent: {p['content']}\n---" for p in pages
+        )[:12000]
+
+        start = time.perf_counter()
+        index = VectorIndex(HashingTfidfEmbedder())
+        index.add_pages(pages)
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = index.search('how does billing and pricing work', k=TOP_K)
+        query_ms = (time.perf_counter() - start) * 1000
+        rag_chars = sum(len(chunk['text']) for _, chunk in results)
+
+        print(f"{count:>6} {len(index.chunks):>7} {index_time:>8.2f} {query_ms:>9.2f} "
+              f"{len(legacy):>13} {legacy.count('URL: '):>11} {rag_chars:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Model queue benchmark.
+
+A burst of crawl summary calls arrives at a fake Ollama server that sleeps
+per request and evaluates `--parallel` requests at once, followed shortly
+by a few chat prompts. Without the scheduler every call goes straight to
+the server and chats wait behind the whole burst; with it chats jump the
+queue. A third run with a small queue shows backpressure: crawl calls are
+rejected, while chats still get through by pushing out queued crawl calls.
+
+Usage: python benchmarks/bench_scheduler.py [--crawl 16] [--chat 4] [--delay 0.2]
+"""
+
+import argparse
+import threading
+import time
+
+from fixtures import FakeOllamaServer
+
+from llm_scheduler import PRIORITY_CHAT, PRIORITY_CRAWL, LLMScheduler, SchedulerBusy
+from ollama_client import generate
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def run(url, crawl_calls, chat_calls, scheduler=None):
+    latencies = {'chat': [], 'crawl': []}
+    rejected = []
+
+    def call(kind, priority):
+        start = time.perf_counter()
+        try:
+            if scheduler is None:
+                generate(url, 'fake', kind)
+            else:
+                with scheduler.slot(priority):
+                    generate(url, 'fake', kind)
+        except SchedulerBusy:
+            rejected.append(kind)
+            return
+        latencies[kind].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=call, args=('crawl', PRIORITY_CRAWL)) for _ in range(crawl_calls)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)  # Chats arrive just after the crawl burst
+    chat_threads = [threading.Thread(target=call, args=('chat', PRIORITY_CHAT)) for _ in range(chat_calls)]
+    for thread in chat_threads:
+        thread.start()
+    for thread in threads + chat_threads:
+        thread.join()
+    return latencies, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--crawl', type=int, default=16, help='crawl summary calls in the burst')
+    parser.add_argument('--chat', type=int, default=4, help='chat prompts arriving after the burst')
+    parser.add_argument('--delay', type=float, default=0.2, help='seconds the fake model sleeps per request')
+    parser.add_argument('--parallel', type=int, default=2, help='requests the fake model evaluates at once')
+    args = parser.parse_args()
+
+    with FakeOllamaServer(reply='ok', first_token_delay=args.delay, parallel=args.parallel) as server:
+        url = f'{server.base_url}/api/generate'
+        modes = [
+            ('direct', None),
+            ('scheduled', LLMScheduler(max_concurrent=args.parallel)),
+            ('queue=4', LLMScheduler(max_concurrent=args.parallel, max_queue=4)),
+        ]
+        print(f"{'mode':<10} {'chat p50':>9} {'chat p95':>9} {'crawl p50':>10} {'crawl p95':>10} {'rejected':>9}")
+        for name, scheduler in modes:
+            latencies, rejected = run(url, args.crawl, args.chat, scheduler)
+            print(f"{name:<10} {percentile(latencies['chat'], 0.5):>9.2f} {percentile(latencies['chat'], 0.95):>9.2f} "
+                  f"{percentile(latencies['crawl'], 0.5):>10.2f} {percentile(latencies['crawl'], 0.95):>10.2f} "
+                  f"{len(rejected):>9}")
+            if scheduler is not None:
+                stats = scheduler.stats()
+                print(f"{'':<10} max depth {stats['max_depth']}, p95 queue wait {stats['p95_wait']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
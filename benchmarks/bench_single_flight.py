@@ -0,0 +1,71 @@
+"""
+Single-flight benchmark for shared links.
+
+Simulates a link posted in a team chat: several sessions scrape the same
+URL and ask the same question at the same moment, against a slow fixture
+site and a fake Ollama server. Reports the requests that reached each
+server and the wall time with and without single-flight deduplication.
+The page cache is disabled so only in-flight sharing is measured.
+
+Usage: python benchmarks/bench_single_flight.py [--sessions 8] [--latency 0.3]
+"""
+
+import argparse
+import threading
+import time
+
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+import page_cache
+from crawler import HEADERS, extract_crawl_page
+from extraction import CRAWL_RULES
+from ollama_client import generate
+from single_flight import SingleFlight
+
+
+def stampede(sessions, task):
+    threads = [threading.Thread(target=task) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=8, help='sessions sending the same link at once')
+    parser.add_argument('--latency', type=float, default=0.3, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.5, help='fake model time per request (s)')
+    args = parser.parse_args()
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    with FixtureServer(make_site(5), latency=args.latency) as site, \
+            FakeOllamaServer(first_token_delay=args.model_delay) as model:
+        page_url = f'{site.base_url}/page/1'
+        model_url = f'{model.base_url}/api/generate'
+
+        def scrape():
+            page_cache.get_page_cache().fetch(page_url, extract_crawl_page, kind=CRAWL_RULES.cache_kind,
+                                              headers=HEADERS, timeout=10)
+
+        def ask():
+            generate(model_url, 'fake', 'Summarize this page')
+
+        print(f"{'mode':<14} {'task':<7} {'requests':>9} {'shared':>7} {'wall s':>7}")
+        for name, flight in (('independent', None), ('single-flight', SingleFlight('bench'))):
+            for task, fn, server, key in (('scrape', scrape, site, page_url), ('answer', ask, model, 'prompt')):
+                before = server.requests_served
+                if flight is None:
+                    wall = stampede(args.sessions, fn)
+                    shared = 0
+                else:
+                    shared_before = flight.shared
+                    wall = stampede(args.sessions, lambda: flight.do(key, fn))
+                    shared = flight.shared - shared_before
+                print(f"{name:<14} {task:<7} {server.requests_served - before:>9} {shared:>7} {wall:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup and rerun cost benchmark for the apps.
+
+Import time: imports each app's modules in a fresh interpreter (best of
+--repeat) and reports whether NumPy got loaded; it is now only imported
+when a crawl builds a retrieval index.
+
+Rerun time: runs a Streamlit script that draws a chat history of N
+messages (long bot replies, so older ones are compressed), once drawing
+every message as its own element from the history, as the apps used to,
+and once with ChatHistory.render(), which keeps the rendered markup and
+only renders new messages. Reports the time per rerun and the number of
+elements sent. Uses streamlit.testing, so no browser is needed.
+
+Usage: python benchmarks/bench_startup.py [--messages 20,100] [--reruns 20]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from fixtures import ROOT
+
+from chat_history import ChatHistory
+
+APP_IMPORTS = {
+    'scraper app': 'import pipeline, jobs, doc_store, chat_history, llm_cache, llm_scheduler, page_cache, tracing',
+    'local host': 'import chat_history, llm_cache, llm_scheduler, llm_backends, ollama_client, tracing',
+    'terminal': 'import ChatBot_api',
+    'streamlit': 'import streamlit',
+}
+
+
+def import_time(statement, repeat):
+    code = (f"import sys, time; start = time.perf_counter(); {statement}; "
+            f"print(time.perf_counter() - start, 'numpy' in sys.modules)")
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        seconds, numpy_loaded = out.stdout.split()
+        runs.append((float(seconds), numpy_loaded == 'True'))
+    return min(runs)
+
+
+def per_message(history):
+    import streamlit as st
+
+    for sender, message in history:
+        if sender == "You":
+            st.markdown(f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>", unsafe_allow_html=True)
+        else:
+            st.markdown(f"<div class='bot-bubble'><b>🤖 AI:</b> {message}</div>", unsafe_allow_html=True)
+
+
+def rendered(history):
+    import streamlit as st
+
+    def render_bubble(sender, message):
+        if sender == "You":
+            return f"<div class='user-bubble'><b>🧑‍💻 You:</b> {message}</div>"
+        return f"<div class='bot-bubble'><b>🤖 AI:</b> {message}</div>"
+
+    if history:
+        st.markdown(history.render(render_bubble), unsafe_allow_html=True)
+
+
+def history_script():
+    import streamlit as st
+
+    st.session_state.draw(st.session_state.history)
+
+
+def rerun_time(draw, messages, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    history = ChatHistory()
+    for i in range(messages // 2):
+        history.append("You", f"https://example.com/page/{i} summarize this")
+        history.append("Bot", f"Summary {i}: " + "the page covers several topics in detail. " * 60)
+    at = AppTest.from_function(history_script)
+    at.session_state.history = history
+    at.session_state.draw = draw
+    at.run()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        at.run()
+    return (time.perf_counter() - start) / reruns * 1000, len(at.markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per import timing')
+    parser.add_argument('--messages', default='20,100', help='comma-separated history sizes')
+    parser.add_argument('--reruns', type=int, default=20, help='reruns per timing')
+    args = parser.parse_args()
+
+    print(f"{'imports':<12} {'ms':>7}  numpy loaded")
+    for name, statement in APP_IMPORTS.items():
+        seconds, numpy_loaded = import_time(statement, args.repeat)
+        print(f"{name:<12} {seconds * 1000:>7.1f}  {numpy_loaded}")
+
+    print(f"\n{'messages':>8} {'history drawn':<14} {'ms/rerun':>9} {'elements':>9}")
+    for messages in [int(x) for x in args.messages.split(',')]:
+        for label, draw in (('per message', per_message), ('render()', rendered)):
+            ms, elements = rerun_time(draw, messages, args.reruns)
+            print(f"{messages:>8} {label:<14} {ms:>9.2f} {elements:>9}")
+
+
+if __name__ == '__main__':
+    main()
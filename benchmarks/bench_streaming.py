@@ -0,0 +1,46 @@
+"""
+Streaming vs. blocking Ollama response benchmark.
+
+Runs ollama_client against a fake chunked Ollama server and reports the
+time until the user sees the first token in each mode. Also checks that the
+streamed tokens reassemble into the same text as the blocking reply.
+
+Usage: python benchmarks/bench_streaming.py [--tokens 200] [--token-delay 0.01]
+"""
+
+import argparse
+import time
+
+from fixtures import FakeOllamaServer
+
+from ollama_client import generate, stream_generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tokens', type=int, default=200, help='tokens in the fake reply')
+    parser.add_argument('--first-token-delay', type=float, default=0.3, help='simulated prompt eval (s)')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='delay between tokens (s)')
+    args = parser.parse_args()
+
+    reply = ' '.join(f'word{i}' for i in range(args.tokens))
+    with FakeOllamaServer(reply=reply, first_token_delay=args.first_token_delay,
+                          token_delay=args.token_delay) as server:
+        url = f'{server.base_url}/api/generate'
+
+        start = time.perf_counter()
+        blocking_text = generate(url, 'fake', 'hello')
+        blocking_time = time.perf_counter() - start
+
+        metrics = {}
+        streamed_text = ''.join(stream_generate(url, 'fake', 'hello', metrics=metrics)).strip()
+
+    assert streamed_text == blocking_text, 'streamed tokens do not match blocking reply'
+    print(f"{'mode':<10} {'first token s':>14} {'total s':>8}")
+    print(f"{'blocking':<10} {blocking_time:>14.3f} {blocking_time:>8.3f}")
+    print(f"{'streaming':<10} {metrics['time_to_first_token']:>14.3f} {metrics['total_time']:>8.3f}")
+    print(f"eval_count reported: {metrics.get('eval_count')}")
+
+
+if __name__ == '__main__':
+    main()
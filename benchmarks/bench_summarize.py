@@ -0,0 +1,86 @@
+"""
+Map-reduce summarization benchmark for crawl mode.
+
+Compares end-to-end latency against a fake Ollama server as the crawl
+grows. The legacy path sends one prompt holding every page cut at 12,000
+characters. Map-reduce summarizes pages one request at a time or several
+at once, then makes one final call, and a re-crawl with one changed page
+reuses the cached summaries of the rest. The fake server's prompt eval time
+grows with prompt length, and `--parallel` caps how many requests it
+evaluates at once.
+
+Usage: python benchmarks/bench_summarize.py [--pages 5,10,20,40] [--parallel 4]
+"""
+
+import argparse
+import time
+
+from fixtures import FakeOllamaServer
+
+from llm_cache import LLMCache
+from ollama_client import generate
+from summarizer import MAP_CONCURRENCY, Summarizer, format_summaries
+
+
+def make_pages(count, version=0):
+    return [
+        {
+            'url': f'https://example.test/page/{i}',
+            'title': f'Fixture page {i}',
+            'content': ' '.join(
+                f'Page {i} (revision {version if i == 0 else 0}) sentence {j} covers topic {i % 7} in some detail.'
+                for j in range(40)
+            )[:3000],
+        }
+        for i in range(count)
+    ]
+
+
+def legacy(url, pages):
+    context = '\n\n'.join(
+        f"Page: {p['title']}\nURL: {p['url']}\nContent: {p['content']}\n---" for p in pages
+    )
+    start = time.perf_counter()
+    generate(url, 'fake', f"Analyze this website:\n\n{context[:12000]}")
+    return time.perf_counter() - start, max(0, len(context) - 12000)
+
+
+def map_reduce(url, pages, concurrency, cache):
+    summarizer = Summarizer(lambda prompt: generate(url, 'fake', prompt), 'fake',
+                            concurrency=concurrency, cache=cache)
+    start = time.perf_counter()
+    summaries = summarizer.summarize(pages)
+    generate(url, 'fake', f"Analyze this website:\n\n{format_summaries(summaries)}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', default='5,10,20,40', help='comma-separated crawl sizes')
+    parser.add_argument('--parallel', type=int, default=MAP_CONCURRENCY, help='concurrent requests the server evaluates')
+    parser.add_argument('--eval-rate', type=float, default=20000, help='prompt characters evaluated per second')
+    parser.add_argument('--token-delay', type=float, default=0.005, help='delay between generated tokens (s)')
+    args = parser.parse_args()
+
+    reply = ' '.join(f'word{i}' for i in range(40))
+    with FakeOllamaServer(reply=reply, prompt_eval_rate=args.eval_rate, token_delay=args.token_delay,
+                          parallel=args.parallel) as server:
+        url = f'{server.base_url}/api/generate'
+        print(f"{'pages':>6} {'legacy s':>9} {'chars cut':>10} {'serial s':>9} "
+              f"{'parallel s':>11} {'re-crawl s':>11}")
+        for count in [int(x) for x in args.pages.split(',')]:
+            pages = make_pages(count)
+            legacy_time, dropped = legacy(url, pages)
+            serial_time = map_reduce(url, pages, 1, LLMCache())
+
+            cache = LLMCache()
+            parallel_time = map_reduce(url, pages, args.parallel, cache)
+            # One page changed since the last crawl
+            recrawl_time = map_reduce(url, make_pages(count, version=1), args.parallel, cache)
+
+            print(f"{count:>6} {legacy_time:>9.2f} {dropped:>10} {serial_time:>9.2f} "
+                  f"{parallel_time:>11.2f} {recrawl_time:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
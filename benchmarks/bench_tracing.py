@@ -0,0 +1,82 @@
+"""
+Request tracing benchmark.
+
+Measures what a span costs (outside a request, where only the metrics
+are updated, and inside one, where it is also added to the tree), then
+runs pipeline.summarize_url for one page and one crawl against the
+fixture site and a fake Ollama server and prints the latency breakdown
+each request logs: calls, total and self seconds per stage. Finally
+checks that the /metrics endpoint serves the collected histograms.
+
+Usage: python benchmarks/bench_tracing.py [--latency 0.05] [--model-delay 0.2]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+from fixtures import FakeOllamaServer, FixtureServer, make_site
+
+import page_cache
+import pipeline
+import tracing
+from jobs import Job
+
+
+def span_cost(spans=20000, in_request=False):
+    def run():
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracing.span('bench'):
+                pass
+        return time.perf_counter() - start
+
+    if not in_request:
+        return run() / spans * 1e6
+    with tracing.span('request'):
+        elapsed = run()
+    return elapsed / spans * 1e6
+
+
+def print_breakdown(title, result, trace):
+    print(f"\n{title}: {result['seconds']:.2f}s, success={result['success']}")
+    stages = tracing.breakdown(trace)
+    print(f"  {'stage':<10} {'calls':>5} {'total s':>8} {'self s':>7}")
+    for name, (count, total, own) in sorted(stages.items(), key=lambda item: -item[1][2]):
+        print(f"  {name:<10} {count:>5} {total:>8.3f} {own:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=0.05, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.2, help='fake model time to first token (s)')
+    parser.add_argument('--port', type=int, default=9464, help='port for the /metrics check')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    tracing.configure(log_path=os.path.join(directory, 'traces.jsonl'),
+                      metrics_path=os.path.join(directory, 'metrics.prom'), metrics_port=args.port)
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    pipeline.USE_LLM_CACHE = False
+
+    print(f"span outside a request: {span_cost():.1f} us")
+    print(f"span inside a request:  {span_cost(in_request=True):.1f} us")
+
+    with FixtureServer(make_site(20), latency=args.latency) as site, \
+            FakeOllamaServer(first_token_delay=args.model_delay, token_delay=0.01, parallel=2) as model:
+        pipeline.BACKEND_SETTINGS = {'base_url': model.base_url}
+        for title, kwargs in (('page', {}), ('crawl', {'crawl': True, 'max_pages': 5})):
+            job = Job(None, title)
+            result = pipeline.summarize_url(f'{site.base_url}/page/1', job=job, **kwargs)
+            print_breakdown(title, result, job.trace)
+
+    body = requests.get(f'http://127.0.0.1:{args.port}/metrics', timeout=5).text
+    series = [line for line in body.splitlines() if line.startswith('webscraper_stage_seconds_count')]
+    print(f"\n/metrics: {len(series)} stage histograms, {len(body)} bytes")
+    tracing.configure()
+
+
+if __name__ == '__main__':
+    main()
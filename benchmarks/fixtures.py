@@ -0,0 +1,327 @@
+"""
+Local HTTP fixtures for the benchmark scripts.
+
+Serves synthetic multi-page sites and a fake Ollama API from background
+threads so benchmarks never touch the network or a real model.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Make the top-level app modules importable when run as `python benchmarks/...`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_site(num_pages=50, links_per_page=5, paragraphs=8):
+    """Build a dict of path -> HTML for a linked fixture site"""
+    pages = {}
+    for i in range(num_pages):
+        links = ''.join(
+            f'<a href="/page/{(i * links_per_page + j + 1) % num_pages}">Page {(i * links_per_page + j + 1) % num_pages}</a>'
+            for j in range(links_per_page)
+        )
+        body = ''.join(
+            f'<p>Page {i} paragraph {k}: fixture text about topic {i % 7} with enough words to pass the extraction filter.</p>'
+            for k in range(paragraphs)
+        )
+        pages[f'/page/{i}'] = (
+            f'<html><head><title>Fixture page {i}</title></head><body>'
+            f'<nav>Menu</nav><main><article><h1>Heading {i}</h1>{body}<div>{links}</div></article></main>'
+            f'<footer>Footer</footer></body></html>'
+        )
+    pages['/'] = pages['/page/0']
+    return pages
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that ignores clients hanging up mid-response"""
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def send_body(handler, status, data, content_type, headers=None):
+    """Write a complete response with a Content-Length header"""
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def make_nested_page(depth=8, breadth=3, paragraphs=4, index=0):
+    """Build a page whose content sits in deeply nested div/section containers"""
+    def container(level):
+        if level == depth:
+            return ''.join(
+                f'<p>Leaf {index}.{level}.{k}: nested fixture text that is long enough to keep.</p>'
+                for k in range(paragraphs)
+            )
+        tag = 'section' if level % 2 else 'div'
+        children = ''.join(container(level + 1) for _ in range(breadth if level < 3 else 1))
+        return f'<{tag}><h2>Level {level}</h2>{children}</{tag}>'
+
+    return (
+        f'<html><head><title>Nested page {index}</title><style>p {{ color: red; }}</style></head>'
+        f'<body><header>Site header</header><nav><a href="/">Home</a></nav>'
+        f'<main><article>{container(0)}</article></main><footer>Footer</footer>'
+        f'<script>var x = {index};</script></body></html>'
+    )
+
+
+def make_corpus(count=20):
+    """Build a list of (name, html) pages mixing flat and deeply nested layouts"""
+    site = make_site(num_pages=count // 2, paragraphs=30)
+    corpus = [(f'flat-{i}', site[f'/page/{i}']) for i in range(count // 2)]
+    corpus += [
+        (f'nested-{i}', make_nested_page(depth=6 + i % 6, index=i))
+        for i in range(count - count // 2)
+    ]
+    return corpus
+
+
+def make_benchmark_site(num_pages=40, seed=0, large_every=10, large_kb=512):
+    """Build a fixed, seeded site mixing normal, large, nested and duplicate pages
+
+    Every page is generated from `seed`, so the site is byte-identical on
+    every run. Besides articles under /docs/ it has:
+    - every `large_every`-th article padded to about `large_kb` KB;
+    - /nested/ pages built by make_nested_page();
+    - duplicates: /docs/<i>/index.html (same canonical URL), /mirror/docs/<i>
+      (same body under another URL) and /print/docs/<i> (a print view).
+    """
+    rng = random.Random(seed)
+    vocabulary = [f'term{i}' for i in range(2000)]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+    def paragraph(words=60):
+        return '<p>' + ' '.join(rng.choices(vocabulary, weights, k=words)) + '.</p>'
+
+    pages = {}
+    for i in range(num_pages):
+        links = ''.join(
+            f'<a href="/docs/{target}">Article {target}</a>'
+            for target in sorted(rng.sample(range(num_pages), min(4, num_pages)))
+        )
+        duplicates = (f'<a href="/docs/{i}/index.html">Permalink</a><a href="/mirror/docs/{i}">Mirror</a>'
+                      f'<a href="/print/docs/{i}">Print</a>')
+        body = ''.join(paragraph() for _ in range(rng.randint(4, 12)))
+        if large_every and i % large_every == large_every - 1:
+            filler = paragraph(120)
+            body += filler * (large_kb * 1024 // len(filler))
+        pages[f'/docs/{i}'] = pages[f'/docs/{i}/index.html'] = pages[f'/mirror/docs/{i}'] = (
+            f'<html><head><title>Article {i}</title></head><body><nav>Docs menu</nav>'
+            f'<main><article><h1>Article {i}</h1>{body}</article><div>{links}{duplicates}'
+            f'<a href="/nested/{i % 5}">Details</a></div></main><footer>Footer</footer></body></html>'
+        )
+        pages[f'/print/docs/{i}'] = (
+            f'<html><head><title>Article {i} (print)</title></head><body><h1>Article {i}</h1>'
+            f'<p>Printer friendly version of this article.</p>{body}</body></html>'
+        )
+    for i in range(5):
+        pages[f'/nested/{i}'] = make_nested_page(depth=6 + i, index=i)
+    pages['/'] = (
+        '<html><head><title>Benchmark docs</title></head><body><main><h1>Benchmark docs</h1>'
+        + paragraph()
+        + ''.join(f'<a href="/docs/{i}">Article {i}</a>' for i in range(min(num_pages, 10)))
+        + '</main></body></html>'
+    )
+    return pages
+
+
+def site_digest(pages):
+    """Short hash of a fixture site, stored with benchmark baselines"""
+    digest = hashlib.sha256()
+    for path in sorted(pages):
+        digest.update(path.encode('utf-8') + b'\0' + pages[path].encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+class FixtureServer:
+    """Threaded HTTP server serving fixture pages with optional latency"""
+
+    def __init__(self, pages, latency=0.0, host='127.0.0.1', port=0):
+        self.pages = pages
+        self.latency = latency
+        self.requests_served = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections_opened += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests_served += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                server.handle_get(self)
+
+            def do_POST(self):
+                with server._lock:
+                    server.requests_served += 1
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if server.latency:
+                    time.sleep(server.latency)
+                server.handle_post(self, payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = QuietHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def handle_get(self, handler):
+        body = self.pages.get(handler.path.split('?')[0])
+        if body is None:
+            send_body(handler, 404, b'', 'text/plain')
+            return
+        data = body.encode('utf-8')
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+        send_body(handler, 200, data, 'text/html; charset=utf-8', {'ETag': etag})
+
+    def handle_post(self, handler, payload):
+        send_body(handler, 405, b'', 'text/plain')
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeOllamaServer(FixtureServer):
+    """Fixture server that answers Ollama /api/generate and /api/chat requests
+
+    Streaming requests get a chunked NDJSON reply, one token per chunk,
+    with `first_token_delay` before the first token and `token_delay`
+    between tokens. Non-streaming requests wait for the whole completion.
+    `prompt_eval_rate` (prompt characters per second) adds a delay that
+    grows with the prompt, and `parallel` caps how many requests are
+    evaluated at once, like OLLAMA_NUM_PARALLEL. With `prefix_cache`, only
+    the part of a prompt after the prefix it shares with the previous
+    prompt is evaluated, like Ollama's KV cache reuse.
+    """
+
+    def __init__(self, reply='This is a fake model reply.', latency=0.0,
+                 first_token_delay=0.0, token_delay=0.0, prompt_eval_rate=None,
+                 parallel=None, prefix_cache=False, **kwargs):
+        super().__init__({}, latency=latency, **kwargs)
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.prompt_eval_rate = prompt_eval_rate
+        self.slots = threading.Semaphore(parallel) if parallel else None
+        self.prefix_cache = prefix_cache
+        self.prompt_chars = 0
+        self.keep_alive = None
+        self._last_prompt = ''
+
+    def tokens(self):
+        return [word + ' ' for word in self.reply.split()]
+
+    def final_chunk(self, model, tokens, evaluated_chars, eval_delay):
+        return {
+            'model': model,
+            'done': True,
+            'prompt_eval_count': max(1, evaluated_chars // 4),
+            'prompt_eval_duration': int(eval_delay * 1e9),
+            'eval_count': len(tokens),
+            'eval_duration': int(len(tokens) * self.token_delay * 1e9),
+        }
+
+    def evaluated_chars(self, prompt):
+        with self._lock:
+            self.prompt_chars += len(prompt)
+            if not self.prefix_cache:
+                return len(prompt)
+            shared = len(os.path.commonprefix([self._last_prompt, prompt]))
+            self._last_prompt = prompt
+            return len(prompt) - shared
+
+    def handle_post(self, handler, payload):
+        if handler.path not in ('/api/generate', '/api/chat'):
+            send_body(handler, 404, b'', 'text/plain')
+            return
+        self.keep_alive = payload.get('keep_alive')
+        if self.slots is None:
+            self.generate(handler, payload)
+        else:
+            with self.slots:
+                self.generate(handler, payload)
+
+    def generate(self, handler, payload):
+        model = payload.get('model')
+        tokens = self.tokens()
+        is_chat = handler.path == '/api/chat'
+        if is_chat:
+            # Rendered the way a chat template concatenates messages
+            prompt = ''.join(f"<{m['role']}>{m['content']}\n" for m in payload.get('messages', []))
+        else:
+            prompt = payload.get('prompt', '')
+        evaluated = self.evaluated_chars(prompt)
+        eval_delay = evaluated / self.prompt_eval_rate if self.prompt_eval_rate else 0.0
+        first_token_delay = self.first_token_delay + eval_delay
+
+        def reply_chunk(text, done=False):
+            if is_chat:
+                return {'model': model, 'message': {'role': 'assistant', 'content': text}, 'done': done}
+            return {'model': model, 'response': text, 'done': done}
+
+        if not payload.get('stream', True):
+            time.sleep(first_token_delay + self.token_delay * len(tokens))
+            data = dict(self.final_chunk(model, tokens, evaluated, eval_delay),
+                        **reply_chunk(''.join(tokens).strip(), done=True))
+            send_body(handler, 200, json.dumps(data).encode('utf-8'), 'application/json')
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/x-ndjson')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+
+        def write_chunk(obj):
+            line = json.dumps(obj).encode('utf-8') + b'\n'
+            handler.wfile.write(f'{len(line):x}\r\n'.encode('ascii') + line + b'\r\n')
+            handler.wfile.flush()
+
+        time.sleep(first_token_delay)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_delay)
+            write_chunk(reply_chunk(token))
+        write_chunk(dict(self.final_chunk(model, tokens, evaluated, eval_delay), **reply_chunk('', done=True)))
+        handler.wfile.write(b'0\r\n\r\n')
@@ -0,0 +1,247 @@
+"""
+End-to-end benchmark suite for the scrape -> summarize pipeline.
+
+Serves the seeded benchmark site (normal, large, nested and duplicate
+pages; see fixtures.make_benchmark_site) and a fake Ollama server with a
+fixed time to first token and token rate, then runs pipeline.summarize_url
+in these scenarios:
+
+  scrape       single-page summaries, one after another
+  crawl-<N>    one crawl and site summary per max_pages value
+  users-<N>    N users each sending single-page requests at the same time
+
+Each scenario runs in a fresh subprocess so its peak RSS and CPU time are
+its own; the fixture servers stay in this process and aren't counted. The
+page, response and summary caches are disabled, so every run does the
+same work. Reports pages/sec, p50/p95 request latency, CPU seconds and
+peak RSS, plus the slowest stages from the request traces.
+
+--save writes the results with the settings and site digest to a JSON
+baseline; --compare prints each metric's change against one and exits
+with status 1 when any is worse than --tolerance.
+
+Usage: python benchmarks/suite.py [--scenarios scrape,crawl-5,crawl-10,users-4]
+                                  [--repeat 3] [--save base.json | --compare base.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from fixtures import ROOT, FakeOllamaServer, FixtureServer, make_benchmark_site, site_digest
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+DEFAULT_SCENARIOS = 'scrape,crawl-5,crawl-10,crawl-20,users-4,users-8'
+SITE_PAGES = 100   # Articles on the benchmark site; users get distinct ones where possible
+
+# Metric -> True when higher is better
+METRICS = {
+    'pages_per_sec': True,
+    'p50_latency': False,
+    'p95_latency': False,
+    'cpu_seconds': False,
+    'peak_rss_mb': False,
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def configure_child(model_url, concurrency):
+    import llm_scheduler
+    import page_cache
+    import pipeline
+    import summarizer
+    import tracing
+
+    page_cache.configure(path=':memory:', ttl=0, max_bytes=0)
+    summarizer.configure(path=None, ttl=0)
+    tracing.configure(log_path=None, metrics_path=None)
+    pipeline.USE_LLM_CACHE = False
+    pipeline.BACKEND_SETTINGS = {'base_url': model_url}
+    llm_scheduler.configure(max_concurrent=concurrency, max_queue=1024)
+    return pipeline
+
+
+def run_scenario(scenario, site_url, model_url, requests, concurrency):
+    """Run one scenario in this process and return its measurements"""
+    pipeline = configure_child(model_url, concurrency)
+    kind, _, size = scenario.partition('-')
+    results = []
+    lock = threading.Lock()
+
+    def summarize(url, **kwargs):
+        result = pipeline.summarize_url(url, **kwargs)
+        with lock:
+            results.append(result)
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    if kind == 'scrape':
+        for i in range(requests):
+            summarize(f'{site_url}/docs/{i}')
+    elif kind == 'crawl':
+        summarize(f'{site_url}/', crawl=True, max_pages=int(size))
+    elif kind == 'users':
+        def user(number):
+            for i in range(requests):
+                summarize(f'{site_url}/docs/{(number * requests + i) % SITE_PAGES}')
+
+        threads = [threading.Thread(target=user, args=(number,)) for number in range(int(size))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        raise ValueError(f"Unknown scenario {scenario!r}")
+    seconds = time.perf_counter() - start
+
+    pages = sum(len(r.get('pages', ())) if r['mode'] == 'crawl' else 1 for r in results if r['success'])
+    latencies = [r['seconds'] for r in results]
+    stages = {}
+    for r in results:
+        for name, own in r.get('stages', {}).items():
+            stages[name] = stages.get(name, 0.0) + own
+    return {
+        'requests': len(results),
+        'errors': sum(1 for r in results if not r['success']),
+        'pages': pages,
+        'seconds': round(seconds, 3),
+        'pages_per_sec': round(pages / seconds, 3) if seconds else 0.0,
+        'p50_latency': round(percentile(latencies, 0.5), 3),
+        'p95_latency': round(percentile(latencies, 0.95), 3),
+        'cpu_seconds': round(time.process_time() - cpu_start, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1) if resource is not None else None,
+        'stages': {name: round(own, 3) for name, own in stages.items()},
+    }
+
+
+def median_run(runs):
+    """Combine repeated runs: the median of every metric"""
+    combined = dict(runs[0])
+    for metric in list(METRICS) + ['seconds', 'pages', 'errors']:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        combined[metric] = statistics.median(values) if values else None
+    return combined
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline and return the regressed (scenario, metric) pairs"""
+    regressions = []
+    print(f"\n{'scenario':<10} {'metric':<14} {'baseline':>10} {'now':>10} {'change':>8}")
+    for scenario, current in results.items():
+        before = baseline['results'].get(scenario)
+        if before is None:
+            print(f"{scenario:<10} (not in baseline)")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = '  REGRESSION' if worse > tolerance else ''
+            if flag:
+                regressions.append((scenario, metric))
+            print(f"{scenario:<10} {metric:<14} {old:>10.3f} {new:>10.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenarios', default=DEFAULT_SCENARIOS, help='comma-separated scenarios')
+    parser.add_argument('--requests', type=int, default=10, help='requests per scrape scenario and per user')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per scenario (medians are reported)')
+    parser.add_argument('--latency', type=float, default=0.05, help='fixture site response delay (s)')
+    parser.add_argument('--model-delay', type=float, default=0.2, help='fake model time to first token (s)')
+    parser.add_argument('--token-rate', type=float, default=200, help='fake model tokens per second')
+    parser.add_argument('--reply-tokens', type=int, default=40, help='tokens per fake model reply')
+    parser.add_argument('--model-parallel', type=int, default=2, help='requests the fake model evaluates at once')
+    parser.add_argument('--save', help='write results to this baseline JSON file')
+    parser.add_argument('--compare', help='compare results with this baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative slowdown before failing')
+    parser.add_argument('--child', nargs=3, metavar=('SCENARIO', 'SITE', 'MODEL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(*args.child, args.requests, args.model_parallel)))
+        return
+
+    pages = make_benchmark_site(SITE_PAGES)
+    settings = {
+        'requests': args.requests, 'latency': args.latency, 'model_delay': args.model_delay,
+        'token_rate': args.token_rate, 'reply_tokens': args.reply_tokens,
+        'model_parallel': args.model_parallel, 'site': site_digest(pages),
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        differing = sorted(k for k, v in settings.items() if baseline['settings'].get(k) != v)
+        if differing:
+            print(f"Warning: settings differ from the baseline ({', '.join(differing)})", file=sys.stderr)
+
+    results = {}
+    reply = ' '.join(f'word{i}' for i in range(args.reply_tokens))
+    with FixtureServer(pages, latency=args.latency) as site, \
+            FakeOllamaServer(reply=reply, first_token_delay=args.model_delay, token_delay=1 / args.token_rate,
+                             parallel=args.model_parallel) as model:
+        print(f"{'scenario':<10} {'req':>4} {'err':>4} {'pages':>6} {'pages/s':>8} {'p50 s':>7} {'p95 s':>7} "
+              f"{'CPU s':>6} {'RSS MB':>7}  slowest stages (self s)")
+        for scenario in args.scenarios.split(','):
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', scenario, site.base_url, model.base_url,
+                     '--requests', str(args.requests), '--model-parallel', str(args.model_parallel)],
+                    capture_output=True, text=True, check=True, cwd=ROOT,
+                ).stdout
+                runs.append(json.loads(out.strip().splitlines()[-1]))
+            r = results[scenario] = median_run(runs)
+            slowest = sorted(r['stages'].items(), key=lambda item: -item[1])[:3]
+            rss = f"{r['peak_rss_mb']:>7.1f}" if r['peak_rss_mb'] is not None else f"{'-':>7}"
+            print(f"{scenario:<10} {r['requests']:>4} {r['errors']:>4} {r['pages']:>6} {r['pages_per_sec']:>8.2f} "
+                  f"{r['p50_latency']:>7.2f} {r['p95_latency']:>7.2f} {r['cpu_seconds']:>6.2f} {rss}  "
+                  + ', '.join(f"{name} {own:.2f}" for name, own in slowest))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'revision': git_revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'settings': settings, 'results': results,
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Compact, bounded chat history for the Streamlit apps.
+
+Replaces the unbounded list of (sender, message) tuples kept in
+st.session_state. Turns live in a ring buffer that keeps only the last
+`max_turns`, each as a __slots__ record, and turns older than the most
+recent `compress_after` are zlib-compressed, since bot replies are often
+whole site summaries. Iterating still yields (sender, message) pairs.
+
+build_context() picks the recent turns that fit a token budget so they
+can be sent back to the model as conversation context without the prompt
+growing with the length of the session. Once the budget fills, old turns
+are dropped in one block, down to a fraction of the budget, rather than
+one per request: between trims every request's context starts with the
+same turns, so it stays a byte-identical prefix that Ollama's KV cache
+can reuse.
+
+render() returns the whole history as markup for the chat area. It keeps
+the result (compressed too) and only renders turns appended since the
+last call, so a Streamlit rerun doesn't decompress and re-render every
+old message.
+"""
+
+import itertools
+import zlib
+from collections import deque
+
+DEFAULT_MAX_TURNS = 100          # Messages kept per session (both senders)
+DEFAULT_COMPRESS_AFTER = 10      # Most recent messages kept uncompressed
+COMPRESS_MIN_CHARS = 512         # Shorter messages aren't worth compressing
+CONTEXT_BUDGET_TOKENS = 1024     # Conversation context sent with a prompt
+MAX_TURN_TOKENS = 256            # Longest single message in the context
+CONTEXT_TRIM_FRACTION = 0.5      # Share of the budget left after old turns are trimmed
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def clip_tokens(text, max_tokens):
+    """Cut text to roughly `max_tokens` tokens"""
+    limit = max_tokens * 4
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+class Turn:
+    """One chat message, compressed once it is no longer recent"""
+
+    __slots__ = ('sender', '_data')
+
+    def __init__(self, sender, text):
+        self.sender = sender
+        self._data = text
+
+    @property
+    def text(self):
+        if isinstance(self._data, bytes):
+            return zlib.decompress(self._data).decode('utf-8')
+        return self._data
+
+    def compress(self):
+        if isinstance(self._data, str) and len(self._data) >= COMPRESS_MIN_CHARS:
+            self._data = zlib.compress(self._data.encode('utf-8'))
+
+    @property
+    def stored_bytes(self):
+        return len(self._data) if isinstance(self._data, bytes) else len(self._data.encode('utf-8'))
+
+
+class ChatHistory:
+    """Ring buffer of chat turns with a token-budgeted context builder"""
+
+    def __init__(self, max_turns=DEFAULT_MAX_TURNS, compress_after=DEFAULT_COMPRESS_AFTER):
+        self.compress_after = compress_after
+        self._turns = deque(maxlen=max_turns)
+        self._rendered = b''        # zlib-compressed render() output for the first _rendered_turns turns
+        self._rendered_turns = 0
+        self._appended = 0          # Turns ever appended, so positions survive the ring buffer
+        self._context_start = 0     # Position of the oldest turn build_context() sends
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __iter__(self):
+        for turn in self._turns:
+            yield turn.sender, turn.text
+
+    def append(self, sender, text):
+        if len(self._turns) == self._turns.maxlen:
+            # The oldest turn drops out, so the cached render no longer lines up
+            self._rendered, self._rendered_turns = b'', 0
+        self._turns.append(Turn(sender, text))
+        self._appended += 1
+        if len(self._turns) > self.compress_after:
+            self._turns[-self.compress_after - 1].compress()
+
+    def clear(self):
+        self._turns.clear()
+        self._rendered, self._rendered_turns = b'', 0
+        self._appended = self._context_start = 0
+
+    def render(self, render_turn):
+        """Return the concatenated render_turn(sender, text) of every turn
+
+        Only turns appended since the last call are rendered; `render_turn`
+        must return the same markup for a turn every time.
+        """
+        markup = zlib.decompress(self._rendered).decode('utf-8') if self._rendered else ''
+        if self._rendered_turns < len(self._turns):
+            markup += ''.join(
+                render_turn(turn.sender, turn.text)
+                for turn in itertools.islice(self._turns, self._rendered_turns, None)
+            )
+            self._rendered = zlib.compress(markup.encode('utf-8'))
+            self._rendered_turns = len(self._turns)
+        return markup
+
+    def build_context(self, budget_tokens=CONTEXT_BUDGET_TOKENS, max_turn_tokens=MAX_TURN_TOKENS,
+                      trim_fraction=CONTEXT_TRIM_FRACTION):
+        """Return recent (sender, text) turns within the budget, oldest first
+
+        The context starts where the last one did until it no longer fits;
+        then old turns are dropped until it fits `trim_fraction` of the
+        budget, starting at a "You" turn where possible.
+        """
+        first = self._appended - len(self._turns)   # Position of the oldest turn kept
+        start = max(self._context_start, first)
+        turns = [
+            (turn.sender, clip_tokens(turn.text, max_turn_tokens))
+            for turn in itertools.islice(self._turns, start - first, None)
+        ]
+        # tail[i]: tokens of turns[i:]
+        tail = [0] * (len(turns) + 1)
+        for i in range(len(turns) - 1, -1, -1):
+            tail[i] = tail[i + 1] + estimate_tokens(turns[i][1])
+        if tail[0] > budget_tokens:
+            fits = [i for i in range(len(turns) + 1) if tail[i] <= budget_tokens]
+            at_you = [i for i in fits if i < len(turns) and turns[i][0] == "You"]
+            if at_you:
+                # The first "You" turn that leaves room to grow, else the last one that fits
+                dropped = next((i for i in at_you if tail[i] <= budget_tokens * trim_fraction), at_you[-1])
+            else:
+                dropped = fits[0]
+            turns = turns[dropped:]
+            start += dropped
+        self._context_start = start
+        return turns
+
+    def stored_bytes(self):
+        """Bytes of message text held, after compression"""
+        return sum(turn.stored_bytes for turn in self._turns)
+
+
+def format_transcript(turns, names):
+    """Render context turns as 'Name: text' lines, e.g. names={'You': 'User', 'Bot': 'Bot'}"""
+    return '\n'.join(f"{names.get(sender, sender)}: {text}" for sender, text in turns)
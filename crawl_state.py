@@ -0,0 +1,204 @@
+"""
+Persisted crawl state for incremental re-crawls.
+
+Re-crawling a docs site every day used to redo every fetch, parse and
+page summary. CrawlState keeps each site's last crawl in SQLite: per page
+the ETag / Last-Modified it was served with, a hash of its extracted
+title and text, the text itself, its links and its summary. IncrementalFetcher is a
+crawler fetch function that sends a conditional request with the stored
+validators; a 304 reuses the stored page and links without downloading
+or parsing anything, and a page whose extraction hashes the same as
+before counts as unchanged as well. Only new and changed pages are then
+summarized again, and diff_text() gives the sentences that changed, so
+the "what changed" reply is written from the differences alone.
+
+The page cache (page_cache.py) revalidates too, but it is a size-capped
+LRU cache shared by every scrape; this is the site's last crawl and is
+kept until the next one replaces it.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from crawler import HEADERS, extract_crawl_page
+from extraction import CRAWL_RULES
+from http_session import ensure_html, get_session, iter_body, response_charset
+from page_cache import normalize_url
+from process_wide import ProcessWide
+from tracing import record, span
+
+CRAWL_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'crawl_state.sqlite3')
+MAX_DIFF_LINES = 30      # Removed/added sentences per page sent in a "what changed" prompt
+MAX_DIFF_LINE_CHARS = 300
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_pages (
+    site TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    page TEXT NOT NULL,
+    links TEXT NOT NULL,
+    summary TEXT,
+    crawled_at REAL NOT NULL,
+    PRIMARY KEY (site, url)
+);
+"""
+
+
+def content_hash(page):
+    """Hash of a page's extracted title and text"""
+    return hashlib.sha256(f"{page['title']}\n{page['content']}".encode('utf-8')).hexdigest()
+
+
+def diff_text(old, new, max_lines=MAX_DIFF_LINES):
+    """Return the sentences removed from (-) and added to (+) a page's text"""
+    # Extracted text is one line, so compare it sentence by sentence
+    lines = [
+        line[:MAX_DIFF_LINE_CHARS]
+        for line in difflib.unified_diff(_SENTENCE_RE.split(old), _SENTENCE_RE.split(new), lineterm='', n=0)
+        if line[:1] in '+-' and not line.startswith(('+++', '---'))
+    ]
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... and {len(lines) - max_lines} more changed sentences"]
+    return '\n'.join(lines)
+
+
+class CrawlState:
+    """Each site's last crawl: validators, text, links and summary per page"""
+
+    def __init__(self, path=CRAWL_STATE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def load(self, site):
+        """Return the site's last crawl as {normalized url: entry}, empty if it was never crawled"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, etag, last_modified, content_hash, page, links, summary, crawled_at "
+                "FROM crawl_pages WHERE site = ?",
+                (site,),
+            ).fetchall()
+        return {
+            url: {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_hash': hashed,
+                'page': json.loads(page),
+                'links': [tuple(link) for link in json.loads(links)],
+                'summary': summary,
+                'crawled_at': crawled_at,
+            }
+            for url, etag, last_modified, hashed, page, links, summary, crawled_at in rows
+        }
+
+    def save(self, site, pages, fetched, summaries):
+        """Replace the site's last crawl with these pages
+
+        `fetched` maps normalized URLs to IncrementalFetcher records and
+        `summaries` maps page URLs to their summaries.
+        """
+        now = time.time()
+        rows = []
+        for page in pages:
+            key = normalize_url(page['url'])
+            record = fetched.get(key, {})
+            rows.append((
+                site, key, record.get('etag'), record.get('last_modified'), content_hash(page),
+                json.dumps({name: page.get(name) for name in ('url', 'title', 'content', 'fingerprint')}),
+                json.dumps(record.get('links', [])), summaries.get(page['url']), now,
+            ))
+        with self._lock:
+            self._db.execute("DELETE FROM crawl_pages WHERE site = ?", (site,))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO crawl_pages "
+                "(site, url, etag, last_modified, content_hash, page, links, summary, crawled_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+
+    def forget(self, site):
+        """Drop a site's state, so its next re-crawl starts from scratch"""
+        with self._lock:
+            self._db.execute("DELETE FROM crawl_pages WHERE site = ?", (site,))
+            self._db.commit()
+
+
+class IncrementalFetcher:
+    """Crawler fetch function that skips pages unchanged since the site's last crawl
+
+    Each fetched URL is recorded in `fetched` (normalized URL -> status
+    'new', 'changed' or 'unchanged', validators and links).
+    """
+
+    def __init__(self, previous, timeout=10):
+        self.previous = previous
+        self.timeout = timeout
+        self.fetched = {}
+        self.not_modified = 0
+
+    def __call__(self, url):
+        key = normalize_url(url)
+        before = self.previous.get(key)
+        headers = dict(HEADERS)
+        if before is not None:
+            if before['etag']:
+                headers['If-None-Match'] = before['etag']
+            if before['last_modified']:
+                headers['If-Modified-Since'] = before['last_modified']
+
+        with span('fetch', url=url) as current:
+            response = get_session().get(url, headers=headers, timeout=self.timeout, stream=True)
+            record('http', response.elapsed.total_seconds(), status=response.status_code)
+            try:
+                if before is not None and response.status_code == 304:
+                    # Nothing to download or parse
+                    self.not_modified += 1
+                    page, links = dict(before['page'], url=url), before['links']
+                    etag, last_modified, status = before['etag'], before['last_modified'], 'unchanged'
+                else:
+                    response.raise_for_status()
+                    ensure_html(response)
+                    with span('extract', kind=CRAWL_RULES.cache_kind):
+                        result = extract_crawl_page(url, iter_body(response), response_charset(response))
+                    page, links = result['page'], result['links']
+                    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+                    if before is None:
+                        status = 'new'
+                    elif page is not None and content_hash(page) == before['content_hash']:
+                        status = 'unchanged'
+                    else:
+                        status = 'changed'
+            finally:
+                response.close()
+            current.attrs['status'] = status
+
+        self.fetched[key] = {'status': status, 'etag': etag, 'last_modified': last_modified, 'links': links}
+        return page, links
+
+
+_state = ProcessWide(CrawlState)
+
+
+def get_crawl_state():
+    """Return the process-wide crawl state store, opening it on first use"""
+    return _state.get()
+
+
+def configure(**settings):
+    """Replace the process-wide store with one built from the given settings"""
+    _state.configure(**settings)
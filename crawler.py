@@ -0,0 +1,281 @@
+"""
+Concurrent crawl engine for the Web Crawler & Scraper Bot.
+
+Fetches pages with a bounded pool of asyncio workers, taking the next URL
+from a scored Frontier (see frontier.py) instead of a plain breadth-first
+deque. Each host gets its own concurrency limit and minimum spacing
+between requests instead of a global sleep after every page, widened to
+the site's robots.txt Crawl-delay; disallowed URLs are never fetched.
+Pages whose text nearly matches a page already crawled (see
+near_duplicates.py) are dropped and don't count toward max_pages.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from extraction import CRAWL_RULES, extract_page
+from frontier import Frontier, RobotsUnavailable, canonicalize, get_robots_cache, sitemap_urls
+from near_duplicates import SIMILARITY_THRESHOLD, MinHashIndex, fingerprint
+from page_cache import get_page_cache, normalize_url
+from single_flight import get_single_flight
+from tracing import record
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Crawl defaults
+DEFAULT_CONCURRENCY = 4       # Worker coroutines (and fetch threads)
+DEFAULT_PER_HOST_LIMIT = 4    # Simultaneous requests to one host
+DEFAULT_PER_HOST_DELAY = 0.2  # Minimum seconds between request starts to one host
+MAX_LINKS_PER_PAGE = 50       # Links per page handed to the frontier for scoring
+
+
+def get_internal_links(url, links, max_links=MAX_LINKS_PER_PAGE):
+    """Resolve a page's [href, anchor text] links and keep internal ones as (url, anchor) pairs
+
+    Links are resolved against the URL the page was fetched from, not its
+    canonical form: on a directory page such as /docs/, "intro.html" means
+    /docs/intro.html.
+    """
+    base_domain = urlparse(canonicalize(url)).netloc
+    internal_links = {}   # canonical URL -> (url, anchor)
+
+    for href, anchor in links:
+        # Convert relative URLs to absolute
+        absolute_url = urldefrag(urljoin(url, href))[0]
+        canonical = canonicalize(absolute_url)
+        parsed_url = urlparse(canonical)
+
+        # Check if it's an internal link (same domain)
+        if parsed_url.netloc == base_domain and parsed_url.scheme in ['http', 'https']:
+            # Keep the most descriptive anchor text seen for a target
+            if canonical not in internal_links or len(anchor) > len(internal_links[canonical][1]):
+                internal_links[canonical] = (absolute_url, anchor)
+
+            if len(internal_links) >= max_links:
+                break
+
+    return list(internal_links.values())
+
+
+def extract_crawl_page(url, chunks, encoding=None, max_links=MAX_LINKS_PER_PAGE):
+    """Extract a crawled page and its internal links as its body streams in"""
+    extracted = extract_page(chunks, rules=CRAWL_RULES, encoding=encoding)
+
+    page = None
+    if extracted['content']:  # Only keep pages with content
+        page = {
+            'url': url,
+            'title': extracted['title'],
+            'content': extracted['content'],
+            'fingerprint': fingerprint(extracted['content']),
+        }
+
+    return {'page': page, 'links': get_internal_links(url, extracted['links'], max_links=max_links)}
+
+
+def fetch_page(url):
+    """Fetch and extract a single page, returning (page, links)"""
+    # Cache hits skip both the request and the parse; concurrent crawls share one download
+    result = get_single_flight('page').do(
+        (CRAWL_RULES.cache_kind, normalize_url(url)),
+        lambda: get_page_cache().fetch(url, extract_crawl_page, kind=CRAWL_RULES.cache_kind, headers=HEADERS, timeout=10),
+    )
+    return result['page'], result['links']
+
+
+class HostLimiter:
+    """Per-host concurrency and request-spacing limits"""
+
+    def __init__(self, max_concurrent=DEFAULT_PER_HOST_LIMIT, min_interval=DEFAULT_PER_HOST_DELAY):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+        self._intervals = {}
+
+    def _host_state(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrent)
+            self._locks[host] = asyncio.Lock()
+            self._next_start[host] = 0.0
+        return self._semaphores[host], self._locks[host]
+
+    def set_interval(self, host, seconds):
+        """Space requests to one host further apart (e.g. its Crawl-delay)"""
+        self._intervals[host] = max(self.min_interval, seconds)
+
+    async def acquire(self, url):
+        """Wait for a free slot on the URL's host and for its rate window"""
+        host = urlparse(url).netloc
+        semaphore, lock = self._host_state(host)
+        await semaphore.acquire()
+
+        # Space out request starts so one host never sees a burst
+        async with lock:
+            now = time.monotonic()
+            wait = self._next_start[host] - now
+            self._next_start[host] = max(now, self._next_start[host]) + self._intervals.get(host, self.min_interval)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return host
+
+    def release(self, host):
+        self._semaphores[host].release()
+
+
+async def crawl_async(start_url, max_pages=5, concurrency=DEFAULT_CONCURRENCY,
+                      per_host_limit=DEFAULT_PER_HOST_LIMIT, per_host_delay=DEFAULT_PER_HOST_DELAY,
+                      fetch=fetch_page, progress_callback=None, error_callback=None,
+                      cancel_event=None, query=None, respect_robots=True, use_sitemap=True,
+                      similarity_threshold=SIMILARITY_THRESHOLD):
+    """Crawl a website best-first with a bounded pool of workers
+
+    `query` steers the frontier toward pages about it. Pages at least
+    `similarity_threshold` similar to one already kept are dropped (None
+    keeps them). Setting
+    `cancel_event` (a threading.Event) stops the crawl after the fetches
+    already running; the pages collected so far are returned. Returns
+    (pages, stats).
+    """
+    frontier = Frontier(start_url, query)
+    frontier.add(start_url)
+    crawled_data = []
+    in_flight = 0
+    fetched = 0
+
+    kept = MinHashIndex(similarity_threshold) if similarity_threshold is not None else None
+    limiter = HostLimiter(per_host_limit, per_host_delay)
+    condition = asyncio.Condition()
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    robots = get_robots_cache() if respect_robots else None
+
+    async def seed():
+        """Apply the site's Crawl-delay and queue the pages its sitemaps list"""
+        sitemaps = [urljoin(start_url, '/sitemap.xml')]
+        if robots is not None:
+            try:
+                delay = await loop.run_in_executor(executor, robots.crawl_delay, start_url)
+                if delay:
+                    limiter.set_interval(urlparse(start_url).netloc, delay)
+                sitemaps = await loop.run_in_executor(executor, robots.sitemaps, start_url)
+            except RobotsUnavailable:
+                pass   # Reported by the workers, whose fetches it blocks
+        if use_sitemap:
+            for url in await loop.run_in_executor(executor, sitemap_urls, sitemaps):
+                frontier.add(url, depth=1)
+
+    async def next_url():
+        """Pop the best queued URL, or None once the crawl is finished"""
+        nonlocal in_flight
+        async with condition:
+            while True:
+                if len(crawled_data) >= max_pages:
+                    return None
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                # Never have more fetches running than pages still wanted
+                if len(frontier) and len(crawled_data) + in_flight < max_pages:
+                    break
+                if not len(frontier) and in_flight == 0:
+                    return None
+                await condition.wait()
+
+            in_flight += 1
+            return frontier.pop()
+
+    async def worker():
+        nonlocal in_flight, fetched
+        while True:
+            item = await next_url()
+            if item is None:
+                return
+            current_url, depth = item
+
+            if progress_callback:
+                progress_callback(len(crawled_data) + 1, max_pages, current_url)
+
+            page, links = None, []
+            try:
+                allowed = robots is None or await loop.run_in_executor(executor, robots.allowed, current_url)
+            except RobotsUnavailable as e:
+                # Unknown rules: report it like a failed fetch, not as a disallowed page
+                allowed = None
+                if error_callback:
+                    error_callback(current_url, e)
+            if allowed is False:
+                frontier.skipped['robots'] += 1
+            elif allowed:
+                waiting = time.perf_counter()
+                host = await limiter.acquire(current_url)
+                record('host_wait', time.perf_counter() - waiting)
+                try:
+                    fetched += 1
+                    # Run in a copy of this context so the fetch span joins the current request
+                    page, links = await loop.run_in_executor(
+                        executor, contextvars.copy_context().run, fetch, current_url
+                    )
+                except Exception as e:
+                    if error_callback:
+                        error_callback(current_url, e)
+                finally:
+                    limiter.release(host)
+
+            async with condition:
+                in_flight -= 1
+                signature = page.get('fingerprint') if page and kept is not None else None
+                if signature and kept.find(signature) is not None:
+                    frontier.skipped['near_duplicate'] += 1
+                elif page and len(crawled_data) < max_pages:
+                    crawled_data.append(page)
+                    if signature:
+                        kept.add(page['url'], signature)
+                if len(crawled_data) < max_pages:
+                    for link, anchor in links:
+                        frontier.add(link, anchor, depth + 1)
+                condition.notify_all()
+
+    try:
+        await seed()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        executor.shutdown(wait=False)
+
+    stats = {'fetched': fetched, 'queued': len(frontier), 'skipped': dict(frontier.skipped)}
+    return crawled_data, stats
+
+
+def run_crawl(start_url, max_pages=5, **kwargs):
+    """Run the crawl engine and return the crawl_website result dict"""
+    try:
+        crawled_data, stats = asyncio.run(crawl_async(start_url, max_pages=max_pages, **kwargs))
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f"Crawling failed: {str(e)}"
+        }
+
+    if crawled_data:
+        return {
+            'success': True,
+            'pages_crawled': len(crawled_data),
+            'data': crawled_data,
+            'start_url': start_url,
+            'stats': stats,
+        }
+    elif stats['skipped'].get('robots'):
+        return {
+            'success': False,
+            'error': "The site's robots.txt does not allow crawling these pages"
+        }
+    else:
+        return {
+            'success': False,
+            'error': "No content could be extracted from the website"
+        }
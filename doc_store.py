@@ -0,0 +1,159 @@
+"""
+Searchable store of pages the user has already scraped or crawled.
+
+Pages are split into passages and kept in an inverted index (term ->
+{passage id: term frequency}) scored with BM25, so a follow-up question
+about a site is answered from what was already fetched, in milliseconds,
+instead of a new crawl. One store lives in each Streamlit session;
+passing a path also persists the pages to SQLite so they survive restarts.
+Persisted pages belong to the `owner` key they were added under, so
+sessions sharing one database file only see their own pages.
+
+search() can require a share of the question's terms to match, so one
+incidental shared word doesn't send an unrelated question to the pages.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+from retrieval import chunk_text, tokenize
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can did do does for from has have how i in is it its
+me my of on or that the their there these this to was were what when where which
+who why will with you your about tell explain please
+""".split())
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    owner TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (owner, url)
+);
+"""
+
+
+def index_terms(text):
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class DocumentStore:
+    """Pages split into passages with a BM25 inverted index"""
+
+    def __init__(self, path=None, owner=''):
+        self.documents = {}                 # url -> {'url', 'title', 'content'}
+        self.passages = {}                  # passage id -> {'url', 'title', 'text'}
+        self.postings = defaultdict(dict)   # term -> {passage id: term frequency}
+        self.lengths = {}                   # passage id -> number of terms
+        self._passage_ids = defaultdict(list)
+        self._next_id = 0
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+        self.owner = owner
+        self._db = None
+        if path:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                # Version 1 rows were shared by every session and can't be attributed to one
+                self._db.execute("DROP TABLE IF EXISTS documents")
+                self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._db.executescript(_SCHEMA)
+            rows = self._db.execute("SELECT url, title, content FROM documents WHERE owner = ?", (owner,))
+            for url, title, content in rows:
+                self._index(url, title, content)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, url, title, content):
+        """Add or replace a page"""
+        with self._lock:
+            self._index(url, title, content)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO documents (owner, url, title, content, added_at) VALUES (?, ?, ?, ?, ?)",
+                    (self.owner, url, title, content, time.time()),
+                )
+                self._db.commit()
+
+    def add_pages(self, pages):
+        """Add crawled pages ({'url', 'title', 'content'} dicts)"""
+        for page in pages:
+            self.add(page['url'], page['title'], page['content'])
+
+    def pages(self, urls):
+        """Return the stored pages with these URLs, in the order they were added"""
+        with self._lock:
+            return [page for url, page in self.documents.items() if url in urls]
+
+    def search(self, query, k=5, min_match=0.0):
+        """Return up to k (score, passage) pairs ranked by BM25
+
+        Passages that contain fewer than `min_match` (a fraction) of the
+        query's terms are left out.
+        """
+        terms = set(index_terms(query))
+        if not terms or not self.passages:
+            return []
+        needed = math.ceil(min_match * len(terms))
+
+        with self._lock:
+            count = len(self.passages)
+            average_length = self._total_length / count
+            scores = Counter()
+            matched = Counter()
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for passage_id, frequency in postings.items():
+                    norm = K1 * (1 - B + B * self.lengths[passage_id] / average_length)
+                    scores[passage_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+                    matched[passage_id] += 1
+            ranked = [(score, passage_id) for passage_id, score in scores.most_common() if matched[passage_id] >= needed]
+            return [(score, self.passages[passage_id]) for score, passage_id in ranked[:k]]
+
+    def _index(self, url, title, content):
+        self._remove(url)
+        self.documents[url] = {'url': url, 'title': title, 'content': content}
+        for text in chunk_text(content):
+            passage_id = self._next_id
+            self._next_id += 1
+            # Titles are indexed with every passage of their page
+            terms = Counter(index_terms(f"{title} {text}"))
+            for term, frequency in terms.items():
+                self.postings[term][passage_id] = frequency
+            length = sum(terms.values())
+            self.lengths[passage_id] = length
+            self._total_length += length
+            self.passages[passage_id] = {'url': url, 'title': title, 'text': text}
+            self._passage_ids[url].append(passage_id)
+
+    def _remove(self, url):
+        for passage_id in self._passage_ids.pop(url, []):
+            passage = self.passages.pop(passage_id)
+            for term in set(index_terms(f"{passage['title']} {passage['text']}")):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self._total_length -= self.lengths.pop(passage_id)
+        self.documents.pop(url, None)
@@ -0,0 +1,310 @@
+"""
+Shared page extraction stage for the scraper and crawler.
+
+extract_page(html, budget) turns an HTML document (bytes, text, or an
+iterable of streamed chunks) into a title, cleaned text and links (target
+and anchor text).
+Both scrape and crawl mode call it with an ExtractionRules preset, so the
+boilerplate-removal rules and thresholds live in one place. Nothing here
+depends on Streamlit or the network.
+
+Extraction is single-pass and incremental, built on lxml.
+
+The original extraction called get_text() on every div/section/article/p
+returned by find_all(), so the text of a nested container was serialized
+once for each ancestor and appeared several times in the output. Here the
+document is fed chunk by chunk to lxml's HTML parser with a SAX-style
+target: every block-level element starts a new text segment, inline text
+is appended to the segment currently open, and each text node is emitted
+exactly once, in document order. No tree is built, and the caller can stop
+feeding data as soon as the extraction budget is filled.
+
+Elements whose class or id looks like boilerplate (a token such as
+'sidebar' or 'cookie-banner') are dropped only when that is safe: small
+inline ones at once, blocks at the end and only if they hold no main or
+article element and less than BOILERPLATE_MAX_SHARE of the page's text,
+so a layout wrapper such as <div class="layout social-feed"> around the
+article survives.
+"""
+
+import hashlib
+import re
+import time
+
+from lxml import etree
+
+from tracing import record
+
+EXTRACTOR_VERSION = 'lxml7'  # Part of page cache keys; bump when output changes
+
+# Elements whose boundaries split text into separate segments
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'div',
+    'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'summary', 'table', 'td', 'th', 'tr', 'ul',
+])
+
+# Content containers: never dropped because of their class/id, nor is anything holding one
+CONTENT_CONTAINERS = frozenset(['html', 'body', 'main', 'article'])
+
+# Elements whose content never counts as page text
+ALWAYS_SKIPPED = frozenset(['head', 'script', 'style', 'noscript', 'template', 'svg'])
+
+# Boilerplate removed in every mode
+BOILERPLATE_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside')
+# Matched against each class token and the id: 'sidebar' and 'sidebar-left', not 'has-sidebar'
+BOILERPLATE_ATTR_PATTERN = r'(?:cookie|consent|banner|advert|ads?|promo|newsletter|social|share|breadcrumbs?|sidebar|popup|modal)(?:$|[_-])'
+BOILERPLATE_MAX_SHARE = 0.5   # A block matching the pattern is only dropped if it holds less of the page's text
+BOILERPLATE_TEXT_PATTERNS = (
+    r'^(accept|reject|manage) (all )?cookies',
+    r'^we use cookies',
+    r'^subscribe to our newsletter',
+    r'^all rights reserved',
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def sniff_encoding(head, declared=None):
+    """Pick a document encoding from the header charset, a <meta> tag, or UTF-8"""
+    if declared:
+        return declared
+    match = _META_CHARSET_RE.search(head[:4096])
+    if match:
+        return match.group(1).decode('ascii')
+    return 'utf-8'
+
+
+class ExtractionRules:
+    """Boilerplate-removal rules and thresholds for one extraction mode"""
+
+    def __init__(self, name, remove_tags=BOILERPLATE_TAGS, min_length=30, budget=8000,
+                 attr_pattern=BOILERPLATE_ATTR_PATTERN, text_patterns=BOILERPLATE_TEXT_PATTERNS):
+        self.name = name
+        self.remove_tags = frozenset(remove_tags)
+        self.min_length = min_length
+        self.budget = budget
+        # Compiled once per preset, not per page
+        self.attr_re = re.compile(attr_pattern, re.IGNORECASE) if attr_pattern else None
+        self.text_re = re.compile('|'.join(text_patterns), re.IGNORECASE) if text_patterns else None
+
+        fingerprint = repr((sorted(self.remove_tags), min_length, budget, attr_pattern, tuple(text_patterns or ())))
+        # Identifies this rule set's output in the page cache
+        self.cache_kind = f"{name}-{EXTRACTOR_VERSION}-{hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:8]}"
+
+
+SCRAPE_RULES = ExtractionRules('scrape', min_length=50, budget=8000)
+CRAWL_RULES = ExtractionRules('crawl', min_length=30, budget=3000)
+
+
+class BlockTextTarget:
+    """lxml parser target that collects block-level text, title and links"""
+
+    def __init__(self, remove_tags=(), min_length=0, budget=None, attr_re=None, text_re=None):
+        self.skip_tags = ALWAYS_SKIPPED.union(remove_tags)
+        self.min_length = min_length
+        self.budget = budget
+        self.attr_re = attr_re
+        self.text_re = text_re
+        self.segments = []
+        self.links = []
+        self.chars = 0
+        self.full = False
+        self._title = []
+        self._in_title = False
+        self._in_head = False
+        self._title_done = False   # Only the first <title> is the page's; svg icons have their own
+        self._skip_depth = 0
+        self._depth = 0
+        self._current = []
+        self._anchor = None   # [href, text parts] of the link being read
+        # Blocks whose class/id look like boilerplate: whether to drop them is
+        # decided at close(), once it is known how much of the page they hold
+        self._candidates = []   # Open ones: [depth, first segment, first link, holds a content container]
+        self._matched = []      # Closed ones: (first segment, end segment, first link, end link)
+
+    def _flush(self):
+        if self._current:
+            text = _WHITESPACE_RE.sub(' ', ''.join(self._current)).strip()
+            if len(text) > self.min_length and not self.full and not (self.text_re and self.text_re.search(text)):
+                self.segments.append(text)
+                self.chars += len(text) + 1
+                if self.budget is not None and self.chars >= self.budget:
+                    self.full = True
+            del self._current[:]
+
+    def start(self, tag, attrib):
+        if tag == 'title' and not self._title_done and self._skip_depth == int(self._in_head):
+            # Directly in <head> or the body, not in an <svg> or other skipped element
+            self._in_title = True
+        elif tag == 'head' and not self._skip_depth:
+            self._in_head = True
+        if self._skip_depth or tag in self.skip_tags:
+            self._skip_depth += 1
+            return
+        boilerplate = self._is_boilerplate(tag, attrib)
+        if boilerplate and tag not in BLOCK_TAGS:
+            # Inline elements (share links, ad labels) are small; drop them outright
+            self._skip_depth += 1
+            return
+        self._depth += 1
+        if tag in CONTENT_CONTAINERS:
+            for candidate in self._candidates:
+                candidate[3] = True
+        if tag in BLOCK_TAGS:
+            self._flush()
+            if boilerplate:
+                self._candidates.append([self._depth, len(self.segments), len(self.links), False])
+        elif tag == 'br':
+            self._current.append(' ')
+        elif tag == 'a':
+            href = attrib.get('href')
+            if href:
+                self._anchor = [href.strip(), []]
+
+    def _is_boilerplate(self, tag, attrib):
+        if self.attr_re is None or tag in CONTENT_CONTAINERS:
+            return False
+        tokens = attrib.get('class', '').split()
+        if attrib.get('id'):
+            tokens.append(attrib['id'])
+        return any(self.attr_re.match(token) for token in tokens)
+
+    def end(self, tag):
+        if tag == 'title' and self._in_title:
+            self._in_title = False
+            self._title_done = True
+        elif tag == 'head':
+            self._in_head = False
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if tag == 'a' and self._anchor is not None:
+            href, text = self._anchor
+            self.links.append([href, _WHITESPACE_RE.sub(' ', ''.join(text)).strip()])
+            self._anchor = None
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if self._candidates and self._candidates[-1][0] == self._depth:
+            self._end_candidate(self._candidates.pop())
+        self._depth -= 1
+
+    def _end_candidate(self, candidate):
+        _, first_segment, first_link, holds_content = candidate
+        if not holds_content:
+            self._matched.append((first_segment, len(self.segments), first_link, len(self.links)))
+
+    def _drop_boilerplate(self):
+        """Drop matched blocks that hold less than BOILERPLATE_MAX_SHARE of the text"""
+        while self._candidates:
+            self._end_candidate(self._candidates.pop())
+        total = sum(len(segment) for segment in self.segments)
+        dropped_segments, dropped_links = set(), set()
+        for first_segment, end_segment, first_link, end_link in self._matched:
+            if sum(len(segment) for segment in self.segments[first_segment:end_segment]) < total * BOILERPLATE_MAX_SHARE:
+                dropped_segments.update(range(first_segment, end_segment))
+                dropped_links.update(range(first_link, end_link))
+        self._matched = []
+        if dropped_segments or dropped_links:
+            self.segments = [segment for i, segment in enumerate(self.segments) if i not in dropped_segments]
+            self.links = [link for i, link in enumerate(self.links) if i not in dropped_links]
+            self.chars = sum(len(segment) + 1 for segment in self.segments)
+
+    def data(self, text):
+        if self._in_title:
+            self._title.append(text)
+        elif not self._skip_depth:
+            self._current.append(text)
+            if self._anchor is not None:
+                self._anchor[1].append(text)
+
+    def close(self):
+        self._flush()
+        self._drop_boilerplate()
+        return self
+
+    @property
+    def title(self):
+        title = _WHITESPACE_RE.sub(' ', ''.join(self._title)).strip()
+        return title or "No title found"
+
+
+def extract_stream(chunks, remove_tags=(), min_length=0, budget=None, encoding=None,
+                   attr_re=None, text_re=None):
+    """Extract text from an iterable of HTML byte chunks in a single pass
+
+    Stops pulling chunks once `budget` characters of text are collected.
+    Returns a dict with the title, text segments, links as [raw href,
+    anchor text] pairs and whether the whole document was read.
+    """
+    target = BlockTextTarget(remove_tags, min_length, budget, attr_re, text_re)
+    parser = None
+    complete = True
+    parsing = 0.0   # Time in the parser, not waiting for chunks
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        started = time.perf_counter()
+        if parser is None:
+            parser = etree.HTMLParser(target=target, encoding=sniff_encoding(chunk, encoding))
+        parser.feed(chunk)
+        parsing += time.perf_counter() - started
+        if target.full:
+            complete = False
+            break
+
+    started = time.perf_counter()
+    if parser is not None:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Truncated documents are expected when stopping early
+    else:
+        target.close()
+    record('parse', parsing + time.perf_counter() - started)
+
+    return {
+        'title': target.title,
+        'segments': target.segments,
+        'links': target.links,
+        'complete': complete,
+    }
+
+
+def join_blocks(segments, budget):
+    """Join segments into one whitespace-collapsed string of at most `budget` chars"""
+    return _WHITESPACE_RE.sub(' ', ' '.join(segments)).strip()[:budget]
+
+
+def extract_page(html, budget=None, rules=SCRAPE_RULES, encoding=None):
+    """Extract title, cleaned text and [href, anchor text] links from an HTML page
+
+    `html` may be bytes, text, or an iterable of byte chunks (a streamed
+    download); reading stops once `budget` characters are collected.
+    `budget` defaults to the rule set's own budget.
+    """
+    if budget is None:
+        budget = rules.budget
+    if isinstance(html, str):
+        html, encoding = [html.encode('utf-8')], 'utf-8'
+    elif isinstance(html, (bytes, bytearray)):
+        html = [bytes(html)]
+
+    extracted = extract_stream(
+        html,
+        remove_tags=rules.remove_tags,
+        min_length=rules.min_length,
+        budget=budget,
+        encoding=encoding,
+        attr_re=rules.attr_re,
+        text_re=rules.text_re,
+    )
+    return {
+        'title': extracted['title'],
+        'content': join_blocks(extracted['segments'], budget),
+        'links': extracted['links'],
+        'complete': extracted['complete'],
+    }
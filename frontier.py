@@ -0,0 +1,245 @@
+"""
+Crawl frontier for the Web Crawler & Scraper Bot.
+
+Decides which URL the crawler fetches next, so a small page budget isn't
+spent on duplicates, navigation pages or files that aren't HTML:
+
+- canonicalize() collapses the forms a URL comes in: host case, default
+  ports, duplicate slashes, index pages, trailing slashes, fragments and
+  query strings.
+- Frontier is a priority queue of URLs, deduplicated by their canonical
+  form; the URL itself is what gets fetched, since dropping a trailing
+  slash changes what relative links on the page resolve to. A link scores higher
+  when it is shallow and its anchor text or path shares terms with the
+  user's question, and lower when it looks like login, legal or other
+  low-value pages. Links with non-HTML extensions are dropped before they
+  are fetched.
+- RobotsCache fetches each host's robots.txt once and answers
+  allow/disallow, Crawl-delay and Sitemap questions from it. A 5xx reply
+  means the site can't be crawled; a request that fails outright (timeout,
+  DNS, TLS) raises RobotsUnavailable and is retried shortly after.
+- sitemap_urls() reads sitemap.xml (and sitemap indexes) to seed the
+  frontier with pages that aren't linked from the start page.
+"""
+
+import heapq
+import itertools
+import posixpath
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import urldefrag, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+from lxml import etree
+
+from doc_store import STOPWORDS
+from http_session import get_session
+from process_wide import ProcessWide
+from retrieval import tokenize
+
+ROBOTS_USER_AGENT = "WebScraperBot"   # Token matched against robots.txt User-agent lines
+ROBOTS_TTL = 60 * 60                  # Seconds a host's robots.txt is reused
+ROBOTS_RETRY_AFTER = 30               # Seconds a failed robots.txt request is remembered before retrying
+MAX_SITEMAP_URLS = 500                # Seeds taken from a site's sitemaps
+MAX_SITEMAP_FILES = 5                 # Sitemap documents read per site (indexes included)
+
+INDEX_PAGES = frozenset(['index.html', 'index.htm', 'index.php', 'default.htm', 'default.html', 'default.aspx'])
+
+# Extensions never worth downloading as pages
+SKIPPED_EXTENSIONS = frozenset([
+    '.7z', '.avi', '.bmp', '.css', '.csv', '.doc', '.docx', '.exe', '.gif', '.gz', '.ico',
+    '.jpeg', '.jpg', '.js', '.json', '.mov', '.mp3', '.mp4', '.pdf', '.png', '.ppt', '.pptx',
+    '.rar', '.rss', '.svg', '.tar', '.tgz', '.wav', '.webm', '.webp', '.woff', '.woff2',
+    '.xls', '.xlsx', '.xml', '.zip',
+])
+
+# Anchor/path terms of pages that rarely answer anything
+LOW_VALUE_TERMS = frozenset([
+    'login', 'signin', 'signup', 'register', 'logout', 'account', 'cart', 'checkout',
+    'privacy', 'terms', 'cookie', 'cookies', 'legal', 'imprint', 'careers', 'jobs',
+    'feed', 'rss', 'print', 'share', 'tag', 'tags',
+])
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+_SLASHES_RE = re.compile(r'/{2,}')
+_PERCENT_RE = re.compile(r'%[0-9a-fA-F]{2}')
+_SITEMAP_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, recover=True)
+
+
+def canonicalize(url):
+    """Return the canonical form of an http(s) URL used to detect duplicates"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    netloc = host if parts.port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{parts.port}"
+
+    path = _SLASHES_RE.sub('/', parts.path) or '/'
+    path = _PERCENT_RE.sub(lambda match: match.group(0).upper(), path)
+    head, last = posixpath.split(path)
+    if last.lower() in INDEX_PAGES:
+        path = head if head.endswith('/') else head + '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+    # Query strings are dropped, as before: they mostly add tracking and sort variants
+    return urlunsplit((scheme, netloc, path, '', ''))
+
+
+def has_skipped_extension(url):
+    return posixpath.splitext(urlsplit(url).path)[1].lower() in SKIPPED_EXTENSIONS
+
+
+class Frontier:
+    """Scored queue of URLs still to be crawled on one site, deduplicated by canonical form"""
+
+    def __init__(self, start_url, query=None):
+        self.host = urlsplit(canonicalize(start_url)).netloc
+        self.query_terms = frozenset(term for term in tokenize(query or '') if term not in STOPWORDS)
+        self.seen = set()
+        self.skipped = Counter()   # reason -> URLs not queued (or not fetched)
+        self._heap = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, url, anchor='', depth=0):
+        """Queue a URL unless it was seen, is off-site or isn't HTML; return whether it was queued"""
+        if urlsplit(url).scheme not in ('http', 'https'):
+            return False
+        canonical = canonicalize(url)
+        if urlsplit(canonical).netloc != self.host:
+            self.skipped['offsite'] += 1
+            return False
+        if canonical in self.seen:
+            self.skipped['duplicate'] += 1
+            return False
+        self.seen.add(canonical)
+        if has_skipped_extension(canonical):
+            self.skipped['not_html'] += 1
+            return False
+        # Queue the URL as given (minus any fragment); the canonical form is only the `seen` key
+        heapq.heappush(self._heap, (-self.score(canonical, anchor, depth), next(self._order), urldefrag(url)[0], depth))
+        return True
+
+    def pop(self):
+        """Return the best (url, depth) still queued, or None"""
+        if not self._heap:
+            return None
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def score(self, url, anchor='', depth=0):
+        path = urlsplit(url).path
+        terms = set(tokenize(anchor)) | set(tokenize(path))
+        score = -float(depth)
+        # Shallow paths are usually section landing pages
+        score -= 0.25 * path.count('/')
+        score += 2.0 * len(self.query_terms & terms)
+        if terms & LOW_VALUE_TERMS:
+            score -= 3.0
+        return score
+
+
+class RobotsUnavailable(Exception):
+    """robots.txt couldn't be requested at all, so the host's rules are unknown"""
+
+
+class RobotsCache:
+    """robots.txt rules per host, fetched on first use and kept for `ttl` seconds"""
+
+    def __init__(self, ttl=ROBOTS_TTL, user_agent=ROBOTS_USER_AGENT, timeout=5, retry_after=ROBOTS_RETRY_AFTER):
+        self.ttl = ttl
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._rules = {}      # "scheme://host" -> (RobotFileParser, fetched_at)
+        self._failures = {}   # "scheme://host" -> (RobotsUnavailable, failed_at)
+        self._lock = threading.Lock()
+
+    def rules(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            entry = self._rules.get(origin)
+            if entry is not None and time.time() - entry[1] < self.ttl:
+                return entry[0]
+            failure = self._failures.get(origin)
+            if failure is not None and time.time() - failure[1] < self.retry_after:
+                raise failure[0]
+
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = get_session().get(parser.url, timeout=self.timeout)
+        except Exception as e:
+            # A network blip says nothing about the site's rules: fail this
+            # lookup, but don't cache a verdict for the whole TTL
+            error = RobotsUnavailable(f"Could not fetch {parser.url}: {e}")
+            with self._lock:
+                self._failures[origin] = (error, time.time())
+            raise error from e
+        if response.status_code >= 500:
+            # RFC 9309: an unreachable robots.txt means nothing may be crawled
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+
+        with self._lock:
+            self._rules[origin] = (parser, time.time())
+            self._failures.pop(origin, None)
+        return parser
+
+    def allowed(self, url):
+        return self.rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Seconds the host asks crawlers to wait between requests, or None"""
+        delay = self.rules(url).crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    def sitemaps(self, url):
+        parts = urlsplit(url)
+        return self.rules(url).site_maps() or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+
+def sitemap_urls(sitemaps, limit=MAX_SITEMAP_URLS, max_files=MAX_SITEMAP_FILES, timeout=5):
+    """Return page URLs listed in the given sitemaps, following sitemap indexes"""
+    urls = []
+    pending = list(sitemaps)
+    fetched = 0
+    while pending and len(urls) < limit and fetched < max_files:
+        sitemap = pending.pop(0)
+        if sitemap.endswith('.gz'):
+            continue
+        fetched += 1
+        try:
+            response = get_session().get(sitemap, timeout=timeout)
+            if response.status_code != 200:
+                continue
+            root = etree.fromstring(response.content, parser=_SITEMAP_PARSER)
+        except Exception:
+            continue
+        if root is None:
+            continue
+        locs = [loc.text.strip() for loc in root.iter('{*}loc') if loc.text]
+        if etree.QName(root).localname == 'sitemapindex':
+            pending.extend(locs)
+        else:
+            urls.extend(locs)
+    return urls[:limit]
+
+
+_robots = ProcessWide(RobotsCache)
+
+
+def get_robots_cache():
+    """Return the process-wide robots.txt cache, creating it on first use"""
+    return _robots.get()
+
+
+def configure(**settings):
+    """Replace the process-wide robots.txt cache with one built from the given settings"""
+    _robots.configure(**settings)
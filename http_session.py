@@ -0,0 +1,151 @@
+"""
+Shared HTTP transport for the chatbots.
+
+One pooled, keep-alive requests.Session is reused by the scraper, the
+crawler and the Ollama client, so repeated fetches to a host reuse open
+TCP/TLS connections instead of paying a new handshake every time. The
+session lives at module level, which Streamlit keeps across reruns.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from process_wide import ProcessWide
+
+# Pool configuration
+POOL_CONNECTIONS = 10   # Number of per-host pools kept alive
+POOL_MAXSIZE = 16       # Connections kept alive per host
+
+# Retry/backoff policy (idempotent requests only, plus failed connects)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_AFTER_MAX = 10    # Longest Retry-After wait honoured, in seconds (urllib3 allows 6 hours)
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 10)
+LLM_TIMEOUT = (5, 300)
+
+# Streaming download limits for scraped pages
+MAX_BODY_BYTES = 5 * 1024 * 1024   # Hard cap on bytes read from one page
+CHUNK_SIZE = 16 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+
+class NonHTMLContentError(requests.exceptions.RequestException):
+    """Raised when a page's Content-Type shows it is not HTML"""
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when none is given"""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class CappedRetry(Retry):
+    """Retry that waits at most RETRY_AFTER_MAX seconds for a Retry-After header"""
+
+    def parse_retry_after(self, retry_after):
+        return min(super().parse_retry_after(retry_after), RETRY_AFTER_MAX)
+
+
+def build_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                  max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                  timeout=DEFAULT_TIMEOUT):
+    """Create a new pooled session with retries and default timeouts
+
+    `timeout` bounds each connect and each read, not the whole call: with
+    retries, backoff and Retry-After waits (up to RETRY_AFTER_MAX each) a
+    request can take several times longer before it returns or fails.
+    """
+    retry = CappedRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        timeout=timeout,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = ProcessWide(build_session, close=requests.Session.close)
+
+
+def get_session():
+    """Return the process-wide shared session, creating it on first use"""
+    return _session.get()
+
+
+def configure(**settings):
+    """Replace the shared session with one built from the given settings"""
+    _session.configure(**settings)
+
+
+def ensure_html(response):
+    """Close the response and raise if its headers show non-HTML content"""
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        response.close()
+        raise NonHTMLContentError(f"Skipping non-HTML content ({content_type}) at {response.url}")
+
+
+def response_charset(response):
+    """Return the charset declared in the Content-Type header, if any"""
+    content_type = response.headers.get('Content-Type', '')
+    if 'charset=' in content_type.lower():
+        return response.encoding
+    return None
+
+
+class BodyChunks:
+    """Iterator over a streamed response body in chunks, stopping at `max_bytes`
+
+    `truncated` is set once the body turns out to be longer than that, so
+    callers can tell a capped body from a whole one.
+    """
+
+    def __init__(self, response, max_bytes=MAX_BODY_BYTES, chunk_size=CHUNK_SIZE):
+        self.truncated = False
+        self._chunks = self._read(response, max_bytes, chunk_size)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def _read(self, response, max_bytes, chunk_size):
+        read = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if read + len(chunk) > max_bytes:
+                self.truncated = True
+                if read < max_bytes:
+                    yield chunk[:max_bytes - read]
+                return
+            read += len(chunk)
+            yield chunk
+
+
+def iter_body(response, max_bytes=MAX_BODY_BYTES, chunk_size=CHUNK_SIZE):
+    """Return a BodyChunks iterator over a streamed response body, stopping at `max_bytes`"""
+    return BodyChunks(response, max_bytes, chunk_size)
@@ -0,0 +1,181 @@
+"""
+Background jobs for the Streamlit apps.
+
+Crawls, scrapes and model calls run on a shared thread pool instead of the
+Streamlit script thread, so a rerun only has to poll a job's status and
+redraw what it has reported so far. Each job records notices, a progress
+line and the partial reply for the UI, and can be cancelled: queued jobs
+never start, running ones stop at their next check_cancelled() call. The
+pool is process-wide, so crawls from several browser sessions run
+concurrently on one server; each session keeps only the ids of its jobs.
+Every job is traced as one request (see tracing.py).
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from process_wide import ProcessWide
+from tracing import span
+
+DEFAULT_MAX_WORKERS = 8       # Jobs running at once across all sessions
+DEFAULT_RETENTION = 10 * 60   # Seconds a finished, uncollected job is kept
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = frozenset([SUCCEEDED, FAILED, CANCELLED])
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been asked to stop"""
+
+
+class Job:
+    """One unit of background work and everything it has reported so far"""
+
+    def __init__(self, job_id, description=''):
+        self.id = job_id
+        self.description = description
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.notices = []       # (kind, text) pairs, e.g. ('info', 'Crawl mode activated')
+        self.progress = None    # Latest progress line, cleared when the job finishes
+        self.partial = ''       # Reply text streamed so far
+        self.metrics = {}
+        self.trace = None       # Finished request span tree (see tracing.py)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def notify(self, kind, text):
+        """Record a notice for the UI ('info', 'caption' or 'warning')"""
+        self.notices.append((kind, text))
+
+    def set_progress(self, text):
+        self.progress = text
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been asked to stop"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        """Ask the job to stop; a job that hasn't started yet never will"""
+        self.cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(CANCELLED)
+
+    def _finish(self, status, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.progress = None
+        self.finished_at = time.time()
+        self.status = status
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and keeps them until collected"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, retention=DEFAULT_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, description='', **kwargs):
+        """Run fn(job, *args, **kwargs) in the background and return the Job"""
+        self.prune()
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", description)
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None if it is unknown or was collected"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def collect(self, job_id):
+        """Remove and return a finished job once its result has been used"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                del self._jobs[job_id]
+            return job
+
+    def prune(self):
+        """Drop finished jobs nobody collected within the retention period"""
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.done and job.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+    def stats(self):
+        """Return the number of known jobs in each state"""
+        with self._lock:
+            counts = dict.fromkeys((QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED), 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job._finish(CANCELLED)
+            return
+        job.started_at = time.time()
+        job.status = RUNNING
+        result = error = None
+        status = FAILED
+        try:
+            # Each job is one traced request; its span tree is kept for the debug panel
+            with span('request', job=job.id) as current:
+                try:
+                    result = fn(job, *args, **kwargs)
+                    status = SUCCEEDED
+                except JobCancelled:
+                    status = CANCELLED
+                except Exception as e:
+                    status, error = FAILED, e
+                if status != SUCCEEDED:
+                    current.attrs['error'] = status
+            job.trace = current.attrs.pop('trace', None)
+        finally:
+            # Even if tracing fails, so the UI doesn't poll a running job forever
+            job._finish(status, result=result, error=error)
+
+
+_manager = ProcessWide(JobManager)
+
+
+def get_job_manager():
+    """Return the process-wide job manager, creating it on first use"""
+    return _manager.get()
+
+
+def configure(**settings):
+    """Replace the process-wide job manager with one built from the given settings"""
+    _manager.configure(**settings)
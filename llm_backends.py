@@ -0,0 +1,405 @@
+"""
+Pluggable model backends for the chatbots.
+
+Each backend wraps one model provider behind the same interface:
+
+- complete(messages) / stream(messages) take role/content chat messages
+  (see ollama_client.chat_messages) and return or yield the reply;
+- generate(prompt) / stream_generate(prompt) take a single prompt string;
+- acomplete() / astream() are the asyncio versions.
+
+Backends are built once per process by get_backend(name, **settings) and
+reused, so per-message work is just the request: no client construction,
+API configuration or connection setup on every turn. Each call fills an
+optional metrics dict (time_to_first_token, total_time, prompt_tokens,
+completion_tokens, plus provider fields such as Ollama's
+prompt_eval_duration), and stats() aggregates latency percentiles, token
+counts and errors per backend. Every call is also recorded as an llm span
+of the current traced request (see tracing.py).
+
+OllamaBackend uses the pooled HTTP session; its async methods run the
+blocking calls on a thread pool since no async HTTP client is a
+dependency. GeminiBackend configures google-generativeai once and uses the
+SDK's own async calls. FakeBackend answers in-process for benchmarks and
+trying the apps without a model.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+from http_session import LLM_TIMEOUT
+from ollama_client import KEEP_ALIVE, chat, generate, stream_chat, stream_generate
+from tracing import LLM_FIELDS, record
+
+OLLAMA_HOST = "http://localhost:11434"
+GEMINI_TIMEOUT = 120   # Seconds per Gemini request
+_DONE = object()
+
+
+def _percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+class LLMBackend:
+    """Common interface, metrics and async adapters; subclasses implement the sync calls"""
+
+    name = 'base'
+    default_model = None   # Model used when none is given, e.g. by batch_summarize --backend
+
+    def __init__(self, model, timeout=None):
+        self.model = model
+        self.timeout = timeout
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._latencies = deque(maxlen=256)   # Recent total_time values in seconds
+        self._first_tokens = deque(maxlen=256)
+        self._lock = threading.Lock()
+
+    def complete(self, messages, metrics=None):
+        raise NotImplementedError
+
+    def stream(self, messages, metrics=None):
+        raise NotImplementedError
+
+    def generate(self, prompt, metrics=None):
+        return self.complete([{"role": "user", "content": prompt}], metrics)
+
+    def stream_generate(self, prompt, metrics=None):
+        return self.stream([{"role": "user", "content": prompt}], metrics)
+
+    async def acomplete(self, messages, metrics=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, functools.partial(self.complete, messages, metrics)
+        )
+
+    async def astream(self, messages, metrics=None):
+        """Yield reply tokens from stream(), run on a worker thread"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            tokens = self.stream(messages, metrics)
+            try:
+                for token in tokens:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                tokens.close()   # Closes the connection when the consumer stops early
+
+        producer = loop.run_in_executor(None, contextvars.copy_context().run, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await producer
+
+    def _timed(self, call, metrics):
+        """Run a blocking call and record its latency and token counts"""
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        try:
+            result = call(metrics)
+        except Exception:
+            self._finish(metrics, start, failed=True)
+            raise
+        self._finish(metrics, start)
+        return result
+
+    def _timed_stream(self, tokens, metrics):
+        """Pass tokens through, recording time to first token, latency and token counts"""
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        failed = False
+        tokens = tokens(metrics)
+        try:
+            for token in tokens:
+                metrics.setdefault('time_to_first_token', time.perf_counter() - start)
+                yield token
+        except Exception:
+            failed = True
+            raise
+        finally:
+            tokens.close()   # A consumer stopping early closes the model connection
+            self._finish(metrics, start, failed)
+
+    def _finish(self, metrics, start, failed=False):
+        metrics.setdefault('total_time', time.perf_counter() - start)
+        attrs = {
+            # Ollama reports durations in nanoseconds
+            field: metrics[field] / 1e9 if field.endswith('_duration') else metrics[field]
+            for field in LLM_FIELDS if field in metrics
+        }
+        if failed:
+            attrs['error'] = True
+        record('llm', metrics['total_time'], start=start, backend=self.name, model=self.model, **attrs)
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+                return
+            self.prompt_tokens += metrics.get('prompt_tokens', 0)
+            self.completion_tokens += metrics.get('completion_tokens', 0)
+            self._latencies.append(metrics['total_time'])
+            if 'time_to_first_token' in metrics:
+                self._first_tokens.append(metrics['time_to_first_token'])
+
+    def stats(self):
+        """Return call counts, token totals and latency percentiles"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            first_tokens = sorted(self._first_tokens)
+            return {
+                'backend': self.name,
+                'model': self.model,
+                'calls': self.calls,
+                'errors': self.errors,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'p50_latency': _percentile(latencies, 0.5),
+                'p95_latency': _percentile(latencies, 0.95),
+                'p50_first_token': _percentile(first_tokens, 0.5),
+            }
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama's /api/chat and /api/generate over the shared HTTP session"""
+
+    name = 'ollama'
+    default_model = "qwen2.5:7b-instruct"
+
+    def __init__(self, model=default_model, base_url=OLLAMA_HOST, keep_alive=KEEP_ALIVE, timeout=LLM_TIMEOUT):
+        super().__init__(model, timeout)
+        self.chat_url = f"{base_url.rstrip('/')}/api/chat"
+        self.generate_url = f"{base_url.rstrip('/')}/api/generate"
+        self.keep_alive = keep_alive
+
+    @staticmethod
+    def _count_tokens(metrics):
+        if 'prompt_eval_count' in metrics:
+            metrics['prompt_tokens'] = metrics['prompt_eval_count']
+        if 'eval_count' in metrics:
+            metrics['completion_tokens'] = metrics['eval_count']
+
+    def _call(self, fn, *args):
+        def call(metrics):
+            result = fn(*args, metrics=metrics, keep_alive=self.keep_alive, timeout=self.timeout)
+            self._count_tokens(metrics)
+            return result
+        return call
+
+    def _tokens(self, fn, *args):
+        def tokens(metrics):
+            yield from fn(*args, metrics=metrics, keep_alive=self.keep_alive, timeout=self.timeout)
+            self._count_tokens(metrics)
+        return tokens
+
+    def complete(self, messages, metrics=None):
+        return self._timed(self._call(chat, self.chat_url, self.model, messages), metrics)
+
+    def stream(self, messages, metrics=None):
+        return self._timed_stream(self._tokens(stream_chat, self.chat_url, self.model, messages), metrics)
+
+    def generate(self, prompt, metrics=None):
+        return self._timed(self._call(generate, self.generate_url, self.model, prompt), metrics)
+
+    def stream_generate(self, prompt, metrics=None):
+        return self._timed_stream(self._tokens(stream_generate, self.generate_url, self.model, prompt), metrics)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through google-generativeai, configured once per process"""
+
+    name = 'gemini'
+    default_model = "gemini-2.5-flash"
+
+    def __init__(self, model=default_model, api_key=None, timeout=GEMINI_TIMEOUT):
+        super().__init__(model, timeout)
+        import google.generativeai as genai   # Only needed when this backend is used
+
+        self._genai = genai
+        genai.configure(api_key=api_key or os.environ.get("GOOGLE_API_KEY"))
+        self._models = {}   # system prompt -> GenerativeModel, built on first use
+
+    def _prepare(self, messages):
+        """Split chat messages into a (cached) model for the system prompt and Gemini contents"""
+        system = '\n\n'.join(m['content'] for m in messages if m['role'] == 'system') or None
+        with self._lock:
+            model = self._models.get(system)
+            if model is None:
+                model = self._models[system] = self._genai.GenerativeModel(self.model, system_instruction=system)
+        contents = [
+            {"role": "model" if m['role'] == 'assistant' else "user", "parts": [m['content']]}
+            for m in messages if m['role'] != 'system'
+        ]
+        return model, contents
+
+    @staticmethod
+    def _count_tokens(metrics, response):
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is not None:
+            metrics['prompt_tokens'] = usage.prompt_token_count
+            metrics['completion_tokens'] = usage.candidates_token_count
+
+    @staticmethod
+    def _text(chunk):
+        try:
+            return chunk.text
+        except ValueError:
+            return ''   # Chunks without text parts (e.g. only a finish reason)
+
+    def complete(self, messages, metrics=None):
+        model, contents = self._prepare(messages)
+
+        def call(metrics):
+            response = model.generate_content(contents, request_options={"timeout": self.timeout})
+            self._count_tokens(metrics, response)
+            return response.text.strip()
+        return self._timed(call, metrics)
+
+    def stream(self, messages, metrics=None):
+        model, contents = self._prepare(messages)
+
+        def tokens(metrics):
+            chunk = None
+            for chunk in model.generate_content(contents, stream=True, request_options={"timeout": self.timeout}):
+                text = self._text(chunk)
+                if text:
+                    yield text
+            self._count_tokens(metrics, chunk)
+        return self._timed_stream(tokens, metrics)
+
+    async def acomplete(self, messages, metrics=None):
+        model, contents = self._prepare(messages)
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        try:
+            response = await model.generate_content_async(contents, request_options={"timeout": self.timeout})
+        except Exception:
+            self._finish(metrics, start, failed=True)
+            raise
+        self._count_tokens(metrics, response)
+        self._finish(metrics, start)
+        return response.text.strip()
+
+    async def astream(self, messages, metrics=None):
+        model, contents = self._prepare(messages)
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        failed = False
+        try:
+            chunk = None
+            response = await model.generate_content_async(
+                contents, stream=True, request_options={"timeout": self.timeout}
+            )
+            async for chunk in response:
+                text = self._text(chunk)
+                if text:
+                    metrics.setdefault('time_to_first_token', time.perf_counter() - start)
+                    yield text
+            self._count_tokens(metrics, chunk)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._finish(metrics, start, failed)
+
+
+class FakeBackend(LLMBackend):
+    """In-process backend that streams a fixed reply, for benchmarks and UI work without a model"""
+
+    name = 'fake'
+    default_model = "fake"
+
+    def __init__(self, model=default_model, reply="This is a fake model reply.", first_token_delay=0.0,
+                 token_delay=0.0, timeout=None):
+        super().__init__(model, timeout)
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    def _tokens(self):
+        return [word + ' ' for word in self.reply.split()]
+
+    def _count_tokens(self, metrics, messages):
+        metrics['prompt_tokens'] = sum(len(m['content']) for m in messages) // 4
+        metrics['completion_tokens'] = len(self._tokens())
+
+    def complete(self, messages, metrics=None):
+        def call(metrics):
+            time.sleep(self.first_token_delay + self.token_delay * len(self._tokens()))
+            self._count_tokens(metrics, messages)
+            return self.reply.strip()
+        return self._timed(call, metrics)
+
+    def stream(self, messages, metrics=None):
+        def tokens(metrics):
+            time.sleep(self.first_token_delay)
+            for i, token in enumerate(self._tokens()):
+                if i:
+                    time.sleep(self.token_delay)
+                yield token
+            self._count_tokens(metrics, messages)
+        return self._timed_stream(tokens, metrics)
+
+    async def acomplete(self, messages, metrics=None):
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        await asyncio.sleep(self.first_token_delay + self.token_delay * len(self._tokens()))
+        self._count_tokens(metrics, messages)
+        self._finish(metrics, start)
+        return self.reply.strip()
+
+    async def astream(self, messages, metrics=None):
+        metrics = {} if metrics is None else metrics
+        start = time.perf_counter()
+        await asyncio.sleep(self.first_token_delay)
+        for i, token in enumerate(self._tokens()):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            metrics.setdefault('time_to_first_token', time.perf_counter() - start)
+            yield token
+        self._count_tokens(metrics, messages)
+        self._finish(metrics, start)
+
+
+BACKENDS = {
+    'ollama': OllamaBackend,
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name='ollama', **settings):
+    """Return the process-wide backend `name` built with `settings`, creating it on first use"""
+    key = (name, tuple(sorted(settings.items())))
+    backend = _backends.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                if name not in BACKENDS:
+                    raise ValueError(f"Unknown model backend {name!r} (choose from {', '.join(BACKENDS)})")
+                backend = _backends[key] = BACKENDS[name](**settings)
+    return backend
@@ -0,0 +1,157 @@
+"""
+Response cache for LLM calls.
+
+Completions are memoized on (model, system prompt, rendered prompt) so an
+identical summary request or a repeated question is answered without
+another model call. An in-process LRU tier is always used; an optional
+SQLite tier keeps responses across restarts. Entries expire by TTL and can
+be invalidated explicitly. Hit ratio and the model time saved by hits are
+tracked for display.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from process_wide import ProcessWide
+
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'llm.sqlite3')
+DEFAULT_MAX_ENTRIES = 256   # In-process LRU size
+DEFAULT_TTL = 60 * 60       # Seconds a cached response stays valid
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    latency REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def make_key(model, system_prompt, prompt):
+    """Hash the parts of a request that determine its completion"""
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, prompt):
+        data = (part or '').encode('utf-8')
+        # Length-prefix each part so boundaries can't be shifted
+        digest.update(str(len(data)).encode('ascii') + b':' + data)
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """Two-tier (memory LRU + optional SQLite) cache of LLM responses"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (response, latency, created_at)
+        self._db = None
+        if path:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+
+    def get(self, key):
+        """Return the cached response for a key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = row
+                    self._remember(key, entry)
+
+            if entry is None or now - entry[2] >= self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+
+    def put(self, key, response, latency=0.0):
+        """Store a response along with how long the model took to produce it"""
+        entry = (response, latency, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, latency, created_at) VALUES (?, ?, ?, ?)",
+                    (key,) + entry,
+                )
+                self._db.commit()
+
+    def cached_call(self, model, system_prompt, prompt, compute):
+        """Return a cached response or call compute() and cache its result"""
+        key = make_key(model, system_prompt, prompt)
+        response = self.get(key)
+        if response is None:
+            start = time.perf_counter()
+            response = compute()
+            self.put(key, response, time.perf_counter() - start)
+        return response
+
+    def invalidate(self, key):
+        """Remove a single entry from both tiers"""
+        with self._lock:
+            self._drop(key)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters, hit ratio and model time saved"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': self.saved_seconds,
+            'entries': len(self._memory),
+        }
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key):
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+
+_cache = ProcessWide(LLMCache)
+
+
+def get_llm_cache():
+    """Return the process-wide LLM cache, creating it on first use"""
+    return _cache.get()
+
+
+def configure(**settings):
+    """Replace the process-wide cache with one built from the given settings"""
+    _cache.configure(**settings)
@@ -0,0 +1,143 @@
+"""
+Process-wide queue in front of the Ollama backend.
+
+Every browser session on one Streamlit server shares a single Ollama host,
+so model calls take a slot from this scheduler first. At most
+`max_concurrent` calls run at once; the rest wait in a priority queue
+(short chat prompts ahead of crawl summaries, FIFO within a priority). When
+`max_queue` calls are already waiting, a new call that outranks the
+lowest-priority waiter takes its place and the newest such waiter leaves
+with SchedulerBusy; otherwise the new call is rejected right away, instead
+of piling up behind the host. A burst of crawl summaries therefore never
+locks chat out. Queue depth and wait times are tracked for display.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from process_wide import ProcessWide
+from tracing import record
+
+DEFAULT_MAX_CONCURRENT = 2   # Match OLLAMA_NUM_PARALLEL on the model host
+DEFAULT_MAX_QUEUE = 32       # Waiting calls before lower-priority ones are rejected
+
+# Lower runs first
+PRIORITY_CHAT = 0
+PRIORITY_PAGE = 1
+PRIORITY_CRAWL = 2
+
+
+class SchedulerBusy(RuntimeError):
+    """Raised when the model queue is full"""
+
+
+class LLMScheduler:
+    """Bounded-concurrency priority queue for model calls"""
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, max_queue=DEFAULT_MAX_QUEUE):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self._queue = []                  # heap of (priority, sequence)
+        self._evicted = set()             # Entries pushed out of a full queue by a higher priority call
+        self._sequence = itertools.count()
+        self._waits = deque(maxlen=256)   # Recent queue wait times in seconds
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_CHAT, check=None, poll_interval=0.1):
+        """Hold one model slot for the duration of the block
+
+        `check()` is called periodically while waiting; raise from it to
+        leave the queue (e.g. JobCancelled).
+        """
+        start = time.perf_counter()
+        self._acquire(priority, check, poll_interval)
+        record('queue', time.perf_counter() - start, priority=priority)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.running -= 1
+                self.completed += 1
+                self._condition.notify_all()
+
+    def _acquire(self, priority, check, poll_interval):
+        start = time.perf_counter()
+        with self._condition:
+            if self.running < self.max_concurrent and not self._queue:
+                self.running += 1
+                self._waits.append(0.0)
+                return
+            if len(self._queue) >= self.max_queue:
+                lowest = max(self._queue, default=None)
+                self.rejected += 1
+                if lowest is None or priority >= lowest[0]:
+                    raise SchedulerBusy(
+                        f"The model is busy ({len(self._queue)} requests waiting); please try again shortly"
+                    )
+                self._queue.remove(lowest)
+                heapq.heapify(self._queue)
+                self._evicted.add(lowest)
+                self._condition.notify_all()
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            try:
+                while self._queue[0] != entry or self.running >= self.max_concurrent:
+                    self._condition.wait(poll_interval if check else None)
+                    if entry in self._evicted:
+                        raise SchedulerBusy("The model is busy with more urgent requests; please try again shortly")
+                    if check:
+                        check()
+            except BaseException:
+                if entry in self._evicted:
+                    self._evicted.discard(entry)
+                else:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.running += 1
+            self._waits.append(time.perf_counter() - start)
+            # The next waiter may fit in a remaining slot
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return queue depth, running calls and wait-time percentiles"""
+        with self._condition:
+            waits = sorted(self._waits)
+            depth = len(self._queue)
+            running = self.running
+        return {
+            'queued': depth,
+            'running': running,
+            'max_depth': self.max_depth,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'waited': sum(1 for wait in waits if wait > 0),
+            'p50_wait': waits[len(waits) // 2] if waits else 0.0,
+            'p95_wait': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+        }
+
+
+_scheduler = ProcessWide(LLMScheduler)
+
+
+def get_llm_scheduler():
+    """Return the process-wide model scheduler, creating it on first use"""
+    return _scheduler.get()
+
+
+def configure(**settings):
+    """Replace the process-wide scheduler with one built from the given settings"""
+    _scheduler.configure(**settings)
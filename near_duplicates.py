@@ -0,0 +1,111 @@
+"""
+Near-duplicate page detection for crawls.
+
+Sites serve the same body under several URLs that canonicalization can't
+fold together: print views, paginated copies, session or tracking paths,
+pages that differ only in a date line or a "related posts" box. Each such
+copy costs a crawl slot and room in the prompt.
+
+fingerprint() reduces a page's text to a MinHash signature over hashed
+word shingles; the share of positions two signatures agree on estimates
+the Jaccard similarity of the pages' shingle sets. MinHashIndex finds an
+earlier page at least `threshold` similar without comparing against every
+page (LSH): the signature is cut into bands, only pages that agree on a
+whole band are compared, and those are checked against the threshold.
+
+Signatures are kept as hex strings so they can be stored in the page
+cache with the rest of an extracted page. NumPy is imported on first use,
+as in retrieval.py, so importing the crawler doesn't load it.
+"""
+
+import hashlib
+
+from retrieval import tokenize
+
+SHINGLE_SIZE = 3             # Words per shingle
+MIN_WORDS = 20               # Shorter texts aren't fingerprinted (too few shingles to be reliable)
+NUM_PERM = 128               # Hash functions per signature
+LSH_BANDS = 32               # Bands of NUM_PERM // LSH_BANDS rows each
+SIMILARITY_THRESHOLD = 0.8   # Estimated Jaccard similarity counted as the same page
+
+_PRIME = (1 << 31) - 1
+_permutations = None
+
+
+def permutations():
+    """Return the (a, b) coefficients of the NUM_PERM hash functions, drawn once"""
+    global _permutations
+    if _permutations is None:
+        import numpy as np
+        random = np.random.RandomState(20240601)
+        _permutations = (random.randint(1, _PRIME, size=(NUM_PERM, 1)).astype(np.uint64),
+                         random.randint(0, _PRIME, size=(NUM_PERM, 1)).astype(np.uint64))
+    return _permutations
+
+
+def shingle_hashes(words, size=SHINGLE_SIZE):
+    """Return 31-bit hashes of the distinct word shingles"""
+    import numpy as np
+    shingles = {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little') % _PRIME
+         for shingle in shingles],
+        dtype=np.uint64,
+    )
+
+
+def fingerprint(text, size=SHINGLE_SIZE, min_words=MIN_WORDS):
+    """Return the text's MinHash signature as hex, or None when it is too short to fingerprint"""
+    words = tokenize(text)
+    if len(words) < min_words:
+        return None
+    hashes = shingle_hashes(words, size)
+    a, b = permutations()
+    # Row i holds hash function i applied to every shingle; products stay below 2**62
+    signature = ((a * hashes + b) % _PRIME).min(axis=1)
+    return signature.astype('<u4').tobytes().hex()
+
+
+def decode(fingerprint):
+    import numpy as np
+    return np.frombuffer(bytes.fromhex(fingerprint), dtype='<u4')
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two fingerprinted texts"""
+    return float((decode(a) == decode(b)).mean())
+
+
+class MinHashIndex:
+    """Fingerprints of the pages kept so far, searchable for near-duplicates"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self._tables = [{} for _ in range(bands)]   # band bytes -> [(signature, key)]
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _band_keys(self, signature):
+        return [band.tobytes() for band in signature.reshape(self.bands, -1)]
+
+    def find(self, fingerprint):
+        """Return the key of an indexed page at least `threshold` similar, or None"""
+        signature = decode(fingerprint)
+        compared = set()
+        for table, band in zip(self._tables, self._band_keys(signature)):
+            for other, key in table.get(band, ()):
+                if key in compared:
+                    continue
+                compared.add(key)
+                if (signature == other).mean() >= self.threshold:
+                    return key
+        return None
+
+    def add(self, key, fingerprint):
+        signature = decode(fingerprint)
+        for table, band in zip(self._tables, self._band_keys(signature)):
+            table.setdefault(band, []).append((signature, key))
+        self._count += 1
@@ -0,0 +1,123 @@
+"""
+Ollama client used by the Streamlit chatbots.
+
+Covers /api/generate (a single prompt string) and /api/chat (a list of
+role/content messages), each in a blocking mode (`"stream": False`) and a
+streaming mode that reads Ollama's NDJSON chunk stream and yields tokens
+as they arrive. Streaming calls record time-to-first-token, and all calls
+record Ollama's own timing fields (including prompt_eval_duration) into a
+caller-supplied metrics dict. Every request passes `keep_alive` so the
+model stays loaded between turns.
+
+Ollama reuses its KV cache for the longest prefix a prompt shares with
+the previous one, so chat_messages() keeps the static parts first: the
+system prompt, then reference material such as pages the conversation is
+about, then earlier turns, then the new message.
+"""
+
+import json
+import time
+
+from http_session import LLM_TIMEOUT, get_session
+
+KEEP_ALIVE = "30m"  # How long Ollama keeps the model loaded after a request (its default is 5m)
+
+# Timing/count fields Ollama reports in the final chunk
+OLLAMA_METRIC_FIELDS = (
+    'total_duration', 'load_duration', 'prompt_eval_count',
+    'prompt_eval_duration', 'eval_count', 'eval_duration',
+)
+
+
+def chat_messages(system_prompt, context, prompt, reference=None):
+    """Build /api/chat messages: system prompt, reference text, earlier (sender, text) turns, new prompt"""
+    messages = [{"role": "system", "content": system_prompt}]
+    if reference:
+        messages.append({"role": "system", "content": reference})
+    for sender, text in context:
+        messages.append({"role": "user" if sender == "You" else "assistant", "content": text})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def generate(url, model, prompt, metrics=None, keep_alive=KEEP_ALIVE, timeout=LLM_TIMEOUT):
+    """Return the full completion for a prompt (non-streaming)"""
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "keep_alive": keep_alive,
+    }
+    return _post(url, payload, metrics, timeout)["response"].strip()
+
+
+def stream_generate(url, model, prompt, metrics=None, keep_alive=KEEP_ALIVE, timeout=LLM_TIMEOUT):
+    """Yield completion tokens from Ollama's NDJSON stream as they arrive"""
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        "keep_alive": keep_alive,
+    }
+    return _stream(url, payload, lambda chunk: chunk.get('response', ''), metrics, timeout)
+
+
+def chat(url, model, messages, metrics=None, keep_alive=KEEP_ALIVE, timeout=LLM_TIMEOUT):
+    """Return the assistant reply to a list of chat messages (non-streaming)"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": False,
+        "keep_alive": keep_alive,
+    }
+    return _post(url, payload, metrics, timeout)["message"]["content"].strip()
+
+
+def stream_chat(url, model, messages, metrics=None, keep_alive=KEEP_ALIVE, timeout=LLM_TIMEOUT):
+    """Yield assistant reply tokens from /api/chat's NDJSON stream as they arrive"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "keep_alive": keep_alive,
+    }
+    return _stream(url, payload, lambda chunk: chunk.get('message', {}).get('content', ''), metrics, timeout)
+
+
+def _record(metrics, chunk, start):
+    if metrics is not None:
+        metrics['total_time'] = time.perf_counter() - start
+        for field in OLLAMA_METRIC_FIELDS:
+            if field in chunk:
+                metrics[field] = chunk[field]
+
+
+def _post(url, payload, metrics, timeout):
+    start = time.perf_counter()
+    response = get_session().post(url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    body = response.json()
+    _record(metrics, body, start)
+    return body
+
+
+def _stream(url, payload, token_of, metrics, timeout):
+    start = time.perf_counter()
+    with get_session().post(url, json=payload, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if 'error' in chunk:
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+
+            token = token_of(chunk)
+            if token:
+                if metrics is not None and 'time_to_first_token' not in metrics:
+                    metrics['time_to_first_token'] = time.perf_counter() - start
+                yield token
+
+            if chunk.get('done'):
+                _record(metrics, chunk, start)
+                break
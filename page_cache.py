@@ -0,0 +1,308 @@
+"""
+Persistent on-disk page cache for the scraper and crawler.
+
+Pages are stored in SQLite keyed by normalized URL. Raw bodies are kept
+content-addressed (by SHA-256) so identical bodies served under several
+URLs are stored once, and the extracted text is stored next to them so a
+cache hit skips both the network and the HTML parse. Stale entries are
+revalidated with If-None-Match / If-Modified-Since, entries expire by TTL
+and the store is trimmed least-recently-used first once it passes its
+size cap. Bodies are streamed, so an extractor that fills its budget early
+stops the download; such partial bodies are flagged and never re-extracted.
+Bodies cut off at `max_page_bytes` are flagged as truncated as well, and
+are downloaded again rather than served from the cache.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+from http_session import MAX_BODY_BYTES, ensure_html, get_session, iter_body, response_charset
+from process_wide import ProcessWide
+from tracing import record, span
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pages.sqlite3')
+DEFAULT_TTL = 60 * 60                   # Seconds before an entry must be revalidated
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024   # Size cap for stored bodies
+
+_SCHEMA_VERSION = 3
+_MISSING = object()
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS bodies;
+DROP TABLE IF EXISTS pages;
+DROP TABLE IF EXISTS extracts;
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body_hash TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    truncated INTEGER NOT NULL DEFAULT 0,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS extracts (
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (url, kind)
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+"""
+
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    # Drop default ports
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    path = parsed.path or '/'
+    return urlunparse((scheme, netloc, path, parsed.params, parsed.query, ''))
+
+
+class PageCache:
+    """SQLite-backed HTTP page cache with TTL, revalidation and LRU eviction"""
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 max_page_bytes=MAX_BODY_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_page_bytes = max_page_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            # It's only a cache: rebuild it rather than migrate
+            self._db.executescript(_DROP_SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._db.executescript(_SCHEMA)
+
+    def fetch(self, url, extract, kind, headers=None, timeout=10):
+        """Return extract(url, chunks, encoding) for a URL, using the cache when possible
+
+        `extract` consumes an iterable of body chunks and may stop early;
+        it must return a JSON-serializable value. `kind` names the
+        extractor so different extractions of one page are cached apart.
+        """
+        with span('fetch', url=url) as current:
+            return self._fetch(url, extract, kind, headers, timeout, current)
+
+    def _fetch(self, url, extract, kind, headers, timeout, current):
+        key = normalize_url(url)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, etag, last_modified, fetched_at, truncated FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+        if row and row[4]:
+            row = None  # Cut off at max_page_bytes last time; the stored body isn't the page
+
+        if row and now - row[3] < self.ttl:
+            result = self._cached_extract(key, url, row[0], extract, kind, now)
+            if result is not _MISSING:
+                self.hits += 1
+                current.attrs['cache'] = 'hit'
+                return result
+            row = None  # Only part of the body was kept; download it again
+
+        request_headers = dict(headers or {})
+        if row:
+            if row[1]:
+                request_headers['If-None-Match'] = row[1]
+            if row[2]:
+                request_headers['If-Modified-Since'] = row[2]
+
+        response = get_session().get(url, headers=request_headers, timeout=timeout, stream=True)
+        # Time to response headers: DNS, connect, TLS and server time
+        record('http', response.elapsed.total_seconds(), status=response.status_code)
+        try:
+            if row and response.status_code == 304:
+                with self._lock:
+                    self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (now, key))
+                    self._db.commit()
+                result = self._cached_extract(key, url, row[0], extract, kind, now)
+                if result is not _MISSING:
+                    self.revalidated += 1
+                    current.attrs['cache'] = 'revalidated'
+                    return result
+                response.close()
+                response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+                record('http', response.elapsed.total_seconds(), status=response.status_code)
+
+            response.raise_for_status()
+            ensure_html(response)
+            self.misses += 1
+            current.attrs['cache'] = 'miss'
+
+            received = []
+            state = {'complete': False, 'waited': 0.0}
+            body = iter_body(response, max_bytes=self.max_page_bytes)
+
+            def recorded_chunks():
+                while True:
+                    started = time.perf_counter()
+                    chunk = next(body, None)
+                    state['waited'] += time.perf_counter() - started
+                    if chunk is None:
+                        break
+                    received.append(chunk)
+                    yield chunk
+                state['complete'] = not body.truncated
+
+            encoding = response_charset(response)
+            with span('extract', kind=kind):
+                result = extract(url, recorded_chunks(), encoding)
+                # Body chunks are read while extracting, so the download is a part of it
+                record('download', state['waited'], bytes=sum(len(chunk) for chunk in received))
+        finally:
+            # Closing early drops the rest of the body without downloading it
+            response.close()
+
+        self._store(key, b''.join(received), state['complete'], body.truncated, encoding, response.headers, kind,
+                    result, now)
+        return result
+
+    def _cached_extract(self, key, url, body_hash, extract, kind, now):
+        """Return the stored extraction, re-extracting from the stored body if possible"""
+        with self._lock:
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+            row = self._db.execute(
+                "SELECT data FROM extracts WHERE url = ? AND kind = ? AND body_hash = ?",
+                (key, kind, body_hash),
+            ).fetchone()
+            page_row = None
+            if row is None:
+                page_row = self._db.execute(
+                    "SELECT bodies.body, pages.complete, pages.encoding FROM pages "
+                    "JOIN bodies ON bodies.hash = pages.body_hash WHERE pages.url = ?",
+                    (key,),
+                ).fetchone()
+            self._db.commit()
+
+        if row is not None:
+            return json.loads(row[0])
+        if page_row is None or not page_row[1]:
+            return _MISSING
+
+        with span('extract', kind=kind, cached_body=True):
+            result = extract(url, [page_row[0]], page_row[2])
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extracts (url, kind, body_hash, data) VALUES (?, ?, ?, ?)",
+                (key, kind, body_hash, json.dumps(result)),
+            )
+            self._db.commit()
+        return result
+
+    def _store(self, key, body, complete, truncated, encoding, response_headers, kind, result, now):
+        body_hash = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO bodies (hash, body, size) VALUES (?, ?, ?)",
+                (body_hash, body, len(body)),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, body_hash, complete, truncated, encoding, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, body_hash, int(complete), int(truncated), encoding, response_headers.get('ETag'),
+                 response_headers.get('Last-Modified'), now, now),
+            )
+            # Extractions tied to an older body of this URL are stale now
+            self._db.execute("DELETE FROM extracts WHERE url = ? AND body_hash != ?", (key, body_hash))
+            self._db.execute(
+                "INSERT OR REPLACE INTO extracts (url, kind, body_hash, data) VALUES (?, ?, ?, ?)",
+                (key, kind, body_hash, json.dumps(result)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least-recently-used pages until bodies fit the size cap"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute("SELECT url FROM pages ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (row[0],))
+            self._db.execute("DELETE FROM extracts WHERE url = ?", (row[0],))
+            self._db.execute("DELETE FROM bodies WHERE hash NOT IN (SELECT body_hash FROM pages)")
+            self.evictions += 1
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def invalidate(self, url):
+        """Remove a single URL from the cache"""
+        key = normalize_url(url)
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE url = ?", (key,))
+            self._db.execute("DELETE FROM extracts WHERE url = ?", (key,))
+            self._db.execute("DELETE FROM bodies WHERE hash NOT IN (SELECT body_hash FROM pages)")
+            self._db.commit()
+
+    def clear(self):
+        """Remove every cached page"""
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM extracts")
+            self._db.execute("DELETE FROM bodies")
+            self._db.commit()
+
+    def stats(self, sizes=True):
+        """Return hit/miss counters and, with `sizes`, current store size
+
+        Without `sizes` nothing is read from SQLite, which suits a UI
+        redrawn on every rerun.
+        """
+        lookups = self.hits + self.misses + self.revalidated
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evictions': self.evictions,
+            'hit_ratio': (self.hits + self.revalidated) / lookups if lookups else 0.0,
+        }
+        if sizes:
+            with self._lock:
+                stats['entries'], stats['bytes'] = self._db.execute(
+                    "SELECT COUNT(*), (SELECT COALESCE(SUM(size), 0) FROM bodies) FROM pages"
+                ).fetchone()
+        return stats
+
+
+_cache = ProcessWide(PageCache)
+
+
+def get_page_cache():
+    """Return the process-wide page cache, creating it on first use"""
+    return _cache.get()
+
+
+def configure(**settings):
+    """Replace the process-wide cache with one built from the given settings"""
+    _cache.configure(**settings)
@@ -0,0 +1,612 @@
+"""
+Headless scrape, crawl and summarize pipeline.
+
+Everything the Web Crawler & Scraper Bot does with a URL, without
+Streamlit: scrape_website() and crawl_website() fetch and extract pages,
+get_model_response() sends a prompt to the configured model backend, and summarize_page()
+and analyze_crawl() turn a scraped page or a crawl into the reply the
+chat shows; a message with several URLs is scraped in parallel by
+scrape_websites() and answered with one comparison by compare_pages().
+recrawl_website() and analyze_changes() crawl a site again, fetching and
+summarizing only what changed since its last re-crawl (see crawl_state.py).
+summarize_url() runs the whole thing for one URL and returns a plain
+dict, for batch jobs (see batch_summarize.py) and other scripts.
+
+Status updates go to a jobs.Job: the app passes the background job
+answering a message, and summarize_url() makes a detached one when none
+is given. Nothing here touches st.session_state.
+"""
+
+import contextvars
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+
+from chat_history import clip_tokens, format_transcript
+from crawl_state import IncrementalFetcher, diff_text, get_crawl_state
+from crawler import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST_DELAY, run_crawl
+from extraction import SCRAPE_RULES, extract_page
+from jobs import Job, JobCancelled
+from llm_cache import get_llm_cache, make_key
+from llm_scheduler import PRIORITY_CHAT, PRIORITY_CRAWL, PRIORITY_PAGE, get_llm_scheduler
+from llm_backends import get_backend
+from ollama_client import chat_messages
+from page_cache import get_page_cache, normalize_url
+from retrieval import TOP_K, VectorIndex
+from single_flight import get_single_flight
+from summarizer import Summarizer, format_summaries
+from tracing import breakdown, span
+
+LLM_BACKEND = "ollama"  # "ollama", "gemini" or "fake" (see llm_backends.py)
+MODEL_NAME = "qwen2.5:7b-instruct"
+BACKEND_SETTINGS = {"base_url": "http://localhost:11434"}  # Other backend settings, e.g. {"api_key": ...} for gemini
+USE_CHAT_API = True  # Structured chat messages with a stable prefix (False: one prompt string)
+USE_LLM_CACHE = True  # Reuse responses for identical prompts
+CRAWL_MAX_PAGES = 5
+MAX_URLS = 8                 # URLs read from one message; later ones are ignored
+SCRAPE_CONCURRENCY = 4       # Pages of a multi-URL message fetched at once
+COMPARE_PAGE_TOKENS = 1500   # Page text per URL sent in a comparison prompt
+REFERENCE_TOKENS = 2000      # Page text sent with follow-up questions about pages read earlier
+# Compiled once per process rather than on every message
+URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+# Words in a message that ask for a crawl instead of a single page
+CRAWL_KEYWORDS = ['crawl', 'multiple pages', 'entire site', 'all pages', 'site map', 'deep dive', 'full site']
+# Words that ask what changed since the site was last crawled
+RECRAWL_KEYWORDS = ['recrawl', 're-crawl', 'what changed', 'changes since']
+CRAWL_SUMMARY_QUERY = (
+    "overall website theme and purpose, main sections and topics covered, "
+    "key insights and information, site structure and organization"
+)
+
+SCRAPER_SYSTEM_PROMPT = (
+    "You are an intelligent web content analyzer and summarizer. "
+    "Your task is to analyze web content (single page or multiple pages) and create comprehensive, well-structured summaries. "
+    "When given website content, you should:\n\n"
+    "1. Identify the main topic and key themes across all pages\n"
+    "2. Extract important information, statistics, and facts\n"
+    "3. Organize the summary in a clear, hierarchical format\n"
+    "4. Highlight any significant insights or conclusions\n"
+    "5. If multiple pages were crawled, mention the breadth of content covered\n"
+    "6. Mention the source website(s) for reference\n\n"
+    "For crawled content, provide an overview of the site structure and main sections. "
+    "Provide summaries that are informative, accurate, and easy to understand. "
+    "If the content is technical, explain complex concepts in simpler terms."
+)
+
+
+def is_valid_url(url):
+    """Check if the provided string is a valid URL"""
+    try:
+        result = urlparse(url)
+        return all([result.scheme, result.netloc])
+    except:
+        return False
+
+
+def scrape_website(url):
+    """Scrape content from the given URL"""
+    try:
+        # Add headers to mimic a real browser
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+        # Cache hits skip both the request and the parse; identical
+        # scrapes already in flight in other sessions share one download
+        page = get_single_flight('page').do(
+            (SCRAPE_RULES.cache_kind, normalize_url(url)),
+            lambda: get_page_cache().fetch(
+                url,
+                lambda page_url, chunks, encoding: extract_page(chunks, rules=SCRAPE_RULES, encoding=encoding),
+                kind=SCRAPE_RULES.cache_kind,
+                headers=headers,
+                timeout=10,
+            ),
+        )
+        
+        return {
+            'title': page['title'],
+            'content': page['content'],
+            'url': url,
+            'success': True
+        }
+        
+    except requests.exceptions.RequestException as e:
+        return {
+            'error': f"Failed to fetch the website: {str(e)}",
+            'url': url,
+            'success': False
+        }
+    except Exception as e:
+        return {
+            'error': f"Error processing the website: {str(e)}",
+            'url': url,
+            'success': False
+        }
+
+
+def find_urls(text, limit=MAX_URLS):
+    """Return the distinct URLs in a message, in order"""
+    urls = {}
+    for url in URL_RE.findall(text):
+        # The pattern also takes punctuation that ends a sentence or separates a list
+        url = url.rstrip('.,;:!?')
+        urls.setdefault(normalize_url(url), url)
+    return list(urls.values())[:limit]
+
+
+def scrape_websites(job, urls, concurrency=SCRAPE_CONCURRENCY):
+    """Scrape several URLs at once, returning their scrape_website() results in order"""
+    results = [None] * len(urls)
+    with span('scrape', urls=len(urls)), ThreadPoolExecutor(max_workers=min(concurrency, len(urls))) as executor:
+        # Each fetch runs in a copy of this context so its span joins the request
+        futures = {
+            executor.submit(contextvars.copy_context().run, scrape_website, url): i for i, url in enumerate(urls)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                job.check_cancelled()
+                job.set_progress(f"🕷️ Scraped {done}/{len(urls)} pages")
+        except BaseException:
+            # Don't start the remaining fetches after a cancellation
+            for future in futures:
+                future.cancel()
+            raise
+    job.set_progress(None)
+    return results
+
+
+def crawl_website(job, start_url, max_pages=5, delay=DEFAULT_PER_HOST_DELAY, concurrency=DEFAULT_CONCURRENCY,
+                  query=None, **kwargs):
+    """Crawl multiple pages from a website, preferring pages about `query`
+
+    Other keyword arguments (e.g. `fetch`) go to crawler.run_crawl.
+    """
+    def show_progress(page_number, total_pages, current_url):
+        job.set_progress(f"🕷️ Crawling page {page_number}/{total_pages}: {current_url}")
+
+    def show_error(current_url, error):
+        job.notify('warning', f"Failed to crawl {current_url}: {str(error)}")
+
+    # Pages are fetched concurrently; `delay` is the per-host spacing between requests
+    with span('crawl', url=start_url, max_pages=max_pages) as current:
+        result = run_crawl(
+            start_url,
+            max_pages=max_pages,
+            concurrency=concurrency,
+            per_host_delay=delay,
+            progress_callback=show_progress,
+            error_callback=show_error,
+            cancel_event=job.cancel_event,
+            query=query,
+            **kwargs,
+        )
+        current.attrs['pages'] = result.get('pages_crawled', 0)
+
+    job.check_cancelled()
+    job.set_progress(None)
+    if result.get('stats'):
+        skipped = result['stats']['skipped']
+        job.notify(
+            'caption',
+            f"🧭 Fetched {result['stats']['fetched']} URLs; skipped {skipped.get('duplicate', 0)} duplicate links, "
+            f"{skipped.get('near_duplicate', 0)} near-duplicate pages, {skipped.get('not_html', 0)} non-HTML links "
+            f"and {skipped.get('robots', 0)} pages disallowed by robots.txt"
+        )
+    return result
+
+
+def collect_stream(job, tokens):
+    """Accumulate streamed tokens into the job's partial reply and return the full text"""
+    text = ""
+    for token in tokens:
+        # Closing the generator on cancel also closes the model connection
+        job.check_cancelled()
+        text += token
+        job.partial = text
+    return text.strip()
+
+
+def get_llm():
+    """Return the shared model backend, built on first use"""
+    return get_backend(LLM_BACKEND, model=MODEL_NAME, **BACKEND_SETTINGS)
+
+
+def get_model_response(prompt, job=None, priority=PRIORITY_CHAT, context=(), reference=None):
+    """Get response from the model, streaming into `job`'s partial reply if given
+
+    `context` holds recent (sender, text) turns to send as the conversation so far,
+    and `reference` text (e.g. from follow_up_prompt()) goes before them.
+    """
+    with span('prompt', chars=len(prompt), turns=len(context)) as current:
+        if USE_CHAT_API:
+            # System prompt, reference pages and earlier turns first and
+            # byte-identical between follow-ups, so Ollama can reuse their KV
+            # cache; new content goes last
+            messages = chat_messages(SCRAPER_SYSTEM_PROMPT, context, prompt, reference)
+            cache_key = make_key(MODEL_NAME, SCRAPER_SYSTEM_PROMPT, json.dumps(messages))
+        else:
+            full_prompt = SCRAPER_SYSTEM_PROMPT
+            if reference:
+                full_prompt += f"\n\n{reference}"
+            if context:
+                transcript = format_transcript(context, {'You': 'User', 'Bot': 'AI'})
+                full_prompt += f"\n\nConversation so far:\n{transcript}"
+            full_prompt += f"\n\nUser Query: {prompt}\n\nAI Response:"
+            cache_key = make_key(MODEL_NAME, SCRAPER_SYSTEM_PROMPT, full_prompt)
+
+        if USE_LLM_CACHE:
+            cached = get_llm_cache().get(cache_key)
+            current.attrs['cached'] = cached is not None
+            if cached is not None:
+                return cached
+
+    def compute():
+        if job is None:
+            with get_llm_scheduler().slot(priority):
+                start = time.perf_counter()
+                if USE_CHAT_API:
+                    response = get_llm().complete(messages)
+                else:
+                    response = get_llm().generate(full_prompt)
+        else:
+            job.set_progress("⏳ Waiting for the model...")
+            # The slot is held until the whole reply has streamed
+            with get_llm_scheduler().slot(priority, check=job.check_cancelled):
+                job.set_progress(None)
+                start = time.perf_counter()
+                if USE_CHAT_API:
+                    tokens = get_llm().stream(messages, metrics=job.metrics)
+                else:
+                    tokens = get_llm().stream_generate(full_prompt, metrics=job.metrics)
+                response = collect_stream(job, tokens)
+
+        if USE_LLM_CACHE:
+            get_llm_cache().put(cache_key, response, time.perf_counter() - start)
+        return response
+
+    # Identical prompts already in flight in other sessions share one model call
+    return get_single_flight('llm').do(
+        cache_key,
+        compute,
+        check=job.check_cancelled if job is not None else None,
+        retry_on=(JobCancelled,),
+    )
+
+
+def follow_up_prompt(question, passages, pages, max_tokens=REFERENCE_TOKENS):
+    """Return (reference, prompt) for a question about pages read earlier
+
+    `passages` are the stored passages that match the question and `pages`
+    the stored pages they came from. The pages' text, clipped to share
+    `max_tokens`, is the reference: it stays the same for every question
+    about those pages, so get_model_response() can keep it in the cached
+    prefix. Only matching passages past the clipped text go into the
+    prompt with the question.
+    """
+    page_tokens = max_tokens // max(len(pages), 1)
+    texts = {page['url']: clip_tokens(page['content'], page_tokens) for page in pages}
+    reference = '\n\n'.join(
+        ["Answer using these pages from websites analyzed earlier in this conversation. "
+         "If they don't cover a question, say so and answer from general knowledge."]
+        + [f"Page: {page['title']}\nURL: {page['url']}\nContent: {texts[page['url']]}\n---" for page in pages]
+    )
+    excerpts = '\n\n'.join(
+        f"Page: {passage['title']}\nURL: {passage['url']}\nExcerpt: {passage['text']}\n---"
+        for passage in passages if passage['text'] not in texts.get(passage['url'], '')
+    )
+    if not excerpts:
+        return reference, question
+    return reference, f"""More excerpts from those pages:
+{excerpts}
+
+Question: {question}"""
+
+
+def crawl_summarizer(job):
+    """Return a Summarizer whose model calls are queued and cancelled with `job`"""
+    def call_model(prompt):
+        with get_llm_scheduler().slot(PRIORITY_CRAWL, check=job.check_cancelled):
+            return get_llm().generate(prompt)
+
+    def complete(prompt):
+        # Two sessions crawling the same site share each page summary call
+        return get_single_flight('llm').do(
+            make_key(MODEL_NAME, None, prompt),
+            lambda: call_model(prompt),
+            check=job.check_cancelled,
+            retry_on=(JobCancelled,),
+        )
+
+    return Summarizer(complete, MODEL_NAME)
+
+
+def summarize_crawl(job, pages, reduce=True):
+    """Summarize crawled pages in parallel and reduce them to fit one prompt
+
+    Without `reduce` the summaries of every page (or chunk of a long
+    page) are returned as they are.
+    """
+    def show_progress(done, total, current_url):
+        job.check_cancelled()
+        job.set_progress(f"📝 Summarized {done}/{total}: {current_url}")
+
+    summarizer = crawl_summarizer(job)
+    hits_before = summarizer.cache.hits
+    summaries = summarizer.map(pages, progress_callback=show_progress)
+    if reduce:
+        summaries = summarizer.reduce(summaries)
+    job.set_progress(None)
+    job.notify(
+        'caption',
+        f"📝 Summarized {len(pages)} pages in parallel "
+        f"({summarizer.cache.hits - hits_before} cached summaries of unchanged pages reused)"
+    )
+    return summaries
+
+
+def crawl_query(user_input, urls, crawl_keywords):
+    """Derive the retrieval query for a crawl from what the user typed"""
+    query = user_input
+    for text in urls + crawl_keywords:
+        query = re.sub(re.escape(text), ' ', query, flags=re.IGNORECASE)
+    # Drop the commas and the like that separated a list of URLs
+    query = re.sub(r'(?:^|\s)[^\w\s]+(?=\s|$)', ' ', query)
+    query = re.sub(r'\s+', ' ', query).strip()
+    # A bare "crawl <url>" asks for a site overview
+    return query if len(query.split()) >= 3 else CRAWL_SUMMARY_QUERY
+
+
+def summarize_page(job, scraped_data):
+    """Ask the model to summarize one scraped page"""
+    prompt = f"""Please analyze and summarize the following website content:
+
+URL: {scraped_data['url']}
+Title: {scraped_data['title']}
+
+Content:
+{scraped_data['content']}
+
+Please provide a comprehensive summary of this website's content."""
+
+    return get_model_response(prompt, job, priority=PRIORITY_PAGE)
+
+
+def compare_pages(job, scraped, question=None, page_tokens=COMPARE_PAGE_TOKENS):
+    """Ask the model for one comparative summary of several scraped pages
+
+    `scraped` holds scrape_website() results; each page is cut to
+    `page_tokens` so one long page can't crowd out the others. Failed URLs
+    are reported as warnings and named in the prompt.
+    """
+    pages = [page for page in scraped if page['success']]
+    failed = [(page['url'], page['error']) for page in scraped if not page['success']]
+    for url, error in failed:
+        job.notify('warning', f"Failed to scrape {url}: {error}")
+
+    sections = '\n\n'.join(
+        f"Page {number}: {page['title']}\nURL: {page['url']}\nContent:\n{clip_tokens(page['content'], page_tokens)}\n---"
+        for number, page in enumerate(pages, 1)
+    )
+    unavailable = ''
+    if failed:
+        unavailable = "\n\nThese pages could not be fetched:\n" + '\n'.join(f"• {url}" for url, _ in failed)
+    request = f"Question: {question}" if question else (
+        "Please compare them: what each page covers, where they agree and differ, "
+        "and what stands out on each one."
+    )
+    prompt = f"""Please analyze these web pages together:
+
+{sections}{unavailable}
+
+{request}"""
+
+    return get_model_response(prompt, job, priority=PRIORITY_PAGE)
+
+
+def analyze_crawl(job, crawled_data, query=CRAWL_SUMMARY_QUERY, page_summaries=None):
+    """Ask the model about a successful crawl: a site overview, or an answer to `query`
+
+    An overview uses `page_summaries` (unreduced summarize_crawl() output)
+    when the pages were already summarized.
+    """
+    page_titles = [f"• {page['title']} ({page['url']})" for page in crawled_data['data']]
+    pages_info = '\n'.join(page_titles)
+
+    if query == CRAWL_SUMMARY_QUERY:
+        # Site overview: summarize every page, then combine the summaries
+        if page_summaries is None:
+            summaries = summarize_crawl(job, crawled_data['data'])
+        else:
+            summaries = crawl_summarizer(job).reduce(page_summaries)
+        context = f"Page Summaries:\n{format_summaries(summaries)}"
+        request = "Please analyze and provide a comprehensive summary"
+        instructions = """Please provide a comprehensive analysis covering:
+1. Overall website theme and purpose
+2. Main sections and topics covered
+3. Key insights and information
+4. Site structure and organization"""
+    else:
+        # Specific question: send only the chunks relevant to it
+        with span('retrieve') as current:
+            index = VectorIndex()
+            index.add_pages(crawled_data['data'])
+            results = index.search(query, k=TOP_K)
+            current.attrs.update(chunks=len(index.chunks), sent=len(results), embedder=index.embedder.name)
+        excerpts = '\n\n'.join(
+            f"Page: {chunk['title']}\nURL: {chunk['url']}\nExcerpt: {chunk['text']}\n---"
+            for _, chunk in results
+        )
+        job.notify(
+            'caption',
+            f"🔎 Sent {len(results)} of {len(index.chunks)} chunks "
+            f"({index.embedder.name} retrieval)"
+        )
+        context = f"Most Relevant Excerpts:\n{excerpts}"
+        request = "Please answer a question about it"
+        instructions = (
+            f"Question: {query}\n\n"
+            "Answer the question from the excerpts above, citing the pages they come from. "
+            "If the excerpts don't answer it, say so."
+        )
+
+    prompt = f"""I crawled {crawled_data['pages_crawled']} pages from the website. {request}:
+
+Starting URL: {crawled_data['start_url']}
+
+Pages Crawled:
+{pages_info}
+
+{context}
+
+{instructions}"""
+
+    return get_model_response(prompt, job, priority=PRIORITY_CRAWL)
+
+
+def recrawl_website(job, start_url, max_pages=CRAWL_MAX_PAGES, **kwargs):
+    """Crawl a site again, sending conditional requests for the pages of its last re-crawl
+
+    Returns the crawl_website() result plus 'site', 'previous' (the last
+    crawl's pages by normalized URL), 'fetched' (what each request found)
+    and 'changes' (the crawled pages split into new, changed and unchanged).
+    """
+    site = normalize_url(start_url)
+    previous = get_crawl_state().load(site)
+    fetcher = IncrementalFetcher(previous)
+    result = crawl_website(job, start_url, max_pages=max_pages, fetch=fetcher, **kwargs)
+    if result['success']:
+        changes = {'new': [], 'changed': [], 'unchanged': []}
+        for page in result['data']:
+            changes[fetcher.fetched[normalize_url(page['url'])]['status']].append(page)
+        result.update(site=site, previous=previous, fetched=fetcher.fetched, changes=changes)
+        job.notify(
+            'caption',
+            f"♻️ {len(changes['new'])} new, {len(changes['changed'])} changed and {len(changes['unchanged'])} "
+            f"unchanged pages; {fetcher.not_modified} answered 304 Not Modified"
+        )
+    return result
+
+
+def analyze_changes(job, crawled_data):
+    """Summarize what changed in a re-crawl and save it as the site's last crawl
+
+    Only new and changed pages are summarized; unchanged ones keep their
+    stored summaries. The first re-crawl of a site has nothing to compare
+    with and gets the usual site overview.
+    """
+    changes, previous = crawled_data['changes'], crawled_data['previous']
+    summaries = {}
+    for page in changes['unchanged']:
+        summaries[page['url']] = previous[normalize_url(page['url'])]['summary']
+    pending = [page for page in crawled_data['data'] if summaries.get(page['url']) is None]
+    page_summaries = summarize_crawl(job, pending, reduce=False) if pending else []
+    for entry in page_summaries:
+        # Long pages are summarized in chunks; keep one summary per page
+        summaries[entry['url']] = '\n'.join(filter(None, [summaries.get(entry['url']), entry['summary']]))
+    get_crawl_state().save(crawled_data['site'], crawled_data['data'], crawled_data['fetched'], summaries)
+
+    if not previous:
+        # Nothing to compare with yet: every page was just summarized for the overview
+        return analyze_crawl(job, crawled_data, page_summaries=page_summaries)
+
+    last_crawl = time.strftime('%Y-%m-%d %H:%M', time.localtime(max(entry['crawled_at'] for entry in previous.values())))
+    crawled = {normalize_url(page['url']) for page in crawled_data['data']}
+    missing = [entry['page']['url'] for url, entry in previous.items() if url not in crawled]
+    if not changes['new'] and not changes['changed'] and not missing:
+        return (f"✅ Nothing changed on {crawled_data['start_url']} since the last crawl ({last_crawl}): "
+                f"all {len(changes['unchanged'])} pages are the same.")
+
+    sections = []
+    if changes['changed']:
+        diffs = []
+        for page in changes['changed']:
+            before = previous[normalize_url(page['url'])]['page']
+            renamed = f"Title was: {before['title']}\n" if before['title'] != page['title'] else ''
+            diffs.append(f"Page: {page['title']}\nURL: {page['url']}\n{renamed}"
+                         f"{diff_text(before['content'], page['content'])}\n---")
+        sections.append("Changed pages (- removed, + added sentences):\n" + '\n\n'.join(diffs))
+    if changes['new']:
+        sections.append("New pages:\n" + format_summaries(
+            [{'url': page['url'], 'title': page['title'], 'summary': summaries[page['url']]} for page in changes['new']]
+        ))
+    if missing:
+        sections.append("Pages from the last crawl not reached this time:\n" + '\n'.join(f"• {url}" for url in missing))
+    sections = '\n\n'.join(sections)
+
+    prompt = f"""I crawled {crawled_data['start_url']} again; it was last crawled {last_crawl}. {len(changes['unchanged'])} of the {crawled_data['pages_crawled']} pages crawled are unchanged.
+
+{sections}
+
+Please summarize what changed on the website since the last crawl: what was added, removed or updated, and which changes matter most."""
+
+    return get_model_response(prompt, job, priority=PRIORITY_CRAWL)
+
+
+def summarize_url(url, crawl=False, question=None, max_pages=CRAWL_MAX_PAGES, job=None, incremental=False):
+    """Scrape (or crawl) a URL and summarize it, returning a JSON-ready result dict
+
+    With `crawl`, `question` is answered from the crawled pages instead of
+    writing a site overview; with `incremental` too, the summary says what
+    changed since the site's last incremental crawl. Failures are reported
+    in the result, except cancellation through `job`, which raises
+    JobCancelled.
+    """
+    job = job if job is not None else Job(None, url)
+    start = time.perf_counter()
+    result = {'url': url, 'success': False, 'mode': 'crawl' if crawl else 'page'}
+
+    with span('request', url=url, mode=result['mode']) as current:
+        try:
+            if not is_valid_url(url):
+                result['error'] = "Not a valid URL"
+            elif crawl and incremental:
+                crawled_data = recrawl_website(job, url, max_pages=max_pages)
+                if crawled_data['success']:
+                    result['summary'] = analyze_changes(job, crawled_data)
+                    result['pages'] = [{'url': page['url'], 'title': page['title']} for page in crawled_data['data']]
+                    result['changes'] = {kind: [page['url'] for page in pages]
+                                         for kind, pages in crawled_data['changes'].items()}
+                    result['stats'] = crawled_data['stats']
+                    result['success'] = True
+                else:
+                    result['error'] = crawled_data['error']
+            elif crawl:
+                query = question or CRAWL_SUMMARY_QUERY
+                crawled_data = crawl_website(
+                    job, url, max_pages=max_pages, query=None if query == CRAWL_SUMMARY_QUERY else query
+                )
+                if crawled_data['success']:
+                    result['summary'] = analyze_crawl(job, crawled_data, query)
+                    result['pages'] = [{'url': page['url'], 'title': page['title']} for page in crawled_data['data']]
+                    result['stats'] = crawled_data['stats']
+                    result['success'] = True
+                else:
+                    result['error'] = crawled_data['error']
+            else:
+                scraped_data = scrape_website(url)
+                job.check_cancelled()
+                if scraped_data['success']:
+                    result['title'] = scraped_data['title']
+                    result['summary'] = summarize_page(job, scraped_data)
+                    result['success'] = True
+                else:
+                    result['error'] = scraped_data['error']
+        except JobCancelled:
+            raise
+        except Exception as e:
+            result['error'] = str(e)
+        if not result['success']:
+            current.attrs['error'] = result['error']
+
+    result['warnings'] = [text for kind, text in job.notices if kind == 'warning']
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    # Seconds spent in each stage itself, excluding the stages inside it
+    job.trace = current.attrs.pop('trace', None) or current.to_dict()
+    result['stages'] = {name: round(entry[2], 3) for name, entry in breakdown(job.trace).items()}
+    return result
@@ -0,0 +1,44 @@
+"""
+Lazily built, process-wide instances shared by every session.
+
+The HTTP session, page cache, response cache, summary cache, job manager,
+model scheduler, tracer, crawl state and robots.txt cache each exist once
+per Streamlit server process. ProcessWide holds one of them: get() builds
+it on first use (under a lock, so concurrent sessions don't build two)
+and configure(**settings) drops it, so the next get() builds a new one
+from the module's defaults updated with `settings`. Calling configure()
+with no settings restores the defaults; settings from earlier calls are
+not kept.
+"""
+
+import threading
+
+
+class ProcessWide:
+    """One process-wide instance of `factory`, built on first use"""
+
+    def __init__(self, factory, close=None, **defaults):
+        self.factory = factory
+        self.close = close              # Called with the old instance when it is replaced
+        self.defaults = defaults
+        self._settings = dict(defaults)
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the instance, building it from the current settings on first use"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.factory(**self._settings)
+                instance = self._instance
+        return instance
+
+    def configure(self, **settings):
+        """Replace the instance with one built from the defaults updated with `settings`"""
+        with self._lock:
+            old, self._instance = self._instance, None
+            self._settings = dict(self.defaults, **settings)
+        if old is not None and self.close is not None:
+            self.close(old)
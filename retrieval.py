@@ -0,0 +1,193 @@
+"""
+Local retrieval index for crawl mode.
+
+Crawled pages are split into overlapping chunks, embedded, and stored in a
+NumPy matrix. A query then pulls only the top-k most relevant chunks into
+the prompt instead of the first 12,000 characters of every page joined
+together. Embeddings come from Ollama's /api/embed endpoint when an
+embedding model is available, with a hashed TF-IDF embedder on the CPU as
+the fallback. NumPy is imported on first use, so modules that only need
+tokenize() (the document store, the crawl frontier) don't pay for it.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+
+from http_session import get_session
+
+OLLAMA_EMBED_URL = "http://localhost:11434/api/embed"
+EMBED_MODEL = "nomic-embed-text"
+
+CHUNK_SIZE = 800      # Characters per chunk
+CHUNK_OVERLAP = 100   # Characters shared by neighbouring chunks
+TOP_K = 8             # Chunks sent to the model per query
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_SENTENCE_END_RE = re.compile(r'[.!?]\s')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping chunks, preferring sentence boundaries"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Back up to the last sentence end in the second half of the chunk
+            boundary = None
+            for match in _SENTENCE_END_RE.finditer(text, start + chunk_size // 2, end):
+                boundary = match.end()
+            if boundary:
+                end = boundary
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+class HashingTfidfEmbedder:
+    """CPU fallback: TF-IDF over hashed token features (no model needed)"""
+
+    name = 'tfidf'
+
+    def __init__(self, dimensions=4096):
+        import numpy as np
+        self.dimensions = dimensions
+        self.idf = np.ones(dimensions, dtype=np.float32)
+
+    def _feature(self, token):
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        return value % self.dimensions, 1.0 if (value >> 63) & 1 else -1.0
+
+    def fit(self, texts):
+        """Compute inverse document frequencies from the indexed chunks"""
+        import numpy as np
+        document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for text in texts:
+            for index in {self._feature(token)[0] for token in tokenize(text)}:
+                document_frequency[index] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1.0
+
+    def embed(self, texts):
+        import numpy as np
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, count in Counter(tokenize(text)).items():
+                index, sign = self._feature(token)
+                vectors[row, index] += sign * (1 + math.log(count))
+        return vectors * self.idf
+
+
+class OllamaEmbedder:
+    """Embeddings from Ollama's /api/embed endpoint"""
+
+    name = 'ollama'
+
+    def __init__(self, url=OLLAMA_EMBED_URL, model=EMBED_MODEL, batch_size=32, timeout=(5, 120)):
+        self.url = url
+        self.model = model
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def fit(self, texts):
+        pass  # Pretrained model; nothing to learn from the corpus
+
+    def embed(self, texts):
+        import numpy as np
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            response = get_session().post(
+                self.url,
+                json={"model": self.model, "input": texts[i:i + self.batch_size]},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            vectors.extend(response.json()["embeddings"])
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder_choice = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Return the Ollama embedder if it answers, otherwise the TF-IDF fallback
+
+    The probe runs once per process so an unavailable embedding model
+    doesn't cost a timeout on every crawl.
+    """
+    global _embedder_choice
+    with _embedder_lock:
+        if _embedder_choice is None:
+            try:
+                OllamaEmbedder(timeout=(2, 30)).embed(["probe"])
+                _embedder_choice = 'ollama'
+            except Exception:
+                _embedder_choice = 'tfidf'
+    return OllamaEmbedder() if _embedder_choice == 'ollama' else HashingTfidfEmbedder()
+
+
+class VectorIndex:
+    """Chunks of crawled pages with their normalized embedding vectors"""
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.chunks = []       # dicts with url, title, text
+        self.vectors = None    # (n_chunks, dim) float32, rows L2-normalized
+
+    def add_pages(self, pages, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+        """Chunk and embed crawled pages ({'url', 'title', 'content'} dicts)"""
+        import numpy as np
+        new_chunks = [
+            {'url': page['url'], 'title': page['title'], 'text': text}
+            for page in pages
+            for text in chunk_text(page['content'], chunk_size, overlap)
+        ]
+        if not new_chunks:
+            return
+        self.chunks.extend(new_chunks)
+        # TF-IDF weights depend on the whole corpus, so refit and re-embed
+        if isinstance(self.embedder, HashingTfidfEmbedder):
+            self.embedder.fit([chunk['text'] for chunk in self.chunks])
+            self.vectors = self._normalize(self.embedder.embed([chunk['text'] for chunk in self.chunks]))
+        else:
+            vectors = self._normalize(self.embedder.embed([chunk['text'] for chunk in new_chunks]))
+            self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+
+    def search(self, query, k=TOP_K, per_page_limit=None):
+        """Return up to k (score, chunk) pairs most similar to the query"""
+        import numpy as np
+        if not self.chunks:
+            return []
+        query_vector = self._normalize(self.embedder.embed([query]))[0]
+        scores = self.vectors @ query_vector
+
+        results = []
+        per_page = Counter()
+        for index in np.argsort(-scores):
+            chunk = self.chunks[index]
+            if per_page_limit and per_page[chunk['url']] >= per_page_limit:
+                continue
+            per_page[chunk['url']] += 1
+            results.append((float(scores[index]), chunk))
+            if len(results) >= k:
+                break
+        return results
+
+    @staticmethod
+    def _normalize(vectors):
+        import numpy as np
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,88 @@
+"""
+Single-flight deduplication of in-flight work.
+
+When several sessions ask for the same page or the same completion at
+the same moment (a link shared in a team chat), only the first caller
+does the work. Callers arriving while it runs wait on the same future and
+get the same result or exception. Nothing is kept once the call finishes;
+that's the caches' job. This only collapses the stampede before a result
+exists.
+"""
+
+import threading
+from concurrent.futures import Future, wait
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0     # Calls that did the work
+        self.shared = 0    # Calls that waited for someone else's result
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, check=None, retry_on=(), poll_interval=0.1):
+        """Return fn()'s result, sharing one in-flight call per key
+
+        `check()` is called periodically while waiting for another caller;
+        raise from it to stop waiting. If the call being waited on fails
+        with one of `retry_on` (e.g. its caller was cancelled), the waiter
+        runs the call itself instead of inheriting the error.
+        """
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                leader = future is None
+                if leader:
+                    future = self._futures[key] = Future()
+                    self.calls += 1
+                else:
+                    self.shared += 1
+
+            if leader:
+                try:
+                    result = fn()
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+                else:
+                    future.set_result(result)
+                    return result
+                finally:
+                    with self._lock:
+                        del self._futures[key]
+
+            self._wait(future, check, poll_interval)
+            try:
+                return future.result()
+            except retry_on:
+                with self._lock:
+                    self.shared -= 1
+
+    @staticmethod
+    def _wait(future, check, poll_interval):
+        if check is None:
+            wait([future])
+            return
+        while not wait([future], timeout=poll_interval).done:
+            check()
+
+    def stats(self):
+        """Return how many calls did the work, were shared, and are running"""
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'in_flight': len(self._futures)}
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name):
+    """Return the process-wide single-flight group for a kind of work"""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
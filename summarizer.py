@@ -0,0 +1,168 @@
+"""
+Map-reduce summarization for crawls.
+
+Instead of joining every crawled page into one prompt cut at 12,000
+characters, each page (or chunk of a long page) is summarized on its own
+with a few model requests in flight at once, and the partial summaries are
+then combined into the final site analysis. When the partial summaries
+would not fit one prompt they are first reduced in groups. Page summaries
+are cached on a hash of the page text, so a re-crawl only re-summarizes
+pages whose content changed.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import LLMCache
+from process_wide import ProcessWide
+from retrieval import chunk_text
+from tracing import span
+
+SUMMARY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'summaries.sqlite3')
+SUMMARY_CACHE_TTL = 30 * 24 * 60 * 60  # Keyed on page text, so entries only age out
+MAP_CONCURRENCY = 4       # Page summaries requested from the model at once
+MAP_CHUNK_SIZE = 4000     # Characters of page text per map call
+REDUCE_MAX_CHARS = 6000   # Partial summaries combined per reduce call
+
+MAP_PROMPT = (
+    "Summarize this part of a web page in 3-5 concise bullet points. "
+    "Keep concrete facts, names and numbers.\n\n"
+    "Title: {title}\n\nContent:\n{text}\n\nSummary:"
+)
+REDUCE_PROMPT = (
+    "Combine these summaries of pages from one website into a single concise summary "
+    "that keeps the key facts from each.\n\n{summaries}\n\nCombined summary:"
+)
+
+
+def page_chunks(pages, chunk_size=MAP_CHUNK_SIZE):
+    """Split crawled pages ({'url', 'title', 'content'} dicts) into map inputs"""
+    return [
+        {'url': page['url'], 'title': page['title'], 'text': text}
+        for page in pages
+        for text in chunk_text(page['content'], chunk_size, overlap=0)
+    ]
+
+
+def format_summaries(summaries):
+    """Render partial summaries as prompt text, one block per page"""
+    return '\n\n'.join(
+        f"Page: {item['title']}\nURL: {item['url']}\nSummary: {item['summary']}\n---"
+        for item in summaries
+    )
+
+
+def group_summaries(summaries, max_chars=REDUCE_MAX_CHARS):
+    """Split partial summaries into groups that each fit one reduce prompt"""
+    groups = [[]]
+    size = 0
+    for item in summaries:
+        item_size = len(format_summaries([item]))
+        if groups[-1] and size + item_size > max_chars:
+            groups.append([])
+            size = 0
+        groups[-1].append(item)
+        size += item_size
+    return groups
+
+
+def clip_summaries(summaries, max_chars=REDUCE_MAX_CHARS):
+    """Cut each summary so at least two of them fit one reduce prompt"""
+    clipped = []
+    for item in summaries:
+        limit = max(max_chars // 2 - len(format_summaries([dict(item, summary='')])), 0)
+        text = item['summary']
+        clipped.append(dict(item, summary=text if len(text) <= limit else text[:limit - 1].rstrip() + "…"))
+    return clipped
+
+
+class Summarizer:
+    """Summarizes crawled pages with parallel map calls and cached results
+
+    `complete(prompt)` returns the model's reply to a prompt and is called
+    from worker threads; `model` names the model in cache keys.
+    """
+
+    def __init__(self, complete, model, concurrency=MAP_CONCURRENCY, cache=None):
+        self.complete = complete
+        self.model = model
+        self.concurrency = concurrency
+        self.cache = cache or get_summary_cache()
+
+    def summarize_chunk(self, chunk):
+        prompt = MAP_PROMPT.format(title=chunk['title'], text=chunk['text'])
+        # The key hashes the prompt, i.e. the page's title and text
+        return self.cache.cached_call(self.model, None, prompt, lambda: self.complete(prompt))
+
+    def map(self, pages, progress_callback=None):
+        """Summarize every page chunk, returning summaries in page order
+
+        `progress_callback(done, total, url)` is called from this thread as
+        summaries complete; an exception it raises cancels the calls not
+        yet started.
+        """
+        chunks = page_chunks(pages)
+        summaries = [None] * len(chunks)
+        with span('map', chunks=len(chunks)), ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Each call runs in a copy of this context so its llm span joins the request
+            futures = [executor.submit(contextvars.copy_context().run, self.summarize_chunk, chunk) for chunk in chunks]
+            try:
+                for done, (chunk, future) in enumerate(zip(chunks, futures), 1):
+                    summaries[done - 1] = {'url': chunk['url'], 'title': chunk['title'], 'summary': future.result()}
+                    if progress_callback:
+                        progress_callback(done, len(chunks), chunk['url'])
+            except BaseException:
+                # Don't start the remaining model calls after a failure or cancellation
+                for future in futures:
+                    future.cancel()
+                raise
+        return summaries
+
+    def reduce(self, summaries, max_chars=REDUCE_MAX_CHARS):
+        """Combine summaries in groups until they fit one prompt of `max_chars`
+
+        A model that answers with summaries too long to pair up would keep
+        the group count from shrinking, so they are clipped then; if even
+        that doesn't help (titles alone too long), the summaries are
+        returned as they are.
+        """
+        groups = group_summaries(summaries, max_chars)
+        while len(groups) > 1:
+            before = len(groups)
+            with span('reduce', groups=len(groups)), ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                combined = list(executor.map(
+                    lambda group, context: context.run(
+                        self.complete, REDUCE_PROMPT.format(summaries=format_summaries(group))
+                    ),
+                    groups,
+                    [contextvars.copy_context() for _ in groups],
+                ))
+            summaries = [
+                {'url': group[0]['url'], 'title': f"{len(group)} pages from {group[0]['title']}", 'summary': text}
+                for group, text in zip(groups, combined)
+            ]
+            groups = group_summaries(summaries, max_chars)
+            if len(groups) >= before:
+                summaries = clip_summaries(summaries, max_chars)
+                groups = group_summaries(summaries, max_chars)
+                if len(groups) >= before:
+                    break
+        return summaries
+
+    def summarize(self, pages, progress_callback=None):
+        """Map then reduce; the result fits one final prompt"""
+        return self.reduce(self.map(pages, progress_callback))
+
+
+_cache = ProcessWide(LLMCache, path=SUMMARY_CACHE_PATH, ttl=SUMMARY_CACHE_TTL, max_entries=1024)
+
+
+def get_summary_cache():
+    """Return the process-wide page summary cache, creating it on first use"""
+    return _cache.get()
+
+
+def configure(**settings):
+    """Replace the process-wide summary cache with one built from the given settings"""
+    _cache.configure(**settings)
@@ -0,0 +1,91 @@
+from fixtures import FakeOllamaServer
+
+import pipeline
+from chat_history import ChatHistory, estimate_tokens
+from doc_store import DocumentStore
+
+
+class RecordingOllamaServer(FakeOllamaServer):
+    """Remembers how many prompt characters each request had to evaluate"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.evaluated = []
+
+    def evaluated_chars(self, prompt):
+        chars = super().evaluated_chars(prompt)
+        self.evaluated.append(chars)
+        return chars
+
+
+def chat(history, turns):
+    contexts = []
+    for i in range(turns):
+        contexts.append(history.build_context(budget_tokens=200))
+        history.append("You", f"Question {i}: " + "words " * 5)
+        history.append("Bot", f"Answer {i}: " + "more words " * 8)
+    return contexts
+
+
+def test_context_is_trimmed_in_blocks():
+    contexts = chat(ChatHistory(), 40)
+    trims = 0
+    for before, after in zip(contexts, contexts[1:]):
+        assert sum(estimate_tokens(text) for _, text in after) <= 200
+        if after[:len(before)] != before:
+            trims += 1
+            assert after[0][0] == "You"
+    # Most requests extend the previous context instead of shifting it
+    assert 0 < trims < 40 // 3
+
+
+def test_context_survives_ring_buffer_eviction():
+    history = ChatHistory(max_turns=6)
+    contexts = chat(history, 20)
+    assert contexts[-1]
+    assert len(contexts[-1]) <= 6
+    history.clear()
+    assert history.build_context() == []
+
+
+def page_store():
+    store = DocumentStore()
+    store.add('https://example.test/python', 'Python classes',
+              "Python classes bundle data and functionality together. " * 20
+              + "Metaclasses customize how Python classes themselves are created. " * 40)
+    return store
+
+
+def test_follow_up_reference_holds_page_and_far_excerpts():
+    store = page_store()
+    passages = [passage for _, passage in store.search('python metaclasses created', k=3)]
+    reference, prompt = pipeline.follow_up_prompt(
+        'How are metaclasses used?', passages, store.pages({'https://example.test/python'}), max_tokens=200
+    )
+    assert 'Python classes bundle data' in reference
+    assert 'How are metaclasses used?' in prompt
+    # Passages past the clipped page text are quoted with the question
+    assert 'Metaclasses customize' in prompt
+
+    reference_again, prompt = pipeline.follow_up_prompt(
+        'What do classes bundle?', passages[:0], store.pages({'https://example.test/python'}), max_tokens=200
+    )
+    assert reference_again == reference
+    assert prompt == 'What do classes bundle?'
+
+
+def test_follow_ups_reuse_the_cached_prefix(monkeypatch):
+    store = page_store()
+    pages = store.pages({'https://example.test/python'})
+    history = ChatHistory()
+    monkeypatch.setattr(pipeline, 'USE_LLM_CACHE', False)
+    with RecordingOllamaServer(reply='A short answer.', prefix_cache=True) as server:
+        monkeypatch.setattr(pipeline, 'BACKEND_SETTINGS', {'base_url': server.base_url})
+        for question in ('What do classes bundle?', 'Why use classes?', 'Are classes objects?'):
+            reference, prompt = pipeline.follow_up_prompt(question, [], pages)
+            pipeline.get_model_response(prompt, context=history.build_context(), reference=reference)
+            history.append("You", question)
+            history.append("Bot", 'A short answer.')
+    # The pages are evaluated once; later follow-ups only add their new turns
+    assert server.evaluated[0] > len(pages[0]['content'][:1000])
+    assert server.evaluated[1] < 200 and server.evaluated[2] < 200
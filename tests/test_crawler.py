@@ -0,0 +1,48 @@
+import pytest
+from fixtures import FixtureServer
+
+import page_cache
+from crawler import get_internal_links, run_crawl
+from frontier import Frontier, canonicalize
+
+
+def page(title, links=()):
+    body = ''.join(f'<p>{title} paragraph {i}: fixture text with enough words to pass the extraction filter.</p>'
+                   for i in range(6))
+    anchors = ''.join(f'<a href="{href}">{text}</a>' for href, text in links)
+    return (f'<html><head><title>{title}</title></head><body><main><article><h1>{title}</h1>'
+            f'{body}<div>{anchors}</div></article></main></body></html>')
+
+
+@pytest.fixture(autouse=True)
+def memory_page_cache():
+    page_cache.configure(path=':memory:')
+    yield
+    page_cache.configure()
+
+
+def test_links_resolve_against_directory_url():
+    links = get_internal_links('https://docs.python.org/3/', [['library/index.html', 'Library'], ['#top', 'Top']])
+    assert links == [('https://docs.python.org/3/library/index.html', 'Library'),
+                     ('https://docs.python.org/3/', 'Top')]
+
+
+def test_frontier_fetches_original_url_and_dedupes_canonical():
+    frontier = Frontier('https://example.com/docs/')
+    assert frontier.add('https://example.com/docs/')
+    assert not frontier.add('https://example.com/docs/index.html')
+    assert not frontier.add('https://example.com/docs#intro')
+    assert frontier.pop() == ('https://example.com/docs/', 0)
+    assert canonicalize('https://example.com/docs/') == 'https://example.com/docs'
+
+
+def test_crawl_directory_page_reaches_relative_links():
+    pages = {
+        '/docs/': page('Docs', [('intro.html', 'Introduction'), ('guide/', 'Guide')]),
+        '/docs/intro.html': page('Introduction'),
+        '/docs/guide/': page('Guide', [('../intro.html', 'Back')]),
+    }
+    with FixtureServer(pages) as site:
+        result = run_crawl(f'{site.base_url}/docs/', max_pages=5, per_host_delay=0)
+    assert result['success'], result
+    assert sorted(p['title'] for p in result['data']) == ['Docs', 'Guide', 'Introduction']
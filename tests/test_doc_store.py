@@ -0,0 +1,41 @@
+import sqlite3
+
+from doc_store import DocumentStore
+
+PYTHON_DOCS = (
+    "Classes provide a means of bundling data and functionality together. Creating a new class "
+    "creates a new type of object, allowing new instances of that type to be made. Each class "
+    "instance can have attributes attached to it for maintaining its state. Class instances can "
+    "also have methods for modifying their state. Python classes provide all the standard "
+    "features of object oriented programming."
+)
+
+
+def test_persisted_pages_are_scoped_to_their_owner(tmp_path):
+    path = str(tmp_path / 'documents.sqlite3')
+    alice = DocumentStore(path, owner='alice')
+    alice.add('https://docs.python.org/3/tutorial/classes.html', 'Classes', PYTHON_DOCS)
+
+    assert len(DocumentStore(path, owner='bob')) == 0
+    reopened = DocumentStore(path, owner='alice')
+    assert len(reopened) == 1
+    assert reopened.search('python classes instances')
+
+
+def test_unscoped_legacy_rows_are_dropped(tmp_path):
+    path = str(tmp_path / 'documents.sqlite3')
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE documents (url TEXT PRIMARY KEY, title TEXT, content TEXT, added_at REAL)")
+    db.execute("INSERT INTO documents VALUES ('https://example.com', 'Shared', 'shared page text', 0)")
+    db.commit()
+    db.close()
+    assert len(DocumentStore(path, owner='bob')) == 0
+
+
+def test_one_shared_word_does_not_match():
+    store = DocumentStore()
+    store.add('https://docs.python.org/3/tutorial/classes.html', 'Classes', PYTHON_DOCS)
+    question = 'how do I cook pasta with classes of ingredients'
+    assert store.search(question)   # BM25 alone finds the incidental "classes"
+    assert store.search(question, min_match=0.5) == []
+    assert store.search('how do class instances keep their state', min_match=0.5)
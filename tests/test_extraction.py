@@ -0,0 +1,56 @@
+from extraction import CRAWL_RULES, SCRAPE_RULES, extract_page
+
+ARTICLE = ''.join(
+    f'<p>Paragraph {i} of the article body, long enough to pass the extraction filter.</p>' for i in range(5)
+)
+SIDEBAR = ('<p>Related posts, popular tags and other links that are long enough to keep.</p>'
+           '<a href="/related">Related</a>')
+
+
+def page(body, title='My Page'):
+    return f'<html><head><title>{title}</title></head><body>{body}</body></html>'
+
+
+def test_wrapper_with_modifier_class_keeps_its_content():
+    result = extract_page(page(f'<div class="page has-sidebar"><main>{ARTICLE}</main></div>'))
+    assert 'Paragraph 4 of the article body' in result['content']
+
+
+def test_wrapper_holding_most_of_the_text_is_kept():
+    result = extract_page(page(f'<div id="content" class="layout social-feed">{ARTICLE}</div>'))
+    assert 'Paragraph 0 of the article body' in result['content']
+
+
+def test_matched_block_around_main_is_kept():
+    result = extract_page(page(f'<div class="sidebar-layout"><main>{ARTICLE}</main></div>'), rules=CRAWL_RULES)
+    assert 'Paragraph 2 of the article body' in result['content']
+
+
+def test_small_boilerplate_blocks_are_dropped():
+    body = (f'<div class="sidebar">{SIDEBAR}</div><div>{ARTICLE}</div>'
+            '<div id="cookie-consent"><p>This site stores small files on your device to work properly.</p></div>'
+            '<p>Closing words of the article, long enough to pass the filter too.'
+            '<span class="share">Share on social networks</span></p>')
+    result = extract_page(page(body))
+    assert 'Paragraph 4 of the article body' in result['content']
+    assert 'Closing words' in result['content']
+    assert 'Related posts' not in result['content']
+    assert 'small files' not in result['content']
+    assert 'Share on' not in result['content']
+    assert ['/related', 'Related'] not in result['links']
+
+
+def test_svg_titles_are_not_the_page_title():
+    icon = '<svg viewBox="0 0 16 16"><title>Search icon</title><path d="M0 0h16v16z"/></svg>'
+    result = extract_page(f'<html><head><title>My Page</title></head><body>{icon}<main>{ARTICLE}</main></body></html>')
+    assert result['title'] == 'My Page'
+    assert 'Search icon' not in result['content']
+
+    result = extract_page(f'<html><body>{icon}<main>{ARTICLE}</main></body></html>')
+    assert result['title'] == 'No title found'
+
+
+def test_streamed_chunks_match_whole_document():
+    html = page(f'<div class="layout social-feed">{ARTICLE}</div><div class="sidebar">{SIDEBAR}</div>').encode()
+    chunks = [html[i:i + 64] for i in range(0, len(html), 64)]
+    assert extract_page(chunks, rules=SCRAPE_RULES) == extract_page(html, rules=SCRAPE_RULES)
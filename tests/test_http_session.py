@@ -0,0 +1,25 @@
+import time
+
+from fixtures import FixtureServer, send_body
+
+import http_session
+from http_session import build_session
+
+
+class RateLimitedServer(FixtureServer):
+    """Answers every GET with 429 and a Retry-After of an hour"""
+
+    def handle_get(self, handler):
+        send_body(handler, 429, b'', 'text/plain', {'Retry-After': '3600'})
+
+
+def test_long_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr(http_session, 'RETRY_AFTER_MAX', 0.1)
+    session = build_session(max_retries=2, backoff_factor=0)
+    with RateLimitedServer({}) as server:
+        start = time.perf_counter()
+        response = session.get(f'{server.base_url}/page')
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 429
+    assert server.requests_served == 3
+    assert elapsed < 5
@@ -0,0 +1,26 @@
+import time
+
+import tracing
+from jobs import FAILED, SUCCEEDED, JobManager
+
+
+def wait_done(jobs, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not all(job.done for job in jobs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_jobs_finish_when_tracing_fails(monkeypatch):
+    def broken_export(self, span):
+        raise OSError("metrics file vanished")
+
+    monkeypatch.setattr(tracing.Tracer, 'finish_request', broken_export)
+    manager = JobManager(max_workers=4)
+    jobs = [manager.submit(lambda job, i: i, i) for i in range(20)]
+    jobs.append(manager.submit(lambda job: 1 / 0))
+    wait_done(jobs)
+
+    assert [job.status for job in jobs[:-1]] == [SUCCEEDED] * 20
+    assert [job.result for job in jobs[:-1]] == list(range(20))
+    assert jobs[-1].status == FAILED
+    assert isinstance(jobs[-1].error, ZeroDivisionError)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fixtures import FakeOllamaServer
+
+from llm_backends import BACKENDS, FakeBackend, OllamaBackend, get_backend
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Say something."}]
+
+
+def collect(tokens):
+    async def run():
+        return [token async for token in tokens]
+    return asyncio.run(run())
+
+
+def test_get_backend_reuses_instance_per_settings():
+    backend = get_backend('fake', reply='one two')
+    assert get_backend('fake', reply='one two') is backend
+    assert get_backend('fake', reply='three') is not backend
+    with pytest.raises(ValueError):
+        get_backend('missing')
+
+
+def test_backends_have_default_models():
+    for name, cls in BACKENDS.items():
+        assert cls.default_model, name
+
+
+def test_fake_backend_sync_metrics():
+    backend = FakeBackend(reply='one two three')
+    metrics = {}
+    assert backend.complete(MESSAGES, metrics) == 'one two three'
+    assert metrics['completion_tokens'] == 3
+    assert metrics['prompt_tokens'] > 0
+    assert metrics['total_time'] >= 0
+    stats = backend.stats()
+    assert stats['calls'] == 1 and stats['errors'] == 0
+    assert stats['completion_tokens'] == 3
+
+
+def test_fake_backend_stream_metrics():
+    backend = FakeBackend(reply='one two three', first_token_delay=0.05)
+    metrics = {}
+    assert ''.join(backend.stream(MESSAGES, metrics)) == 'one two three '
+    assert metrics['time_to_first_token'] >= 0.05
+    assert metrics['total_time'] >= metrics['time_to_first_token']
+    assert backend.stats()['p50_first_token'] >= 0.05
+
+
+def test_fake_backend_early_close_still_counts_call():
+    backend = FakeBackend(reply='one two three')
+    tokens = backend.stream(MESSAGES)
+    assert next(tokens) == 'one '
+    tokens.close()
+    assert backend.stats()['calls'] == 1
+
+
+def test_fake_backend_async_metrics():
+    backend = FakeBackend(reply='one two three')
+    metrics = {}
+    assert asyncio.run(backend.acomplete(MESSAGES, metrics)) == 'one two three'
+    assert metrics['completion_tokens'] == 3
+    stream_metrics = {}
+    assert ''.join(collect(backend.astream(MESSAGES, stream_metrics))) == 'one two three '
+    assert 'time_to_first_token' in stream_metrics
+    assert backend.stats()['calls'] == 2
+
+
+def test_ollama_backend_against_fake_server():
+    with FakeOllamaServer(reply='hello from ollama', first_token_delay=0.05) as server:
+        backend = OllamaBackend('test-model', base_url=server.base_url, keep_alive='5m')
+
+        metrics = {}
+        assert backend.complete(MESSAGES, metrics) == 'hello from ollama'
+        assert metrics['completion_tokens'] == 3
+        assert metrics['prompt_tokens'] == metrics['prompt_eval_count']
+        assert server.keep_alive == '5m'
+
+        stream_metrics = {}
+        assert ''.join(backend.stream(MESSAGES, stream_metrics)).strip() == 'hello from ollama'
+        assert stream_metrics['time_to_first_token'] >= 0.05
+        assert stream_metrics['completion_tokens'] == 3
+
+        assert backend.generate('Say something.').strip() == 'hello from ollama'
+        assert collect(backend.astream(MESSAGES)) == ['hello ', 'from ', 'ollama ']
+
+    stats = backend.stats()
+    assert stats['backend'] == 'ollama' and stats['model'] == 'test-model'
+    assert stats['calls'] == 4 and stats['errors'] == 0
+
+
+def test_ollama_backend_counts_errors():
+    with FakeOllamaServer() as server:
+        backend = OllamaBackend('test-model', base_url=server.base_url + '/missing')
+        with pytest.raises(Exception):
+            backend.complete(MESSAGES)
+    assert backend.stats()['errors'] == 1
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from fixtures import FakeOllamaServer
+
+from llm_backends import OllamaBackend
+from llm_scheduler import PRIORITY_CHAT, PRIORITY_CRAWL, PRIORITY_PAGE, LLMScheduler, SchedulerBusy
+
+PROMPT = [{"role": "user", "content": "Summarize this."}]
+
+
+@pytest.fixture
+def model():
+    with FakeOllamaServer(first_token_delay=0.3) as server:
+        yield OllamaBackend('test-model', base_url=server.base_url)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting")
+        time.sleep(0.01)
+
+
+def start_call(scheduler, model, priority, order, name):
+    def run():
+        try:
+            with scheduler.slot(priority):
+                order.append(name)
+                model.complete(PROMPT)
+        except SchedulerBusy:
+            order.append(f'{name} rejected')
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_waiting_calls_run_by_priority_then_arrival(model):
+    scheduler = LLMScheduler(max_concurrent=1)
+    order = []
+    threads = [start_call(scheduler, model, PRIORITY_CRAWL, order, 'running')]
+    wait_for(lambda: scheduler.stats()['running'] == 1)
+    for i, (priority, name) in enumerate([(PRIORITY_CRAWL, 'crawl 1'), (PRIORITY_PAGE, 'page'),
+                                          (PRIORITY_CRAWL, 'crawl 2'), (PRIORITY_CHAT, 'chat')], 1):
+        threads.append(start_call(scheduler, model, priority, order, name))
+        wait_for(lambda: scheduler.stats()['queued'] == i)
+    for thread in threads:
+        thread.join()
+    assert order == ['running', 'chat', 'page', 'crawl 1', 'crawl 2']
+
+
+def test_full_queue_rejects_new_calls(model):
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=1)
+    order = []
+    threads = [start_call(scheduler, model, PRIORITY_CRAWL, order, 'running')]
+    wait_for(lambda: scheduler.stats()['running'] == 1)
+    threads.append(start_call(scheduler, model, PRIORITY_PAGE, order, 'queued'))
+    wait_for(lambda: scheduler.stats()['queued'] == 1)
+
+    # Calls that don't outrank the waiter are turned away
+    for priority in (PRIORITY_PAGE, PRIORITY_CRAWL):
+        with pytest.raises(SchedulerBusy):
+            with scheduler.slot(priority):
+                pass
+    for thread in threads:
+        thread.join()
+    stats = scheduler.stats()
+    assert order == ['running', 'queued']
+    assert stats['rejected'] == 2 and stats['completed'] == 2
+
+
+def test_chat_gets_through_a_full_queue(model):
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=2)
+    order = []
+    threads = [start_call(scheduler, model, PRIORITY_CRAWL, order, 'running')]
+    wait_for(lambda: scheduler.stats()['running'] == 1)
+    for i in (1, 2):
+        threads.append(start_call(scheduler, model, PRIORITY_CRAWL, order, f'crawl {i}'))
+        wait_for(lambda: scheduler.stats()['queued'] == i)
+
+    threads.append(start_call(scheduler, model, PRIORITY_CHAT, order, 'chat'))
+    # The newest crawl call gives up its place
+    wait_for(lambda: 'crawl 2 rejected' in order)
+    for thread in threads:
+        thread.join()
+    stats = scheduler.stats()
+    assert order == ['running', 'crawl 2 rejected', 'chat', 'crawl 1']
+    assert stats['rejected'] == 1 and stats['completed'] == 3
+    assert stats['queued'] == 0
+
+
+def test_wait_stats(model):
+    scheduler = LLMScheduler(max_concurrent=1)
+    order = []
+    threads = [start_call(scheduler, model, PRIORITY_CHAT, order, 'first')]
+    wait_for(lambda: scheduler.stats()['running'] == 1)
+    threads.append(start_call(scheduler, model, PRIORITY_CHAT, order, 'second'))
+    wait_for(lambda: scheduler.stats()['queued'] == 1)
+    for thread in threads:
+        thread.join()
+
+    stats = scheduler.stats()
+    assert stats['queued'] == 0 and stats['running'] == 0
+    assert stats['max_depth'] == 1
+    assert stats['completed'] == 2
+    assert stats['waited'] == 1
+    # The second call waited for most of the first one's 0.3s model call
+    assert stats['p95_wait'] >= 0.2
+    assert stats['p50_wait'] >= 0.2
+
+
+def test_check_leaves_the_queue(model):
+    scheduler = LLMScheduler(max_concurrent=1)
+    order = []
+    thread = start_call(scheduler, model, PRIORITY_CHAT, order, 'running')
+    wait_for(lambda: scheduler.stats()['running'] == 1)
+
+    class Cancelled(Exception):
+        pass
+
+    def cancelled():
+        raise Cancelled
+
+    with pytest.raises(Cancelled):
+        with scheduler.slot(PRIORITY_CHAT, check=cancelled, poll_interval=0.01):
+            pass
+    assert scheduler.stats()['queued'] == 0
+    thread.join()
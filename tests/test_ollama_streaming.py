@@ -0,0 +1,109 @@
+import json
+import time
+
+import pytest
+from fixtures import FakeOllamaServer
+
+from ollama_client import generate, stream_chat, stream_generate
+
+REPLY = 'The quick brown fox jumps over the lazy dog'
+
+
+class ScriptedOllamaServer(FakeOllamaServer):
+    """Streams a fixed list of NDJSON objects, cut into HTTP chunks of `chunk_size` bytes"""
+
+    def __init__(self, lines, chunk_size=None, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.lines = lines
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.disconnected = False
+
+    def generate(self, handler, payload):
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/x-ndjson')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+        data = b''.join(json.dumps(line).encode('utf-8') + b'\n' for line in self.lines)
+        size = self.chunk_size or len(data)
+        try:
+            for i in range(0, len(data), size):
+                piece = data[i:i + size]
+                handler.wfile.write(f'{len(piece):x}\r\n'.encode('ascii') + piece + b'\r\n')
+                handler.wfile.flush()
+                time.sleep(self.delay)
+            handler.wfile.write(b'0\r\n\r\n')
+        except OSError:
+            self.disconnected = True
+
+
+def token_lines(tokens, done=True):
+    lines = [{'response': token, 'done': False} for token in tokens]
+    if done:
+        lines.append({'response': '', 'done': True, 'prompt_eval_count': 7, 'eval_count': len(tokens)})
+    return lines
+
+
+def test_stream_reassembles_blocking_reply():
+    with FakeOllamaServer(reply=REPLY) as server:
+        url = f'{server.base_url}/api/generate'
+        streamed = ''.join(stream_generate(url, 'test-model', 'Say something.'))
+        assert streamed.strip() == generate(url, 'test-model', 'Say something.') == REPLY
+
+
+def test_lines_split_across_http_chunks():
+    tokens = [word + ' ' for word in REPLY.split()]
+    with ScriptedOllamaServer(token_lines(tokens), chunk_size=5) as server:
+        metrics = {}
+        streamed = list(stream_generate(f'{server.base_url}/api/generate', 'test-model', 'Hi', metrics))
+    assert streamed == tokens
+    assert metrics['prompt_eval_count'] == 7
+    assert metrics['eval_count'] == len(tokens)
+
+
+def test_chat_stream_tokens():
+    with FakeOllamaServer(reply=REPLY) as server:
+        messages = [{'role': 'user', 'content': 'Hi'}]
+        streamed = ''.join(stream_chat(f'{server.base_url}/api/chat', 'test-model', messages))
+    assert streamed.strip() == REPLY
+
+
+def test_time_to_first_token():
+    with FakeOllamaServer(reply=REPLY, first_token_delay=0.2, token_delay=0.05) as server:
+        metrics = {}
+        tokens = stream_generate(f'{server.base_url}/api/generate', 'test-model', 'Hi', metrics)
+        first = next(tokens)
+        assert first == 'The '
+        assert 0.2 <= metrics['time_to_first_token'] < 0.4
+        assert 'total_time' not in metrics
+        list(tokens)
+    # The rest of the reply took another eight token delays
+    assert metrics['total_time'] >= metrics['time_to_first_token'] + 0.3
+
+
+def test_early_close_stops_reading():
+    tokens = [f'word{i} ' for i in range(200)]
+    server = ScriptedOllamaServer(token_lines(tokens), chunk_size=64, delay=0.02)
+    with server:
+        metrics = {}
+        stream = stream_generate(f'{server.base_url}/api/generate', 'test-model', 'Hi', metrics)
+        assert next(stream) == 'word0 '
+        start = time.perf_counter()
+        stream.close()
+        # Closing doesn't wait for the remaining tokens
+        assert time.perf_counter() - start < 0.5
+        assert 'total_time' not in metrics
+        deadline = time.monotonic() + 5
+        while not server.disconnected and time.monotonic() < deadline:
+            time.sleep(0.02)
+    assert server.disconnected
+
+
+def test_error_line_mid_stream():
+    lines = token_lines(['partial ', 'reply '], done=False) + [{'error': 'model runner has unexpectedly stopped'}]
+    with ScriptedOllamaServer(lines) as server:
+        received = []
+        with pytest.raises(RuntimeError, match='unexpectedly stopped'):
+            for token in stream_generate(f'{server.base_url}/api/generate', 'test-model', 'Hi'):
+                received.append(token)
+    assert received == ['partial ', 'reply ']
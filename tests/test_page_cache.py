@@ -0,0 +1,62 @@
+from fixtures import FixtureServer
+
+from extraction import extract_page
+from http_session import iter_body
+from page_cache import PageCache
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def read_all(url, chunks, encoding):
+    return {'length': sum(len(chunk) for chunk in chunks)}
+
+
+def page(paragraphs):
+    body = ''.join(f'<p>Paragraph {i}: fixture text with enough words to pass the extraction filter.</p>'
+                   for i in range(paragraphs))
+    return f'<html><head><title>Page</title></head><body><main>{body}</main></body></html>'
+
+
+def test_iter_body_reports_truncation():
+    body = iter_body(FakeResponse(b'x' * 100), max_bytes=64, chunk_size=30)
+    assert b''.join(body) == b'x' * 64
+    assert body.truncated
+
+    body = iter_body(FakeResponse(b'x' * 64), max_bytes=64, chunk_size=32)
+    assert b''.join(body) == b'x' * 64
+    assert not body.truncated
+
+
+def test_truncated_body_is_flagged_and_fetched_again():
+    with FixtureServer({'/big': page(200), '/small': page(3)}) as site:
+        cache = PageCache(path=':memory:', max_page_bytes=4096)
+        for _ in range(2):
+            assert cache.fetch(f'{site.base_url}/big', read_all, 'all')['length'] == 4096
+            assert cache.fetch(f'{site.base_url}/small', read_all, 'all')['length'] < 4096
+        # The small page came from the cache the second time; the capped one didn't
+        assert site.requests_served == 3
+        assert cache.hits == 1
+
+        rows = dict(cache._db.execute("SELECT url, complete || truncated FROM pages").fetchall())
+        assert rows[f'{site.base_url}/big'] == '01'
+        assert rows[f'{site.base_url}/small'] == '10'
+
+
+def test_early_stop_is_partial_but_reused():
+    with FixtureServer({'/page': page(200)}) as site:
+        cache = PageCache(path=':memory:')
+
+        def extract(url, chunks, encoding):
+            return extract_page(chunks, budget=500, encoding=encoding)
+
+        first = cache.fetch(f'{site.base_url}/page', extract, 'budget')
+        assert cache.fetch(f'{site.base_url}/page', extract, 'budget') == first
+        assert site.requests_served == 1
+        assert cache._db.execute("SELECT complete, truncated FROM pages").fetchone() == (0, 0)
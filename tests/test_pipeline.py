@@ -0,0 +1,54 @@
+import pipeline
+import retrieval
+
+
+class RecordingJob:
+    def __init__(self):
+        self.events = []
+
+    def notify(self, kind, message):
+        self.events.append((kind, message))
+
+
+class ReducedSummarizer:
+    """Summaries that already fit one prompt"""
+
+    def reduce(self, summaries):
+        return summaries
+
+
+def crawled_site():
+    pages = [
+        {'url': 'https://example.test/pricing', 'title': 'Pricing',
+         'content': "The team plan costs twelve dollars per seat each month. " * 30},
+        {'url': 'https://example.test/about', 'title': 'About',
+         'content': "The company was founded by two climbers in Denver. " * 30},
+    ]
+    return {'start_url': 'https://example.test/', 'pages_crawled': len(pages), 'data': pages}
+
+
+def capture_prompt(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(retrieval, '_embedder_choice', 'tfidf')
+    monkeypatch.setattr(pipeline, 'get_model_response', lambda prompt, job, **kwargs: prompts.append(prompt))
+    return prompts
+
+
+def test_crawl_question_is_in_the_prompt(monkeypatch):
+    prompts = capture_prompt(monkeypatch)
+    pipeline.analyze_crawl(RecordingJob(), crawled_site(), 'How much does the team plan cost?')
+    prompt, = prompts
+    assert 'Question: How much does the team plan cost?' in prompt
+    assert 'twelve dollars per seat' in prompt
+    assert 'Overall website theme' not in prompt
+
+
+def test_crawl_overview_keeps_the_analysis(monkeypatch):
+    prompts = capture_prompt(monkeypatch)
+    summaries = [{'url': page['url'], 'title': page['title'], 'summary': page['content'][:60]}
+                 for page in crawled_site()['data']]
+    monkeypatch.setattr(pipeline, 'crawl_summarizer', lambda job: ReducedSummarizer())
+    pipeline.analyze_crawl(RecordingJob(), crawled_site(), page_summaries=summaries)
+    prompt, = prompts
+    assert '1. Overall website theme and purpose' in prompt
+    assert 'Question:' not in prompt
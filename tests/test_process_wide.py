@@ -0,0 +1,33 @@
+from process_wide import ProcessWide
+
+
+class Thing:
+    def __init__(self, size=1, name='default'):
+        self.size = size
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_instance_is_built_once():
+    holder = ProcessWide(Thing)
+    assert holder.get() is holder.get()
+
+
+def test_configure_replaces_settings_and_closes_old_instance():
+    holder = ProcessWide(Thing, close=Thing.close, size=2)
+    first = holder.get()
+    assert first.size == 2
+
+    holder.configure(name='custom')
+    second = holder.get()
+    assert first.closed and second is not first
+    assert (second.size, second.name) == (2, 'custom')
+
+    # Settings from earlier calls aren't kept; no settings restores the defaults
+    holder.configure(size=5)
+    assert (holder.get().size, holder.get().name) == (5, 'default')
+    holder.configure()
+    assert (holder.get().size, holder.get().name) == (2, 'default')
@@ -0,0 +1,96 @@
+import pytest
+import requests
+from fixtures import FixtureServer
+
+import frontier
+import page_cache
+from crawler import run_crawl
+from frontier import RobotsCache, RobotsUnavailable
+
+
+class Robots503Server(FixtureServer):
+    def handle_get(self, handler):
+        if handler.path == '/robots.txt':
+            handler.send_response(503)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+        super().handle_get(handler)
+
+
+class FlakySession:
+    """Session whose robots.txt requests fail with a connection error `failures` times"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.session = requests.Session()
+
+    def get(self, url, **kwargs):
+        if url.endswith('/robots.txt') and self.failures:
+            self.failures -= 1
+            raise requests.ConnectionError("connection reset")
+        return self.session.get(url, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    page_cache.configure(path=':memory:')
+    frontier.configure(retry_after=0)
+    yield
+    page_cache.configure()
+    frontier.configure()
+
+
+def site_pages():
+    body = ''.join(f'<p>Paragraph {i}: fixture text with enough words to pass the extraction filter.</p>'
+                   for i in range(6))
+    return {'/': f'<html><head><title>Home</title></head><body><main><article>{body}</article></main></body></html>'}
+
+
+def test_server_error_disallows_site(monkeypatch):
+    # A plain session: the shared one retries 5xx replies with backoff
+    session = requests.Session()
+    monkeypatch.setattr(frontier, 'get_session', lambda: session)
+    with Robots503Server(site_pages()) as site:
+        assert not RobotsCache().allowed(f'{site.base_url}/')
+
+
+def test_transport_error_is_not_cached(monkeypatch):
+    session = FlakySession(failures=1)
+    monkeypatch.setattr(frontier, 'get_session', lambda: session)
+    robots = RobotsCache(retry_after=0)
+    with FixtureServer(site_pages()) as site:
+        with pytest.raises(RobotsUnavailable):
+            robots.allowed(f'{site.base_url}/')
+        # The next lookup asks again and gets the real (missing, so permissive) rules
+        assert robots.allowed(f'{site.base_url}/')
+
+
+def test_failure_is_remembered_briefly(monkeypatch):
+    session = FlakySession(failures=1)
+    monkeypatch.setattr(frontier, 'get_session', lambda: session)
+    robots = RobotsCache(retry_after=60)
+    with FixtureServer(site_pages()) as site:
+        for _ in range(2):
+            with pytest.raises(RobotsUnavailable):
+                robots.allowed(f'{site.base_url}/')
+    assert session.failures == 0
+
+
+def test_crawl_reports_robots_blip_as_fetch_error(monkeypatch):
+    monkeypatch.setattr(frontier, 'get_session', lambda: FlakySession(failures=100))
+    errors = []
+    with FixtureServer(site_pages()) as site:
+        result = run_crawl(f'{site.base_url}/', max_pages=2, per_host_delay=0,
+                           error_callback=lambda url, error: errors.append(error))
+    assert not result['success']
+    assert 'robots.txt does not allow' not in result['error']
+    assert errors and all(isinstance(error, RobotsUnavailable) for error in errors)
+
+
+def test_crawl_recovers_after_robots_blip(monkeypatch):
+    monkeypatch.setattr(frontier, 'get_session', lambda: session)
+    session = FlakySession(failures=1)
+    with FixtureServer(site_pages()) as site:
+        result = run_crawl(f'{site.base_url}/', max_pages=2, per_host_delay=0)
+    assert result['success'], result
@@ -0,0 +1,50 @@
+import threading
+
+from llm_cache import LLMCache
+from summarizer import REDUCE_MAX_CHARS, Summarizer, group_summaries
+
+
+def make_pages(count):
+    return [
+        {'url': f'https://example.test/page/{i}', 'title': f'Page {i}', 'content': f'Page {i} text. ' * 200}
+        for i in range(count)
+    ]
+
+
+def verbose_model(length):
+    calls = []
+    lock = threading.Lock()
+
+    def complete(prompt):
+        with lock:
+            calls.append(prompt)
+            if len(calls) > 200:
+                raise AssertionError("reduce did not terminate")
+        return 'x' * length
+
+    return complete, calls
+
+
+def test_reduce_terminates_with_verbose_model():
+    complete, calls = verbose_model(3600)
+    summarizer = Summarizer(complete, 'stub', cache=LLMCache(ttl=0))
+    summaries = summarizer.summarize(make_pages(12))
+    assert len(group_summaries(summaries)) == 1
+    assert len(calls) < 50
+
+
+def test_reduce_terminates_when_summaries_exceed_prompt():
+    complete, calls = verbose_model(REDUCE_MAX_CHARS * 2)
+    summarizer = Summarizer(complete, 'stub', cache=LLMCache(ttl=0))
+    summaries = summarizer.summarize(make_pages(6))
+    assert len(group_summaries(summaries)) == 1
+    assert len(calls) < 50
+
+
+def test_short_summaries_are_reduced_once():
+    complete, calls = verbose_model(100)
+    summarizer = Summarizer(complete, 'stub', cache=LLMCache(ttl=0))
+    summaries = summarizer.summarize(make_pages(3))
+    # Three short map summaries already fit one prompt
+    assert len(summaries) == 3
+    assert len(calls) == 3
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+import tracing
+from tracing import span
+
+
+@pytest.fixture
+def metrics_path(tmp_path):
+    path = tmp_path / 'metrics.prom'
+    tracing.configure(log_path=None, metrics_path=str(path))
+    yield path
+    tracing.configure()
+
+
+def test_concurrent_requests_write_metrics(metrics_path):
+    errors = []
+
+    def run():
+        try:
+            for _ in range(200):
+                with span('request'):
+                    pass
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert 'webscraper_requests_total{outcome="ok"} 800' in metrics_path.read_text()
+    assert [p.name for p in metrics_path.parent.iterdir()] == ['metrics.prom']
+
+
+def test_failed_metrics_write_does_not_fail_the_request(tmp_path):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    tracing.configure(log_path=None, metrics_path=str(blocker / 'metrics.prom'))
+    try:
+        with span('request') as current:
+            pass
+        assert current.attrs['trace']['name'] == 'request'
+    finally:
+        tracing.configure()
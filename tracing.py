@@ -0,0 +1,290 @@
+"""
+Request tracing and latency metrics for the scraper pipeline.
+
+A request (one chat message, or one URL in a batch) is traced as a tree
+of spans: span('request') at the top, then crawl, fetch, http (waiting
+for response headers: DNS, connect and server time), download (waiting
+for body chunks), extract and parse, prompt assembly, and one llm span
+per model call carrying Ollama's eval_count, eval_duration and
+prompt_eval_duration. Code records a stage with the span() context
+manager, or record() when the duration was measured elsewhere; both are
+no-ops for the trace (but still counted in the metrics) when no request
+is being traced. The current span lives in a context variable, so worker
+threads pick it up when their callable is wrapped with
+contextvars.copy_context().run.
+
+When a request span finishes, the tracer:
+- logs the whole tree as one JSON line to the 'webscraper.trace' logger
+  (and to `log_path` when set);
+- adds every span's duration to per-stage histograms, written in the
+  Prometheus text format to `metrics_path` and, when `metrics_port` is
+  set, served at http://localhost:<port>/metrics.
+
+breakdown() turns a finished request into self time per stage (a span's
+duration minus its children's), which is what the debug panel shows.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from process_wide import ProcessWide
+
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'traces.jsonl')
+METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'metrics.prom')
+METRICS_PORT = None   # e.g. 9464 to serve /metrics for Prometheus
+LOG_MAX_BYTES = 10 * 1024 * 1024   # Trace log size before it is rotated (one backup kept)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Model metrics copied onto llm spans
+LLM_FIELDS = (
+    'time_to_first_token', 'prompt_tokens', 'completion_tokens', 'prompt_eval_count',
+    'prompt_eval_duration', 'eval_count', 'eval_duration', 'load_duration',
+)
+
+# Counter name -> (label name, help text)
+COUNTERS = {
+    'requests_total': ('outcome', 'Traced requests by outcome'),
+    'llm_tokens_total': ('kind', 'Model tokens by kind'),
+}
+
+logger = logging.getLogger('webscraper.trace')
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed stage of a request and the stages inside it"""
+
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children', '_lock')
+
+    def __init__(self, name, attrs, start=None):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter() if start is None else start
+        self.duration = None
+        self.children = []
+        self._lock = threading.Lock()
+
+    def add(self, child):
+        with self._lock:
+            self.children.append(child)
+
+    def to_dict(self, origin=None):
+        origin = self.start if origin is None else origin
+        with self._lock:
+            children = list(self.children)
+        return {
+            'name': self.name,
+            'offset': round(self.start - origin, 6),
+            'duration': round(self.duration or 0.0, 6),
+            'attrs': dict(self.attrs),
+            'children': [child.to_dict(origin) for child in sorted(children, key=lambda c: c.start)],
+        }
+
+
+def breakdown(trace):
+    """Return {stage: [count, total seconds, self seconds]} for a span dict"""
+    stages = {}
+
+    def visit(span):
+        children = sum(child['duration'] for child in span['children'])
+        entry = stages.setdefault(span['name'], [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += span['duration']
+        # Concurrent children can add up to more than their parent
+        entry[2] += max(span['duration'] - children, 0.0)
+        for child in span['children']:
+            visit(child)
+
+    visit(trace)
+    return stages
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Tracer:
+    """Collects finished requests into logs and per-stage metrics"""
+
+    def __init__(self, log_path=LOG_PATH, metrics_path=METRICS_PATH, metrics_port=METRICS_PORT):
+        self.metrics_path = metrics_path
+        self.stages = {}     # stage name -> Histogram
+        self.counters = {}   # (metric name, label value) -> count
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()   # One metrics file write at a time, in request order
+        self._handler = None
+        self._server = None
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+            self._handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=LOG_MAX_BYTES, backupCount=1, encoding='utf-8'
+            )
+            self._handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(self._handler)
+            logger.setLevel(logging.INFO)
+        if metrics_port:
+            self._serve(metrics_port)
+
+    def observe(self, span):
+        with self._lock:
+            self.stages.setdefault(span.name, Histogram()).observe(span.duration)
+            if span.name == 'llm':
+                for kind in ('prompt', 'completion'):
+                    tokens = span.attrs.get(f'{kind}_tokens')
+                    if tokens:
+                        key = ('llm_tokens_total', kind)
+                        self.counters[key] = self.counters.get(key, 0) + tokens
+
+    def finish_request(self, span):
+        trace = span.to_dict()
+        with self._lock:
+            self.requests += 1
+            errors = ('requests_total', 'error' if 'error' in span.attrs else 'ok')
+            self.counters[errors] = self.counters.get(errors, 0) + 1
+        # Exporting is best effort: a failed write must not fail the request
+        try:
+            logger.info(json.dumps({'time': time.time(), 'trace': trace, 'breakdown': breakdown(trace)}, default=str))
+        except Exception:
+            logger.warning("Could not log a request trace", exc_info=True)
+        if self.metrics_path:
+            try:
+                self.write_metrics(self.metrics_path)
+            except Exception:
+                logger.warning("Could not write metrics to %s", self.metrics_path, exc_info=True)
+        return trace
+
+    def render_metrics(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP webscraper_stage_seconds Time spent in each pipeline stage',
+            '# TYPE webscraper_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.stages.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'webscraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'webscraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'webscraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'webscraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for name, (label_name, help_text) in COUNTERS.items():
+                lines.append(f'# HELP webscraper_{name} {help_text}')
+                lines.append(f'# TYPE webscraper_{name} counter')
+                for (counter, label), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f'webscraper_{name}{{{label_name}="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics(self, path):
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock:
+            # A temp file of its own, so concurrent requests never rename each other's
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix='.metrics-',
+                                             suffix='.tmp', delete=False) as f:
+                f.write(self.render_metrics())
+            try:
+                os.replace(f.name, path)   # Scrapers never read a half-written file
+            except OSError:
+                os.unlink(f.name)
+                raise
+
+    def _serve(self, port):
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = tracer.render_metrics().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        if self._handler is not None:
+            logger.removeHandler(self._handler)
+            self._handler.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the block as a stage of the current request (a new request when `name` is 'request')"""
+    parent = _current.get()
+    current = Span(name, attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs['error'] = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current.reset(token)
+        tracer = get_tracer()
+        tracer.observe(current)
+        if parent is not None:
+            parent.add(current)
+        elif name == 'request':
+            current.attrs['trace'] = tracer.finish_request(current)
+
+
+def record(name, seconds, start=None, **attrs):
+    """Add an already-measured stage to the current request"""
+    finished = Span(name, attrs, start=time.perf_counter() - seconds if start is None else start)
+    finished.duration = seconds
+    get_tracer().observe(finished)
+    parent = _current.get()
+    if parent is not None:
+        parent.add(finished)
+
+
+def current_span():
+    return _current.get()
+
+
+_tracer = ProcessWide(Tracer, close=Tracer.close)
+
+
+def get_tracer():
+    """Return the process-wide tracer, creating it on first use"""
+    return _tracer.get()
+
+
+def configure(**settings):
+    """Replace the process-wide tracer with one built from the given settings"""
+    _tracer.configure(**settings)